@@ -0,0 +1,597 @@
+"""
+Click loop benchmark - Runs the real clicking loop against an in-memory mouse
+Writes the results as JSON so later runs can be compared with a baseline.
+Needs no display and injects no input, unless real backends are asked for
+with --backends. It measures:
+
+    - achieved rate, interval error percentiles, CPU time per click and
+      peak memory for a matrix of settings
+    - start-to-first-click and stop-to-exit latency
+    - interval error under simulated GUI load, with the engine in-process
+      and in a child process
+    - interval error with and without precision mode, under CPU load from
+      another process
+    - burst throughput, and the per-call cost of each mouse backend
+    - scheduling overhead as more profiles share the profile engine's thread
+    - control API round trips from a local client
+    - process-start-to-first-click time of the headless CLI
+    - the poll cost and reaction time of screen triggers
+
+Usage:
+    python benchmarks/bench_click_loop.py [--quick] [--output results.json]
+                                          [--baseline old.json] [--fail-on-regression]
+                                          [--backends null,recording,xtest]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from click_config import ClickConfig  # noqa: E402
+from click_engine import ClickEngine  # noqa: E402
+from control_server import ControlClient, ControlServer  # noqa: E402
+from engine_process import EngineProcess  # noqa: E402
+from mouse_backends import NULL, RECORDING, NullMouse, backend_factory  # noqa: E402
+from optional import numpy  # noqa: E402
+from precision import PrecisionMode  # noqa: E402
+from profile_engine import ProfileEngine  # noqa: E402
+from triggers import DEFAULT_TOLERANCE, MemoryScreen, make_condition  # noqa: E402
+
+# Settings matrix
+CPS_VALUES = (10, 50, 200, 500)
+VARIATION_VALUES = (0, 15)
+DOUBLE_CLICK_VALUES = (False, True)
+FIXED_POSITION_VALUES = (False, True)
+
+# Seconds each case runs for the timing pass, and for the memory pass
+DEFAULT_DURATION = 1.0
+QUICK_DURATION = 0.25
+MEMORY_DURATION = 0.2
+
+# Start/stop cycles for the control latency measurement
+LATENCY_CYCLES = 200
+QUICK_LATENCY_CYCLES = 50
+
+# Clicks in the burst throughput measurement
+BURST_SIZE = 100_000
+QUICK_BURST_SIZE = 20_000
+
+# Calls per backend operation in the backend comparison
+BACKEND_CALLS = 20_000
+QUICK_BACKEND_CALLS = 2_000
+
+# Backends compared by default; the others click for real, so they have to be asked for
+SAFE_BACKENDS = (NULL, RECORDING)
+
+# Profiles running at once in the profile engine measurement, and the rate of each
+PROFILE_COUNTS = (1, 2, 5, 10)
+QUICK_PROFILE_COUNTS = (1, 10)
+PROFILE_CPS = 100
+
+# Round trips in the control API latency measurement
+CONTROL_REQUESTS = 2_000
+QUICK_CONTROL_REQUESTS = 200
+
+# Headless CLI launches timed from before the process is spawned
+CLI_RUNS = 10
+QUICK_CLI_RUNS = 3
+CLI_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "cli.py")
+
+# Screen triggers: (trigger, region side in pixels) polled on a full-HD in-memory screen
+TRIGGER_SCREEN = (1920, 1080)
+TRIGGER_CASES = (("pixel", 1), ("pixel", 64), ("template", 32), ("change", 64))
+TRIGGER_POLLS = 2_000
+QUICK_TRIGGER_POLLS = 200
+PYTHON_POLL_SHARE = 10  # the plain Python comparison runs 1/10 as many polls
+TRIGGER_CPS = 1000  # so the hold-off after a click never delays the next reaction
+TRIGGER_GAP = 0.02  # seconds between one reaction and the next change
+TRIGGER_TIMEOUT = 1.0  # seconds to wait for a reaction before giving up on it
+
+# GUI load: this much pure-Python work out of every period, like a widget rebuild
+GUI_LOAD_CPS = 200
+GUI_LOAD_BUSY = 0.02  # seconds
+GUI_LOAD_PERIOD = 0.05  # seconds
+
+# CPU load for the precision comparison: busy-looping processes, one per core
+CPU_LOAD_SCRIPT = "while True: pass"
+CPU_LOAD_SETTLE = 0.2  # seconds
+
+# Allowed slack against a baseline before a case counts as a regression
+RATE_ERROR_SLACK = 0.5  # percentage points
+CPU_SLACK = 0.25  # 25% more CPU time per click
+
+
+class FakeMouse:
+    """In-memory stand-in for pynput.mouse.Controller"""
+
+    def __init__(self):
+        self._position = (0, 0)
+        self.clicks = 0
+        self.moves = 0
+        self.first_click = None
+        self.last_click = None
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        self._position = value
+        self.moves += 1
+
+    def click(self, button, count=1):
+        now = time.perf_counter()
+        if self.first_click is None:
+            self.first_click = now
+        self.last_click = now
+        self.clicks += count
+
+
+def case_matrix(quick=False):
+    """Every combination of the benchmark settings"""
+    cps_values = (50, 500) if quick else CPS_VALUES
+    for cps, variation, double, fixed in itertools.product(
+            cps_values, VARIATION_VALUES, DOUBLE_CLICK_VALUES, FIXED_POSITION_VALUES):
+        yield {"cps": cps, "random_variation": variation, "double_click": double, "use_fixed_position": fixed}
+
+
+def case_key(case):
+    return (case["cps"], case["random_variation"], case["double_click"], case["use_fixed_position"])
+
+
+def run_session(case, duration):
+    """Run one clicking session and return the engine and mouse afterwards"""
+    mouse = FakeMouse()
+    engine = ClickEngine(mouse, ClickConfig(fixed_x=100, fixed_y=100, mouse_button="left", **case))
+    engine.start()
+    time.sleep(duration)
+    engine.stop()
+    engine.join()
+    return engine, mouse
+
+
+def run_case(case, duration=DEFAULT_DURATION, memory_duration=MEMORY_DURATION):
+    """Benchmark one combination of settings"""
+    cpu_start = time.process_time()
+    engine, mouse = run_session(case, duration)
+    cpu = time.process_time() - cpu_start
+
+    ticks = engine.click_count
+    span = mouse.last_click - mouse.first_click if ticks > 1 else 0
+    achieved = (ticks - 1) / span if span else 0.0
+    errors = engine.stats.interval_errors
+
+    # Separate short pass so tracemalloc's overhead doesn't skew the timings
+    tracemalloc.start()
+    run_session(case, memory_duration)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(case, **{
+        "clicks": ticks,
+        "achieved_cps": achieved,
+        "rate_error_pct": abs(achieved - case["cps"]) / case["cps"] * 100,
+        "interval_error_p50_ms": errors.percentile(50) / 1000,
+        "interval_error_p99_ms": errors.percentile(99) / 1000,
+        "interval_error_max_ms": errors.max / 1000,
+        "overruns": engine.stats.overruns,
+        "cpu_us_per_click": cpu / ticks * 1e6 if ticks else 0.0,
+        "peak_memory_kb": peak / 1024,
+    })
+
+
+def latency_summary(latencies):
+    latencies = sorted(latencies)
+    return {
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "max_ms": latencies[-1],
+    }
+
+
+def measure_control_latency(cycles=LATENCY_CYCLES):
+    """Start-to-first-click and stop-to-exit latency over repeated cycles, in milliseconds
+
+    Start and stop are called from this thread the way the hotkey listener
+    calls them, with the loop sleeping towards a 100 ms deadline when stopped.
+    """
+    engine = ClickEngine(FakeMouse(), ClickConfig(cps=10, random_variation=0, mouse_button="left"))
+    start, stop = [], []
+    for _ in range(cycles):
+        engine.start()
+        while engine.click_count < 1:
+            time.sleep(0)
+        start.append(engine.stats.start_latency * 1000)
+        engine.stop()
+        engine.join()
+        stop.append(engine.stats.stop_latency * 1000)
+    engine.close()
+    return {"cycles": cycles, "start": latency_summary(start), "stop": latency_summary(stop)}
+
+
+def gui_load(stop):
+    """Hold the GIL in bursts until stop is set"""
+    while not stop.is_set():
+        end = time.perf_counter() + GUI_LOAD_BUSY
+        while time.perf_counter() < end:
+            sum(range(100))
+        stop.wait(GUI_LOAD_PERIOD - GUI_LOAD_BUSY)
+
+
+def measure_gui_load(duration=DEFAULT_DURATION):
+    """Interval error under GUI load, with the engine in this process and in a child process"""
+    config = ClickConfig(cps=GUI_LOAD_CPS, random_variation=0, mouse_button="left")
+    results = {}
+    for mode in ("thread", "process"):
+        if mode == "thread":
+            engine = ClickEngine(FakeMouse(), config)
+        else:
+            engine = EngineProcess(NullMouse, config)
+            engine.stats.to_dict()  # round trip, so the child is up before the clock starts
+        stop = threading.Event()
+        load = threading.Thread(target=gui_load, args=(stop,))
+        load.start()
+        engine.start()
+        time.sleep(duration)
+        engine.stop()
+        engine.join()
+        stats = engine.stats.to_dict()
+        stop.set()
+        load.join()
+        engine.close()
+        errors = stats["interval_error_ms"]
+        results[mode] = {"clicks": stats["clicks"], "p50_ms": errors["p50"],
+                         "p99_ms": errors["p99"], "max_ms": errors["max"]}
+    process_p99 = results["process"]["p99_ms"]
+    results["p99_reduction"] = results["thread"]["p99_ms"] / process_p99 if process_p99 else None
+    return results
+
+
+def measure_precision(duration=DEFAULT_DURATION):
+    """Interval error under CPU load from other processes, with and without precision mode"""
+    config = ClickConfig(cps=GUI_LOAD_CPS, random_variation=0, mouse_button="left")
+    results = {}
+    for mode in ("normal", "precision"):
+        cpu = min(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+        precision = PrecisionMode(cpu=cpu) if mode == "precision" else None
+        options = precision.engine_options() if precision else {}
+        engine = ClickEngine(FakeMouse(), config, **options)
+        load = [subprocess.Popen([sys.executable, "-c", CPU_LOAD_SCRIPT]) for _ in range(os.cpu_count() or 1)]
+        try:
+            time.sleep(CPU_LOAD_SETTLE)  # let the load processes get past interpreter startup
+            engine.start()
+            time.sleep(duration)
+            engine.stop()
+            engine.join()
+        finally:
+            for process in load:
+                process.kill()
+                process.wait()
+        engine.close()
+        errors = engine.stats.interval_errors.summary(1000)
+        results[mode] = {"clicks": engine.stats.clicks, "p50_ms": errors["p50"],
+                         "p99_ms": errors["p99"], "max_ms": errors["max"]}
+        if precision:
+            results[mode]["applied"] = precision.describe()
+    return results
+
+
+def measure_burst(size=BURST_SIZE):
+    """Clicks per second in burst mode, where the mouse gets them in chunks"""
+    mouse = FakeMouse()
+    engine = ClickEngine(mouse, ClickConfig(burst_size=size, mouse_button="left"))
+    engine.start()
+    engine.join()
+    engine.close()
+    span = mouse.last_click - mouse.first_click
+    return {"clicks": mouse.clicks, "seconds": span, "clicks_per_s": mouse.clicks / span if span else 0.0}
+
+
+def measure_backends(names=SAFE_BACKENDS, calls=BACKEND_CALLS):
+    """Microseconds per move, press+release and click call for each backend
+
+    A backend that can't run here is reported with the reason instead.
+    """
+    results = {}
+    for name in names:
+        try:
+            mouse = backend_factory(name)()
+        except RuntimeError as e:
+            results[name] = {"error": str(e)}
+            continue
+        timings = {}
+        for operation, call in (("move", lambda: mouse.move(100, 100)),
+                                ("press_release", lambda: (mouse.press("left"), mouse.release("left"))),
+                                ("click", lambda: mouse.click("left")),
+                                ("double_click", lambda: mouse.click("left", 2))):
+            started = time.perf_counter()
+            for _ in range(calls):
+                call()
+            timings[f"{operation}_us"] = (time.perf_counter() - started) / calls * 1e6
+        mouse.close()
+        results[name] = timings
+    return results
+
+
+def measure_profiles(counts=PROFILE_COUNTS, duration=DEFAULT_DURATION):
+    """Interval error and CPU time per click with more and more profiles on the profile engine's one thread"""
+    results = []
+    for count in counts:
+        mouse = FakeMouse()
+        engine = ProfileEngine(mouse)
+        config = ClickConfig(cps=PROFILE_CPS, random_variation=0, mouse_button="left")
+        cpu_start = time.process_time()
+        for i in range(count):
+            engine.start(f"profile{i}", config)
+        time.sleep(duration)
+        engine.close()
+        cpu = time.process_time() - cpu_start
+        stats = [engine.stats[f"profile{i}"] for i in range(count)]
+        clicks = sum(s.clicks for s in stats)
+        results.append({
+            "profiles": count,
+            "clicks": clicks,
+            "target_cps": count * PROFILE_CPS,
+            "achieved_cps": clicks / duration,
+            # Worst profile, so one starved profile can't hide behind the others
+            "interval_error_p50_ms": max(s.interval_errors.percentile(50) for s in stats) / 1000,
+            "interval_error_p99_ms": max(s.interval_errors.percentile(99) for s in stats) / 1000,
+            "cpu_us_per_click": cpu / clicks * 1e6 if clicks else 0.0,
+        })
+    return results
+
+
+def measure_control_api(requests=CONTROL_REQUESTS):
+    """Round-trip latency of control API requests from a local client, in milliseconds
+
+    Alternates status requests, which only read the engine, with set requests,
+    which publish a new config.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return {"error": "no Unix domain sockets"}
+    directory = tempfile.mkdtemp()
+    engine = ClickEngine(FakeMouse(), ClickConfig(cps=GUI_LOAD_CPS, random_variation=0, mouse_button="left"))
+    server = ControlServer(engine, os.path.join(directory, "control.sock"))
+    server.start()
+    client = ControlClient(server.path)
+    try:
+        engine.start()
+        timings = {"status": [], "set": []}
+        for i in range(requests):
+            cmd = "set" if i % 2 else "status"
+            args = {"cps": GUI_LOAD_CPS + i % 10} if cmd == "set" else {}
+            started = time.perf_counter()
+            client.request(cmd, **args)
+            timings[cmd].append((time.perf_counter() - started) * 1000)
+    finally:
+        client.close()
+        server.close()
+        engine.close()
+        shutil.rmtree(directory, ignore_errors=True)
+    return dict({"requests": requests}, **{cmd: latency_summary(values) for cmd, values in timings.items()})
+
+
+def measure_cli_startup(runs=CLI_RUNS):
+    """Time from spawning the headless CLI to its first click, in milliseconds
+
+    The CLI reports when its first click happened on the perf_counter clock,
+    which is system-wide, so the time before interpreter startup counts too.
+    "in_process_ms" is the part the CLI measures itself, from when it loaded.
+    """
+    command = [sys.executable, CLI_PATH, "run", "--backend", NULL, "--limit", "1", "--json"]
+    spawn_to_click, in_process = [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        summary = json.loads(output)
+        spawn_to_click.append((summary["first_click_at"] - started) * 1000)
+        in_process.append(summary["first_click_ms"])
+    return {"runs": runs, "spawn_to_first_click_ms": latency_summary(spawn_to_click),
+            "in_process_ms": latency_summary(in_process)}
+
+
+def measure_triggers(polls=TRIGGER_POLLS, duration=DEFAULT_DURATION):
+    """Cost of one capture and comparison per trigger and region size, and change-to-click latency
+
+    Captures come from an in-memory screen, so the poll cost is the view of
+    the region plus the comparison, with NumPy (when installed) and in plain
+    Python; MIT-SHM adds the X server's copy on top. The latency run turns
+    the watched pixel on under a running engine, times it to the click, and
+    turns it off again, for `duration` seconds.
+    """
+    screen = MemoryScreen(*TRIGGER_SCREEN)
+    red = (255, 0, 0)
+    poll_costs = {}
+    for trigger, side in TRIGGER_CASES:
+        region = (100, 100, side, side)
+        template = screen.capture(*region).copy()
+        costs = {}
+        for mode, use_numpy, count in (("numpy", True, polls), ("python", False, polls // PYTHON_POLL_SHARE)):
+            if use_numpy and numpy() is None:
+                costs[f"{mode}_us"] = None
+                continue
+            # Never matching, except the template, so every pixel is compared
+            condition = make_condition(trigger, red, DEFAULT_TOLERANCE, template, use_numpy=use_numpy)
+            started = time.perf_counter()
+            for _ in range(count):
+                condition.matches(screen.capture(*region))
+            costs[f"{mode}_us"] = (time.perf_counter() - started) / count * 1e6
+        poll_costs[f"{trigger}_{side}px"] = costs
+
+    screen = MemoryScreen(64, 64)
+    config = ClickConfig(cps=TRIGGER_CPS, random_variation=0, mouse_button="left", trigger="pixel",
+                         trigger_color=red, use_fixed_position=True, fixed_x=10, fixed_y=10)
+    engine = ClickEngine(FakeMouse(), config, screen=screen)
+    clicks = []
+    engine.on_click = lambda: clicks.append(time.perf_counter())
+    engine.start()
+    reactions = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        seen = len(clicks)
+        changed = time.perf_counter()
+        screen.fill(10, 10, 1, 1, red)
+        while len(clicks) == seen and time.perf_counter() - changed < TRIGGER_TIMEOUT:
+            time.sleep(0.0002)
+        screen.fill(10, 10, 1, 1, (0, 0, 0))
+        if len(clicks) > seen:
+            reactions.append((clicks[seen] - changed) * 1000)
+        time.sleep(TRIGGER_GAP)
+    engine.close()
+    capture_to_click = engine.stats.trigger_latency
+    return {
+        "poll_us": poll_costs,
+        "poll_rate": config.trigger_poll_rate,
+        "reactions": len(reactions),
+        "change_to_click": latency_summary(reactions) if reactions else None,
+        "capture_to_click_p50_ms": capture_to_click.percentile(50) / 1000,
+        "capture_to_click_p99_ms": capture_to_click.percentile(99) / 1000,
+    }
+
+
+def run_benchmarks(quick=False, duration=None, backends=SAFE_BACKENDS):
+    """Run the whole matrix and return the JSON-ready results"""
+    if duration is None:
+        duration = QUICK_DURATION if quick else DEFAULT_DURATION
+    results = [run_case(case, duration) for case in case_matrix(quick)]
+    return {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "duration": duration,
+        },
+        "results": results,
+        "control_latency": measure_control_latency(QUICK_LATENCY_CYCLES if quick else LATENCY_CYCLES),
+        "gui_load": measure_gui_load(duration),
+        "precision": measure_precision(duration),
+        "burst": measure_burst(QUICK_BURST_SIZE if quick else BURST_SIZE),
+        "backends": measure_backends(backends, QUICK_BACKEND_CALLS if quick else BACKEND_CALLS),
+        "control_api": measure_control_api(QUICK_CONTROL_REQUESTS if quick else CONTROL_REQUESTS),
+        "profiles": measure_profiles(QUICK_PROFILE_COUNTS if quick else PROFILE_COUNTS, duration),
+        "cli_startup": measure_cli_startup(QUICK_CLI_RUNS if quick else CLI_RUNS),
+        "triggers": measure_triggers(QUICK_TRIGGER_POLLS if quick else TRIGGER_POLLS, duration),
+    }
+
+
+def compare(results, baseline):
+    """List cases that got worse than the baseline"""
+    old = {case_key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in results["results"]:
+        before = old.get(case_key(result))
+        if before is None:
+            continue
+        if result["rate_error_pct"] > before["rate_error_pct"] + RATE_ERROR_SLACK:
+            regressions.append((result, "rate_error_pct", before["rate_error_pct"]))
+        if result["cpu_us_per_click"] > before["cpu_us_per_click"] * (1 + CPU_SLACK):
+            regressions.append((result, "cpu_us_per_click", before["cpu_us_per_click"]))
+    return regressions
+
+
+def print_table(results):
+    print(f"{'cps':>5} {'var':>4} {'dbl':>4} {'fix':>4} {'achieved':>9} {'err%':>6} "
+          f"{'p50ms':>7} {'p99ms':>7} {'maxms':>7} {'cpu/us':>7} {'memKB':>7}")
+    for r in results["results"]:
+        print(f"{r['cps']:>5} {r['random_variation']:>4} {r['double_click']:>4d} "
+              f"{r['use_fixed_position']:>4d} {r['achieved_cps']:>9.2f} {r['rate_error_pct']:>6.2f} "
+              f"{r['interval_error_p50_ms']:>7.3f} {r['interval_error_p99_ms']:>7.3f} "
+              f"{r['interval_error_max_ms']:>7.3f} {r['cpu_us_per_click']:>7.1f} {r['peak_memory_kb']:>7.1f}")
+    latency = results["control_latency"]
+    for name in ("start", "stop"):
+        summary = latency[name]
+        print(f"{name} latency over {latency['cycles']} cycles: p50 {summary['p50_ms']:.3f} ms, "
+              f"p99 {summary['p99_ms']:.3f} ms, max {summary['max_ms']:.3f} ms")
+    load = results["gui_load"]
+    for mode in ("thread", "process"):
+        summary = load[mode]
+        print(f"interval error under GUI load, engine in {mode}: p50 {summary['p50_ms']:.3f} ms, "
+              f"p99 {summary['p99_ms']:.3f} ms, max {summary['max_ms']:.3f} ms")
+    if load["p99_reduction"]:
+        print(f"child process cuts p99 interval error under GUI load {load['p99_reduction']:.1f}x")
+    precision = results["precision"]
+    for mode in ("normal", "precision"):
+        summary = precision[mode]
+        print(f"interval error under CPU load, {mode}: p50 {summary['p50_ms']:.3f} ms, "
+              f"p99 {summary['p99_ms']:.3f} ms, max {summary['max_ms']:.3f} ms")
+    print(f"precision mode applied: {precision['precision']['applied']}")
+    burst = results["burst"]
+    print(f"burst: {burst['clicks']} clicks at {burst['clicks_per_s']:.0f} clicks/s")
+    for name, timings in results["backends"].items():
+        if "error" in timings:
+            print(f"{name} backend: {timings['error']}")
+        else:
+            print(f"{name} backend per call: move {timings['move_us']:.2f} us, "
+                  f"press+release {timings['press_release_us']:.2f} us, click {timings['click_us']:.2f} us, "
+                  f"double click {timings['double_click_us']:.2f} us")
+    control = results["control_api"]
+    if "error" in control:
+        print(f"control API: {control['error']}")
+    else:
+        for cmd in ("status", "set"):
+            summary = control[cmd]
+            print(f"control API {cmd} round trip: p50 {summary['p50_ms']:.3f} ms, "
+                  f"p99 {summary['p99_ms']:.3f} ms, max {summary['max_ms']:.3f} ms")
+    for r in results["profiles"]:
+        print(f"{r['profiles']:>2} profiles on one thread: {r['achieved_cps']:.0f}/{r['target_cps']} clicks/s, "
+              f"worst p50 {r['interval_error_p50_ms']:.3f} ms, p99 {r['interval_error_p99_ms']:.3f} ms, "
+              f"{r['cpu_us_per_click']:.1f} us CPU per click")
+    cli = results["cli_startup"]
+    summary = cli["spawn_to_first_click_ms"]
+    print(f"CLI spawn to first click over {cli['runs']} runs: p50 {summary['p50_ms']:.1f} ms, "
+          f"max {summary['max_ms']:.1f} ms ({cli['in_process_ms']['p50_ms']:.1f} ms after the CLI loaded)")
+    triggers = results["triggers"]
+    for case, costs in triggers["poll_us"].items():
+        numpy_cost = "n/a" if costs["numpy_us"] is None else f"{costs['numpy_us']:.1f} us"
+        print(f"{case} trigger poll: NumPy {numpy_cost}, plain Python {costs['python_us']:.1f} us")
+    if triggers["change_to_click"]:
+        summary = triggers["change_to_click"]
+        print(f"trigger change to click at {triggers['poll_rate']:.0f} polls/s: p50 {summary['p50_ms']:.3f} ms, "
+              f"p99 {summary['p99_ms']:.3f} ms; capture to click p99 {triggers['capture_to_click_p99_ms']:.3f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Manual Labor click loop")
+    parser.add_argument("--quick", action="store_true", help="smaller matrix, shorter runs")
+    parser.add_argument("--duration", type=float, help="seconds per case")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against an earlier results file")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="exit with status 1 if any case regressed against the baseline")
+    parser.add_argument("--backends", default=",".join(SAFE_BACKENDS),
+                        help="comma-separated mouse backends to time; pynput, xtest and uinput click for real")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.quick, args.duration, args.backends.split(","))
+    print_table(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline)
+        for result, metric, before in regressions:
+            print(f"REGRESSION {case_key(result)}: {metric} {before:.2f} -> {result[metric]:.2f}")
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
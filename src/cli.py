@@ -0,0 +1,221 @@
+"""
+CLI - Command-line entry point for Manual Labor
+With no arguments it opens the GUI. "run" clicks headlessly: it never
+imports tkinter, imports only the engine and the one mouse backend it
+uses, and runs the clicking loop on the main thread, so the first click
+comes as soon after process start as possible.
+
+    python src/cli.py run --cps 40 --limit 1000 --button left --at 100,200
+"""
+
+import argparse
+import sys
+import time
+
+# As close to process start as this module can measure
+STARTED_AT = time.perf_counter()
+
+# Cheap: a backend's own library is only imported when it is opened
+from mouse_backends import BACKENDS, backend_factory  # noqa: E402
+
+BUTTONS = ("left", "right", "middle")
+
+
+class ImportTimer:
+    """Times every module imported while it is active, like python -X importtime
+
+    Works in a PyInstaller build too, where -X options can't be passed.
+    Records are (seconds including nested imports, nesting depth, name),
+    in the order the imports finish.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._depth = 0
+        self._original = None
+
+    def __enter__(self):
+        import builtins
+        self._original = builtins.__import__
+        builtins.__import__ = self._import
+        return self
+
+    def __exit__(self, *exc):
+        import builtins
+        builtins.__import__ = self._original
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+        depth = self._depth
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            self._depth = depth
+            self.records.append((time.perf_counter() - started, depth, name))
+
+
+class StartupProfile:
+    """Named phases from process start to the first click, with the imports inside each"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = []  # (name, seconds, import records)
+        self._last = STARTED_AT
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def mark(self, name, at, imports=()):
+        self.phases.append((name, at - self._last, list(imports)))
+        self._last = at
+
+    def report(self, out):
+        out.write("startup profile (ms):\n")
+        total = 0.0
+        for name, seconds, imports in self.phases:
+            total += seconds
+            out.write(f"{seconds * 1000:9.2f}  {name}\n")
+            for took, depth, module in imports:
+                out.write(f"{took * 1000:9.2f}    {'  ' * depth}{module}\n")
+        out.write(f"{total * 1000:9.2f}  total since the CLI module loaded\n")
+
+
+class _Phase:
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+        self.timer = ImportTimer() if profile.enabled else None
+
+    def __enter__(self):
+        if self.timer is not None:
+            self.timer.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        if self.timer is not None:
+            self.timer.__exit__(*exc)
+        self.profile.mark(self.name, time.perf_counter(), self.timer.records if self.timer else ())
+
+
+class _Discard:
+    def write(self, text):
+        pass
+
+
+def parse_point(text):
+    """(x, y) from "x,y" """
+    try:
+        x, y = (int(part) for part in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected x,y, got {text!r}") from None
+    return x, y
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="manual-labor", description="Manual Labor auto clicker")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("gui", help="open the GUI (the default)")
+
+    run = commands.add_parser("run", help="click without the GUI until the limit, duration or Ctrl+C")
+    run.add_argument("--cps", type=float, default=10, help="clicks per second")
+    run.add_argument("--limit", type=int, default=0, help="stop after this many clicks (0 = no limit)")
+    run.add_argument("--duration", type=float, help="stop after this many seconds")
+    run.add_argument("--burst", type=int, default=0, help="fire this many clicks back to back, ignoring --cps")
+    run.add_argument("--button", choices=BUTTONS, default="left")
+    run.add_argument("--double", action="store_true", help="double click")
+    run.add_argument("--at", type=parse_point, metavar="X,Y", help="click at this position")
+    run.add_argument("--variation", type=float, default=0, help="±%% timing variation")
+    run.add_argument("--delay", type=float, default=0, help="seconds to wait before the first click")
+    run.add_argument("--backend", choices=list(BACKENDS), default="pynput", help="mouse backend")
+    run.add_argument("--profile-startup", action="store_true",
+                     help="print how long each startup phase and import took")
+    run.add_argument("--json", action="store_true", help="print the session stats as JSON")
+    return parser
+
+
+def run(args, out=None, err=None):
+    """The run command; returns the exit status"""
+    # The --windowed GUI build has no console, so there is nowhere to print;
+    # ManualLaborCLI is the console build
+    out = out or sys.stdout or _Discard()
+    err = err or sys.stderr or _Discard()
+    startup = StartupProfile(args.profile_startup)
+    with startup.phase("engine imports"):
+        from click_config import ClickConfig
+        from click_engine import ClickEngine
+
+    try:
+        config = ClickConfig(cps=args.cps, click_limit=args.limit, burst_size=args.burst,
+                             random_variation=args.variation, double_click=args.double,
+                             start_delay=args.delay, use_fixed_position=args.at is not None,
+                             fixed_x=args.at[0] if args.at else 0, fixed_y=args.at[1] if args.at else 0,
+                             mouse_button=args.button)
+    except ValueError as e:
+        err.write(f"manual-labor: {e}\n")
+        return 2
+
+    with startup.phase(f"{args.backend} backend"):
+        try:
+            mouse = backend_factory(args.backend)()
+        except (ValueError, RuntimeError) as e:
+            err.write(f"manual-labor: {e}\n")
+            return 1
+
+    engine = ClickEngine(mouse, config)
+    if args.duration is not None:
+        import threading
+        timer = threading.Timer(args.duration, engine.stop)
+        timer.daemon = True
+        timer.start()
+    if args.profile_startup:
+        def first_click():
+            engine.on_click = None  # only the first one is wanted
+            startup.mark("engine setup to first click", time.perf_counter())
+        engine.on_click = first_click
+    try:
+        # Measured from process start, so start_latency is the time to the first click
+        engine.run(requested_at=STARTED_AT)
+    except KeyboardInterrupt:
+        engine.stop()
+    finally:
+        mouse.close()
+
+    stats = engine.stats
+    first_click_ms = None if stats.start_latency is None else (stats.start_latency + config.start_delay) * 1000
+    if args.json:
+        import json
+        summary = stats.to_dict()
+        summary["first_click_ms"] = first_click_ms
+        summary["first_click_at"] = None if first_click_ms is None else STARTED_AT + first_click_ms / 1000
+        json.dump(summary, out)
+        out.write("\n")
+    else:
+        line = f"{engine.click_count} clicks"
+        if stats.clicks > 1:
+            line += f", {stats.measured_cps:.1f} CPS"
+        if first_click_ms is not None:
+            line += f", first click {first_click_ms:.1f} ms after start"
+        out.write(line + "\n")
+    if args.profile_startup:
+        startup.report(err)
+    return 0
+
+
+def main(argv=None):
+    if getattr(sys, "frozen", False):
+        # The frozen build re-runs this entry point for the engine process's child
+        import multiprocessing
+        multiprocessing.freeze_support()
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        return run(args)
+    from manual_labor import main as gui_main
+    gui_main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Click config - Immutable, pre-validated settings snapshot for the click engine
+The GUI publishes a new snapshot with a single reference swap, and the
+clicking loop picks it up between clicks, so it never sees half-applied settings.
+"""
+
+from dataclasses import dataclass, field, fields, replace
+
+from jitter import DISTRIBUTIONS, EMPIRICAL, UNIFORM
+from paths import MOVE_OFF, MOVE_SHAPES
+from patterns import PATTERN_OFF, PATTERN_POINTS, PATTERNS, bounding_rect
+from rate_control import DEFAULT_WINDOW
+from scheduler import OVERRUN_POLICIES, OVERRUN_SKIP
+from triggers import DEFAULT_POLL_RATE, DEFAULT_TOLERANCE, TRIGGER_OFF, TRIGGER_PIXEL, TRIGGER_TEMPLATE, TRIGGERS
+
+
+@dataclass(frozen=True, slots=True)
+class ClickConfig:
+    """Everything the clicking loop needs, parsed and checked up front"""
+
+    cps: float = 10
+    random_variation: float = 15  # ±% timing variation
+    click_limit: int = 0  # 0 = unlimited
+    double_click: bool = False
+    use_fixed_position: bool = False
+    fixed_x: int = 0
+    fixed_y: int = 0
+    pattern: str = PATTERN_OFF  # multi-point clicking; overrides the fixed position
+    pattern_points: tuple = ()  # (x, y) points, also the default rectangle's corners
+    pattern_rect: tuple = None  # (left, top, right, bottom) for grid and region patterns
+    grid_rows: int = 3
+    grid_cols: int = 3
+    smooth_move: str = MOVE_OFF  # path shape for moving between click targets
+    move_duration: float = 0.1  # seconds a move takes, when the interval leaves room for it
+    move_rate: float = 120  # pointer updates per second along a path
+    trigger: str = TRIGGER_OFF  # click only while a screen region meets this condition
+    trigger_rect: tuple = None  # (left, top, right, bottom) to watch; defaults to the fixed position
+    trigger_color: tuple = None  # (r, g, b) the pixel trigger looks for
+    trigger_tolerance: int = DEFAULT_TOLERANCE  # per-channel difference still counted as a match
+    trigger_template_file: str = ""  # PPM image the template trigger compares the region with
+    trigger_poll_rate: float = DEFAULT_POLL_RATE  # region captures per second
+    start_delay: float = 0  # seconds
+    burst_size: int = 0  # clicks fired back to back, ignoring CPS; 0 = normal clicking
+    overrun_policy: str = OVERRUN_SKIP
+    rate_control: bool = False  # correct the interval to make up clicks lost to overruns
+    rate_window: int = DEFAULT_WINDOW  # clicks the achieved rate is measured over
+    jitter_distribution: str = UNIFORM
+    jitter_seed: int = None  # None = different every session
+    jitter_timings_file: str = ""  # recorded intervals for the empirical distribution
+    mouse_button: object = field(default=None, compare=False)
+    macro: object = field(default=None, compare=False)  # compiled Macro run instead of clicking
+
+    # Derived values, computed once here instead of on every click
+    interval: float = field(init=False, repr=False)
+    jitter_spread: float = field(init=False, repr=False)
+    clicks_per_tick: int = field(init=False, repr=False)
+    position: tuple = field(init=False, repr=False)
+    pattern_bounds: tuple = field(init=False, repr=False)
+
+    def __post_init__(self):
+        cps = float(self.cps)
+        if cps <= 0:
+            raise ValueError(f"CPS must be positive, got {self.cps}")
+        random_variation = float(self.random_variation)
+        if not 0 <= random_variation < 100:
+            raise ValueError(f"Timing variation must be 0-99%, got {self.random_variation}")
+        click_limit = int(self.click_limit)
+        if click_limit < 0:
+            raise ValueError(f"Click limit can't be negative, got {self.click_limit}")
+        start_delay = float(self.start_delay)
+        if start_delay < 0:
+            raise ValueError(f"Start delay can't be negative, got {self.start_delay}")
+        burst_size = int(self.burst_size)
+        if burst_size < 0:
+            raise ValueError(f"Burst size can't be negative, got {self.burst_size}")
+        if self.overrun_policy not in OVERRUN_POLICIES:
+            raise ValueError(f"Unknown overrun policy: {self.overrun_policy}")
+        rate_window = int(self.rate_window)
+        if rate_window < 2:
+            raise ValueError(f"Rate window must be at least 2 clicks, got {self.rate_window}")
+        if self.jitter_distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown jitter distribution: {self.jitter_distribution}")
+        if self.jitter_distribution == EMPIRICAL and not self.jitter_timings_file:
+            raise ValueError("Empirical jitter needs a recorded timings file")
+        jitter_seed = None if self.jitter_seed is None else int(self.jitter_seed)
+        if self.pattern not in PATTERNS:
+            raise ValueError(f"Unknown click pattern: {self.pattern}")
+        pattern_points = tuple((int(x), int(y)) for x, y in self.pattern_points)
+        pattern_rect = None if self.pattern_rect is None else tuple(int(v) for v in self.pattern_rect)
+        if pattern_rect is not None and (len(pattern_rect) != 4 or pattern_rect[0] > pattern_rect[2]
+                                         or pattern_rect[1] > pattern_rect[3]):
+            raise ValueError(f"Pattern rectangle must be (left, top, right, bottom), got {self.pattern_rect}")
+        if pattern_rect is None and pattern_points:
+            pattern_bounds = bounding_rect(pattern_points)
+        else:
+            pattern_bounds = pattern_rect
+        grid_rows = int(self.grid_rows)
+        grid_cols = int(self.grid_cols)
+        if grid_rows < 1 or grid_cols < 1:
+            raise ValueError(f"Grid must be at least 1x1, got {self.grid_rows}x{self.grid_cols}")
+        if self.smooth_move not in MOVE_SHAPES:
+            raise ValueError(f"Unknown move shape: {self.smooth_move}")
+        move_duration = float(self.move_duration)
+        move_rate = float(self.move_rate)
+        if move_duration <= 0 or move_rate <= 0:
+            raise ValueError(f"Move duration and rate must be positive, got {self.move_duration} and "
+                             f"{self.move_rate}")
+        if self.trigger not in TRIGGERS:
+            raise ValueError(f"Unknown trigger: {self.trigger}")
+        trigger_rect = None if self.trigger_rect is None else tuple(int(v) for v in self.trigger_rect)
+        if trigger_rect is not None and (len(trigger_rect) != 4 or trigger_rect[0] > trigger_rect[2]
+                                         or trigger_rect[1] > trigger_rect[3]):
+            raise ValueError(f"Trigger rectangle must be (left, top, right, bottom), got {self.trigger_rect}")
+        trigger_color = None if self.trigger_color is None else tuple(int(v) for v in self.trigger_color)
+        if trigger_color is not None and (len(trigger_color) != 3 or not all(0 <= v <= 255 for v in trigger_color)):
+            raise ValueError(f"Trigger colour must be (r, g, b) from 0-255, got {self.trigger_color}")
+        trigger_tolerance = int(self.trigger_tolerance)
+        if not 0 <= trigger_tolerance <= 255:
+            raise ValueError(f"Trigger tolerance must be 0-255, got {self.trigger_tolerance}")
+        trigger_poll_rate = float(self.trigger_poll_rate)
+        if trigger_poll_rate <= 0:
+            raise ValueError(f"Trigger poll rate must be positive, got {self.trigger_poll_rate}")
+        if self.trigger and trigger_rect is None and not self.use_fixed_position:
+            raise ValueError(f"The {self.trigger} trigger needs a rectangle or a fixed position to watch")
+        if self.trigger == TRIGGER_PIXEL and trigger_color is None:
+            raise ValueError("The pixel trigger needs a colour")
+        if self.trigger == TRIGGER_TEMPLATE and not self.trigger_template_file:
+            raise ValueError("The template trigger needs a template image")
+        if self.pattern == PATTERN_POINTS and not pattern_points:
+            raise ValueError("The points pattern needs at least one point")
+        if self.pattern not in (PATTERN_OFF, PATTERN_POINTS) and pattern_bounds is None:
+            raise ValueError(f"The {self.pattern} pattern needs a rectangle or points to span")
+
+        # Frozen, so normalised values have to go through object.__setattr__
+        set_field = object.__setattr__
+        set_field(self, "cps", cps)
+        set_field(self, "random_variation", random_variation)
+        set_field(self, "click_limit", click_limit)
+        set_field(self, "double_click", bool(self.double_click))
+        set_field(self, "use_fixed_position", bool(self.use_fixed_position))
+        set_field(self, "fixed_x", int(self.fixed_x))
+        set_field(self, "fixed_y", int(self.fixed_y))
+        set_field(self, "start_delay", start_delay)
+        set_field(self, "burst_size", burst_size)
+        set_field(self, "rate_control", bool(self.rate_control))
+        set_field(self, "rate_window", rate_window)
+        set_field(self, "jitter_seed", jitter_seed)
+        set_field(self, "pattern_points", pattern_points)
+        set_field(self, "pattern_rect", pattern_rect)
+        set_field(self, "grid_rows", grid_rows)
+        set_field(self, "grid_cols", grid_cols)
+        set_field(self, "trigger_rect", trigger_rect)
+        set_field(self, "trigger_color", trigger_color)
+        set_field(self, "trigger_tolerance", trigger_tolerance)
+        set_field(self, "trigger_poll_rate", trigger_poll_rate)
+        set_field(self, "move_duration", move_duration)
+        set_field(self, "move_rate", move_rate)
+
+        set_field(self, "interval", 1 / cps)
+        set_field(self, "jitter_spread", random_variation / 100)
+        set_field(self, "clicks_per_tick", 2 if self.double_click else 1)
+        set_field(self, "position", (self.fixed_x, self.fixed_y) if self.use_fixed_position else None)
+        set_field(self, "pattern_bounds", pattern_bounds)
+
+    def jitter_key(self):
+        """Settings that require a new jitter source when they change"""
+        return (self.jitter_distribution, self.jitter_spread, self.jitter_seed,
+                self.jitter_timings_file)
+
+    def pattern_key(self):
+        """Settings that require a new point source when they change"""
+        return (self.pattern, self.pattern_points, self.pattern_bounds, self.grid_rows, self.grid_cols,
+                self.jitter_seed)
+
+    def move_key(self):
+        """Settings that require a new path cache when they change"""
+        return (self.smooth_move, self.move_duration, self.move_rate, self.jitter_seed)
+
+    def trigger_key(self):
+        """Settings that require a new trigger condition when they change"""
+        return (self.trigger, self.trigger_color, self.trigger_tolerance, self.trigger_template_file)
+
+    def trigger_region_key(self):
+        """Settings that move or resize the region a trigger captures"""
+        return (self.trigger, self.trigger_template_file, self.trigger_rect, self.position)
+
+    def rate_key(self):
+        """Settings that require a new rate controller when they change"""
+        return (self.rate_control, self.rate_window, self.interval)
+
+    def replace(self, **changes):
+        """New validated snapshot with some settings changed"""
+        return replace(self, **changes)
+
+    def to_settings(self):
+        """Plain, JSON-friendly settings dict (the button and macro are saved by the GUI)"""
+        return {f.name: getattr(self, f.name) for f in fields(self)
+                if f.init and f.name not in ("mouse_button", "macro")}
+
+    @classmethod
+    def from_settings(cls, settings, **overrides):
+        """Build a snapshot from a settings dict, ignoring keys it doesn't know
+
+        The macro is only taken from the overrides; in a settings dict it is a name.
+        """
+        known = {f.name for f in fields(cls) if f.init and f.name != "macro"}
+        values = {name: value for name, value in settings.items() if name in known}
+        values.update(overrides)
+        try:
+            return cls(**values)
+        except TypeError as e:
+            raise ValueError(f"Invalid settings: {e}") from e
@@ -0,0 +1,566 @@
+"""
+Click engine - Headless clicking loop behind the Manual Labor GUI
+Has no tkinter dependency, so it runs on machines without a display server.
+"""
+
+import logging
+import threading
+import time
+
+from click_config import ClickConfig
+from jitter import EMPIRICAL, JitterSource, load_timings
+from macros import OP_CLICK, OP_KEY, OP_MOVE, OP_PRESS
+from paths import PathCache
+from patterns import PATTERN_REGION, PointSource
+from rate_control import RateController
+from scheduler import DEFAULT_SPIN_THRESHOLD, DeadlineScheduler
+from stats import ClickStats
+from triggers import TRIGGER_TEMPLATE, check_region, load_template, make_condition, watch_region
+
+log = logging.getLogger(__name__)
+
+# Clicks per mouse.click() call in burst mode; a stop takes effect between chunks
+BURST_CHUNK = 64
+
+# Seconds before a click deadline after which a smooth move gives up its remaining steps
+MOVE_GUARD = 0.001
+
+
+class ClickEngine:
+    """Runs the clicking loop on one long-lived worker thread against a mouse backend
+
+    The mouse needs a writable `position` and `click(button, count)`, so any
+    backend from mouse_backends.py works. Macros with key steps need a
+    keyboard with pynput's tap(key), and triggers need a screen (see
+    triggers.py). The clock, sleep and wakeup can be swapped for a virtual
+    clock (see simulation.py) or an absolute-deadline wakeup (see precision.py).
+
+    Every start and stop bumps a session generation number, and a loop only
+    keeps clicking while its generation is current, so at most one session
+    is ever live. A session that raises is logged and ended, and the
+    exception is kept in `error` until the next session starts.
+    """
+
+    def __init__(self, mouse, config=None, on_click=None, on_stop=None,
+                 clock=time.perf_counter, sleep=None, spin_threshold=DEFAULT_SPIN_THRESHOLD,
+                 wakeup=None, on_thread_start=None, keyboard=None, screen=None):
+        self.mouse = mouse
+        self.keyboard = keyboard
+        self.screen = screen  # region capture for triggers, from triggers.py, on the same clock
+        self.clock = clock
+        self._wakeup = wakeup or threading.Event()  # set to cut short the worker's sleep
+        self.sleep = sleep or self._wakeup.wait
+        self._sleep_until = None if sleep else getattr(self._wakeup, "wait_until", None)
+        self.spin_threshold = spin_threshold
+        self.on_thread_start = on_thread_start  # called on the worker thread before its first session
+        self.config = ClickConfig()
+        self.on_click = on_click  # called on the worker thread after every click
+        self.on_stop = on_stop  # called on the worker thread when the limit is hit
+
+        # Serialises publishers; the clicking loop itself never takes it
+        self._config_lock = threading.Lock()
+        if config is not None:
+            self.configure(config)
+
+        # State
+        self.is_running = False
+        self.is_delaying = False  # waiting out the start delay
+        self.click_count = 0
+        self.stats = ClickStats()
+        self.error = None  # exception that ended the last session, if any
+        self.generation = 0  # bumped by every start and stop
+        self._served_generation = 0  # last generation a loop was started for
+        self._requested_at = 0.0  # clock() when the current session was asked for
+        self._stop_requested_at = 0.0  # clock() when the last stop was asked for
+        self._busy = False  # a session is requested or running
+        self._closed = False
+        self._state = threading.Condition()
+        self.click_thread = None
+
+    def configure(self, config):
+        """Publish a complete new config snapshot"""
+        with self._config_lock:
+            self._publish(config)
+
+    def update(self, **changes):
+        """Publish a copy of the current config with some settings changed
+
+        Raises ValueError or OSError (and leaves the config alone) if the
+        result is invalid.
+        """
+        with self._config_lock:
+            self._publish(self.config.replace(**changes))
+
+    def _publish(self, config):
+        if config.macro is not None and self.keyboard is None and config.macro.needs_keyboard:
+            raise ValueError(f"Macro {config.macro.name!r} presses keys, but the engine has no keyboard")
+        if config.trigger and self.screen is None:
+            raise ValueError("Screen triggers need a screen to capture, but the engine has none")
+        if config.trigger and config.trigger_region_key() != self.config.trigger_region_key():
+            self.check_trigger(config, self.screen.size)
+        # A recording that can't be loaded should fail here, on the caller's
+        # thread, rather than later inside the clicking loop
+        if config.jitter_distribution == EMPIRICAL and config.jitter_key() != self.config.jitter_key():
+            self.make_jitter(config)
+        self.config = config
+
+    def start(self, requested_at=None):
+        """Signal the worker to start a new session
+
+        requested_at is the clock() time of the triggering input, if known;
+        it is used to measure start latency.
+        """
+        with self._state:
+            if self._closed:
+                raise RuntimeError("Engine is closed")
+            if self.is_running:
+                return
+            self._request_session(requested_at)
+            self._busy = True
+            if self.click_thread is None:
+                self.click_thread = threading.Thread(target=self._worker_loop, daemon=True)
+                self.click_thread.start()
+            self._wakeup.set()
+            self._state.notify_all()
+
+    def run(self, requested_at=None):
+        """Run one session on the calling thread until it stops"""
+        with self._state:
+            if self.is_running:
+                raise RuntimeError("Engine is already running")
+            gen = self._request_session(requested_at)
+            self._begin_session(gen)
+        try:
+            self.clicking_loop(gen)
+        finally:
+            with self._state:
+                self._end_session(gen)
+
+    def _request_session(self, requested_at):
+        self.is_running = True
+        self.is_delaying = self.config.start_delay > 0
+        self.generation += 1
+        self.click_count = 0
+        self._requested_at = self.clock() if requested_at is None else requested_at
+        return self.generation
+
+    def _begin_session(self, gen):
+        self._served_generation = gen
+        self.click_count = 0
+        self.error = None
+        self.stats.reset(self.config.cps)
+        self._wakeup.clear()
+
+    def stop(self, requested_at=None):
+        """End the current session; a sleeping loop wakes up and exits at once
+
+        requested_at is the clock() time of the triggering input, if known;
+        it is used to measure stop latency.
+        """
+        with self._state:
+            if self.is_running:
+                self._stop_requested_at = self.clock() if requested_at is None else requested_at
+            self._end_session(self.generation)
+
+    def _end_session(self, gen):
+        # Only the current generation can be ended, so a late stop from an
+        # old session can't kill a newer one
+        if self.is_running and self.generation == gen:
+            self.is_running = False
+            self.is_delaying = False
+            self.generation += 1
+            self._wakeup.set()
+            self._state.notify_all()
+
+    @property
+    def is_busy(self):
+        """A session is requested or its loop is still running, even if it has been stopped"""
+        return self._busy
+
+    def join(self, timeout=None):
+        """Wait until the current session has finished; returns False on timeout"""
+        with self._state:
+            return self._state.wait_for(lambda: not self._busy, timeout)
+
+    def close(self):
+        """Stop clicking and let the worker thread exit"""
+        with self._state:
+            self._end_session(self.generation)
+            self._closed = True
+            self._state.notify_all()
+        if self.click_thread is not None:
+            self.click_thread.join()
+        if hasattr(self._wakeup, "close"):
+            self._wakeup.close()
+
+    def _worker_loop(self):
+        """Body of the persistent worker: park until signalled, run the session, repeat"""
+        if self.on_thread_start:
+            self.on_thread_start()
+        state = self._state
+        while True:
+            with state:
+                while not (self.is_running and self.generation != self._served_generation):
+                    self._busy = False
+                    state.notify_all()
+                    if self._closed:
+                        return
+                    state.wait()
+                gen = self.generation
+                self._begin_session(gen)
+            try:
+                self.clicking_loop(gen)
+            except Exception as e:
+                # The worker serves every later session too, so it must outlive this one
+                log.exception("Clicking session failed")
+                self.error = e
+            finally:
+                with state:
+                    self._end_session(gen)
+
+    def _burst(self, gen, config, start_delay):
+        """Fire burst_size clicks (or double clicks) as fast as the mouse takes them, then stop"""
+        clock = self.clock
+        mouse = self.mouse
+        stats = self.stats
+        if config.position is not None:
+            mouse.position = config.position
+        click_count = 0
+        while click_count < config.burst_size:
+            if self.generation != gen:
+                # Stopped from outside
+                stats.stop_latency = clock() - self._stop_requested_at
+                return
+            count = min(config.burst_size - click_count, BURST_CHUNK)
+            started = clock()
+            mouse.click(config.mouse_button, count * config.clicks_per_tick)
+            stats.record_burst(count, started, clock())
+            if not click_count:
+                stats.start_latency = started - self._requested_at - start_delay
+            click_count += count
+            self.click_count = click_count
+            if self.on_click:
+                self.on_click()
+        with self._state:
+            self._end_session(gen)
+        if self.on_stop:
+            self.on_stop()
+
+    def _run_macro(self, gen, config, start_delay):
+        """Run the config's macro to its compiled schedule, for as many repetitions as it asks"""
+        macro = config.macro
+        # Lists of ready-made objects, so reading a step allocates nothing
+        ops = macro.ops.tolist()
+        offsets = macro.offsets.tolist()
+        arg_a = macro.arg_a.tolist()
+        arg_b = macro.arg_b.tolist()
+        objects = macro.objects
+        steps = range(len(ops))
+        clock = self.clock
+        mouse = self.mouse
+        keyboard = self.keyboard
+        stats = self.stats
+        wait_until = DeadlineScheduler(config.interval, spin_threshold=self.spin_threshold, clock=clock,
+                                       sleep=self.sleep, sleep_until=self._sleep_until).wait_until
+        click_count = 0
+        repetition = 0
+        repeat = macro.repeat or float("inf")  # 0 = until stopped
+        start = clock()
+        while repetition < repeat:
+            anchor = start + repetition * macro.duration
+            for i in steps:
+                lateness = wait_until(anchor + offsets[i])
+                if self.generation != gen:
+                    # Stopped from outside
+                    stats.stop_latency = clock() - self._stop_requested_at
+                    return
+                op = ops[i]
+                if op == OP_CLICK:
+                    started = clock()
+                    mouse.click(objects[arg_a[i]], arg_b[i])
+                    stats.record_click(started, clock(), lateness)
+                    if not click_count:
+                        stats.start_latency = started - self._requested_at - start_delay
+                    click_count += arg_b[i]
+                    self.click_count = click_count
+                    if self.on_click:
+                        self.on_click()
+                elif op == OP_MOVE:
+                    mouse.position = objects[arg_a[i]]
+                elif op == OP_KEY:
+                    keyboard.tap(objects[arg_a[i]])
+                elif op == OP_PRESS:
+                    mouse.press(objects[arg_a[i]])
+                else:
+                    mouse.release(objects[arg_a[i]])
+            repetition += 1
+        with self._state:
+            self._end_session(gen)
+        if self.on_stop:
+            self.on_stop()
+
+    def _run_trigger(self, gen, config, start_delay):
+        """Poll the trigger region and click whenever it meets the condition, at most cps times a second"""
+        clock = self.clock
+        mouse = self.mouse
+        stats = self.stats
+        condition, region = self.make_trigger(config)
+        matches = condition.matches
+        capture = self.screen.capture
+        poll = DeadlineScheduler(1 / config.trigger_poll_rate, spin_threshold=self.spin_threshold, clock=clock,
+                                 sleep=self.sleep, sleep_until=self._sleep_until)
+        poll.start()
+        last_click = float("-inf")
+        click_count = 0
+        while self.generation == gen:
+            # Pick up a newly published config at the poll boundary
+            if self.config is not config:
+                if not self.config.trigger:
+                    # Turned off mid-run; the session was started as a triggered one, so it ends here
+                    with self._state:
+                        self._end_session(gen)
+                    return
+                if (self.config.trigger_key() != config.trigger_key()
+                        or self.config.trigger_region_key() != config.trigger_region_key()):
+                    try:
+                        condition, region = self.make_trigger(self.config)
+                    except (ValueError, OSError) as e:
+                        self._trigger_failed(gen, e)
+                        return
+                    matches = condition.matches
+                config = self.config
+                stats.target_cps = config.cps
+                poll.set_interval(1 / config.trigger_poll_rate)
+
+            if config.click_limit and click_count >= config.click_limit:
+                with self._state:
+                    self._end_session(gen)
+                if self.on_stop:
+                    self.on_stop()
+                return
+            # No captures while the last click holds off the next, so a change
+            # in that time is still there to see once it's over
+            next_click = last_click + config.interval
+            if clock() < next_click:
+                poll.wait_until(next_click)
+            else:
+                poll.wait()
+            if self.generation != gen:
+                break
+            if self.config is not config:
+                # Changed while waiting; pick it up before the capture
+                continue
+            try:
+                frame = capture(*region)
+            except (ValueError, RuntimeError) as e:
+                # The screen changed under a running session, e.g. a resolution switch
+                self._trigger_failed(gen, e)
+                return
+            if not matches(frame):
+                continue
+            if config.position is not None:
+                mouse.position = config.position
+            started = clock()
+            mouse.click(config.mouse_button, config.clicks_per_tick)
+            stats.record_click(started, clock(), 0.0)
+            stats.record_trigger(started - frame.captured_at)
+            if not click_count:
+                stats.start_latency = started - self._requested_at - start_delay
+            last_click = started
+            click_count += 1
+            self.click_count = click_count
+            if self.on_click:
+                self.on_click()
+
+        # Stopped from outside
+        stats.stop_latency = clock() - self._stop_requested_at
+
+    def _trigger_failed(self, gen, error):
+        """End a triggered session whose screen or template stopped working under it"""
+        self.error = error
+        with self._state:
+            self._end_session(gen)
+
+    @staticmethod
+    def make_trigger(config):
+        """(condition, (left, top, width, height)) for a config's screen trigger"""
+        template = load_template(config.trigger_template_file) if config.trigger == TRIGGER_TEMPLATE else None
+        size = (template.width, template.height) if template is not None else (1, 1)
+        condition = make_condition(config.trigger, config.trigger_color, config.trigger_tolerance, template)
+        return condition, watch_region(config.trigger_rect, config.position, size)
+
+    @staticmethod
+    def check_trigger(config, screen_size):
+        """Raise ValueError unless a config's trigger region lies on a screen of screen_size
+
+        OSError for a template that can't be read.
+        """
+        _, region = ClickEngine.make_trigger(config)
+        check_region(screen_size, *region)
+
+    @staticmethod
+    def make_jitter(config):
+        """Jitter source for a config; seeded configs replay the same offsets every session"""
+        timings = load_timings(config.jitter_timings_file) if config.jitter_distribution == EMPIRICAL else None
+        return JitterSource(config.jitter_distribution, config.jitter_spread,
+                            seed=config.jitter_seed, timings=timings)
+
+    @staticmethod
+    def make_points(config):
+        """Point source for a config's click pattern, or None without one"""
+        if not config.pattern:
+            return None
+        return PointSource(config.pattern, config.pattern_points, config.pattern_bounds,
+                           config.grid_rows, config.grid_cols, seed=config.jitter_seed)
+
+    @staticmethod
+    def make_mover(config):
+        """Path cache for a config's smooth moves, or None when moves are instant"""
+        if not config.smooth_move:
+            return None
+        return PathCache(config.smooth_move, config.move_duration, config.move_rate, seed=config.jitter_seed)
+
+    @staticmethod
+    def make_controller(config):
+        """Rate controller for a config, or None when the interval is left as it is"""
+        if not config.rate_control:
+            return None
+        return RateController(config.interval, config.rate_window)
+
+    def _move_along(self, gen, path, deadline, duration):
+        """Move through a path so that it would end on `deadline`, leaving the last point to the click
+
+        The path is squeezed into the time left when that is less than
+        `duration`, and steps that would run into the deadline are dropped.
+        """
+        clock = self.clock
+        sleep = self.sleep
+        mouse = self.mouse
+        steps = len(path) // 2
+        window = min(duration, deadline - clock())
+        if window <= 0 or steps < 2:
+            return
+        step = window / steps
+        begin = deadline - window
+        cutoff = deadline - MOVE_GUARD
+        for i in range(steps - 1):
+            at = begin + (i + 1) * step
+            now = clock()
+            if now >= cutoff or at >= cutoff:
+                return
+            if at > now:
+                sleep(at - now)
+                if self.generation != gen:
+                    return
+            mouse.position = (path[2 * i], path[2 * i + 1])
+
+    def _wait_start_delay(self, gen, delay):
+        end = self.clock() + delay
+        while self.generation == gen:
+            remaining = end - self.clock()
+            if remaining <= 0:
+                break
+            self.sleep(remaining)
+        self.is_delaying = False
+
+    def clicking_loop(self, gen):
+        """Main clicking loop with all features; runs while `gen` is the current generation"""
+        if self.config.start_delay > 0:
+            self._wait_start_delay(gen, self.config.start_delay)
+        start_delay = self.config.start_delay
+
+        config = self.config
+        if config.macro is not None:
+            self._run_macro(gen, config, start_delay)
+            return
+        if config.burst_size:
+            self._burst(gen, config, start_delay)
+            return
+        if config.trigger:
+            self._run_trigger(gen, config, start_delay)
+            return
+
+        clock = self.clock
+        scheduler = DeadlineScheduler(config.interval, overrun_policy=config.overrun_policy,
+                                      spin_threshold=self.spin_threshold, clock=clock, sleep=self.sleep,
+                                      sleep_until=self._sleep_until)
+        next_jitter = self.make_jitter(config).next
+        points = self.make_points(config)
+        next_point = points.next if points else None
+        mover = self.make_mover(config)
+        if mover is not None and points is not None and points.pattern != PATTERN_REGION:
+            # A fixed pattern visits the same pairs over and over, so generate them all up front
+            coords = points.coords
+            targets = list(zip(coords[0::2], coords[1::2]))
+            mover.prefetch(zip(targets, targets[1:] + targets[:1]))
+        controller = self.make_controller(config)
+        mouse = self.mouse
+        last_target = None
+        stats = self.stats
+        click_count = 0
+        # Anchored after the setup above, so it isn't taken out of the first interval
+        scheduler.start()
+        while self.generation == gen:
+            # Pick up a newly published config at the iteration boundary
+            if self.config is not config:
+                if self.config.jitter_key() != config.jitter_key():
+                    next_jitter = self.make_jitter(self.config).next
+                if self.config.pattern_key() != config.pattern_key():
+                    points = self.make_points(self.config)
+                    next_point = points.next if points else None
+                if self.config.move_key() != config.move_key():
+                    mover = self.make_mover(self.config)
+                if self.config.rate_key() != config.rate_key():
+                    controller = self.make_controller(self.config)
+                config = self.config
+                stats.target_cps = config.cps
+                scheduler.set_interval(controller.interval if controller else config.interval)
+                scheduler.overrun_policy = config.overrun_policy
+
+            # Check click limit
+            if config.click_limit and click_count >= config.click_limit:
+                with self._state:
+                    self._end_session(gen)
+                if self.on_stop:
+                    self.on_stop()
+                return
+
+            # Next pattern point, or the fixed position if enabled
+            jitter = next_jitter() * config.interval
+            target = next_point() if next_point is not None else config.position
+
+            # Glide towards it in the time before the deadline
+            if mover is not None and target is not None and target != last_target:
+                start = last_target or tuple(int(value) for value in mouse.position)
+                self._move_along(gen, mover.path(start, target), scheduler.next_deadline + jitter,
+                                 config.move_duration)
+
+            # Wait for the next deadline, with random variation applied to it
+            lateness = scheduler.wait(jitter)
+            if self.generation != gen:
+                break
+
+            if target is not None:
+                mouse.position = target
+                last_target = target
+
+            # Perform click(s)
+            started = clock()
+            mouse.click(config.mouse_button, config.clicks_per_tick)
+            stats.record_click(started, clock(), lateness)
+            stats.overruns = scheduler.overruns
+            stats.skipped = scheduler.skipped
+            if not click_count:
+                stats.start_latency = started - self._requested_at - start_delay
+            if controller is not None:
+                scheduler.set_interval(controller.update(started))
+                stats.rate_error = controller.error
+                stats.rate_correction = controller.correction
+
+            click_count += 1
+            self.click_count = click_count
+            if self.on_click:
+                self.on_click()
+
+        # Stopped from outside
+        stats.stop_latency = clock() - self._stop_requested_at
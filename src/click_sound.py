@@ -0,0 +1,237 @@
+"""
+Click sound - Click feedback played on its own audio thread
+A short sample is loaded (or synthesised) into memory once. Clicking only
+sets a flag; the audio thread collapses every click since its last sound
+into one, at most one per frame and max_rate per second, so the sound can
+never fall behind the clicks or hold up the GUI.
+"""
+
+import io
+import math
+import threading
+import time
+import wave
+from array import array
+
+try:
+    import sounddevice as sd
+except (ImportError, OSError):  # optional, and needs PortAudio
+    sd = None
+
+try:
+    import winsound
+except ImportError:  # Windows only
+    winsound = None
+
+# Most sounds per second, and the shortest gap between two of them
+DEFAULT_MAX_RATE = 20
+FRAME = 1 / 60  # seconds
+
+# Built-in click: a short decaying tone, as 16-bit mono
+SAMPLE_RATE = 44100
+CLICK_SECONDS = 0.008
+CLICK_HZ = 2000
+CLICK_AMPLITUDE = 12000
+
+# Audio the stream sink can hold before new sounds are dropped
+RING_SECONDS = 0.25
+
+
+class Sample:
+    """16-bit PCM audio held in memory"""
+
+    __slots__ = ("data", "rate", "channels")
+
+    def __init__(self, data, rate=SAMPLE_RATE, channels=1):
+        self.data = bytes(data)
+        self.rate = rate
+        self.channels = channels
+
+    @property
+    def frame_size(self):
+        return 2 * self.channels
+
+    def to_wav(self):
+        """The sample as the bytes of a WAV file"""
+        out = io.BytesIO()
+        with wave.open(out, "wb") as f:
+            f.setnchannels(self.channels)
+            f.setsampwidth(2)
+            f.setframerate(self.rate)
+            f.writeframes(self.data)
+        return out.getvalue()
+
+
+def synth_click(rate=SAMPLE_RATE, seconds=CLICK_SECONDS, hz=CLICK_HZ, amplitude=CLICK_AMPLITUDE):
+    """The built-in click sample"""
+    count = round(rate * seconds)
+    decay = count / 5
+    return Sample(array("h", (round(amplitude * math.exp(-i / decay) * math.sin(2 * math.pi * hz * i / rate))
+                              for i in range(count))).tobytes(), rate)
+
+
+def load_sample(path):
+    """Read a 16-bit PCM WAV file; raises ValueError for any other format"""
+    try:
+        with wave.open(path, "rb") as f:
+            if f.getsampwidth() != 2:
+                raise ValueError(f"{path}: click sounds must be 16-bit PCM")
+            return Sample(f.readframes(f.getnframes()), f.getframerate(), f.getnchannels())
+    except (wave.Error, EOFError) as e:
+        raise ValueError(f"{path}: {e}") from None
+
+
+class RingBuffer:
+    """Fixed-size byte FIFO between the audio thread and a sound card callback
+
+    Writes that don't fit are cut short rather than waiting; reads always
+    return the size asked for, padded with silence.
+    """
+
+    def __init__(self, capacity):
+        self._buffer = bytearray(capacity)
+        self.capacity = capacity
+        self._start = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def write(self, data):
+        """Append as much of data as fits; returns the number of bytes taken"""
+        with self._lock:
+            count = min(len(data), self.capacity - self._size)
+            end = (self._start + self._size) % self.capacity
+            first = min(count, self.capacity - end)
+            self._buffer[end:end + first] = data[:first]
+            self._buffer[:count - first] = data[first:count]
+            self._size += count
+        return count
+
+    def read(self, count):
+        """Take up to count bytes, padded with zeros to exactly count"""
+        with self._lock:
+            taken = min(count, self._size)
+            first = min(taken, self.capacity - self._start)
+            data = bytes(self._buffer[self._start:self._start + first]) + bytes(self._buffer[:taken - first])
+            self._start = (self._start + taken) % self.capacity
+            self._size -= taken
+        return data + bytes(count - taken)
+
+
+class NullSink:
+    """Plays nothing; counts the sounds it was asked to play"""
+
+    def __init__(self):
+        self.played = 0
+
+    def play(self):
+        self.played += 1
+
+    def close(self):
+        pass
+
+
+class StreamSink:
+    """Plays through a low-latency sounddevice output stream fed from a ring buffer"""
+
+    def __init__(self, sample):
+        if sd is None:
+            raise RuntimeError("Stream playback needs the sounddevice package")
+        self.sample = sample
+        self.ring = RingBuffer(round(sample.rate * RING_SECONDS) * sample.frame_size)
+        try:
+            self.stream = sd.RawOutputStream(samplerate=sample.rate, channels=sample.channels, dtype="int16",
+                                             latency="low", callback=self._callback)
+            self.stream.start()
+        except sd.PortAudioError as e:
+            raise RuntimeError(f"Can't open an audio stream: {e}") from e
+
+    def _callback(self, outdata, frames, time_info, status):
+        outdata[:] = self.ring.read(len(outdata))
+
+    def play(self):
+        self.ring.write(self.sample.data)
+
+    def close(self):
+        self.stream.stop()
+        self.stream.close()
+
+
+class WinsoundSink:
+    """Plays through winsound from memory; blocks the audio thread while the sample plays"""
+
+    def __init__(self, sample):
+        if winsound is None:
+            raise RuntimeError("winsound playback needs Windows")
+        self._wav = sample.to_wav()
+
+    def play(self):
+        winsound.PlaySound(self._wav, winsound.SND_MEMORY | winsound.SND_NODEFAULT)
+
+    def close(self):
+        pass
+
+
+def open_sink(sample):
+    """The first sink that can play here, or None if there is no way to play audio"""
+    for sink in (StreamSink, WinsoundSink):
+        try:
+            return sink(sample)
+        except RuntimeError:
+            continue
+    return None
+
+
+class ClickSoundMixer:
+    """Audio thread that turns any number of click notifications into paced sounds
+
+    trigger() is safe to call from the click thread on every click: it only
+    sets an event. Sounds are at least a frame and 1/max_rate seconds apart,
+    and every trigger in between is folded into the next one.
+    """
+
+    def __init__(self, sink, max_rate=DEFAULT_MAX_RATE, frame=FRAME, clock=time.perf_counter, sleep=time.sleep):
+        if max_rate <= 0:
+            raise ValueError(f"Max sound rate must be positive, got {max_rate}")
+        self.sink = sink
+        self.spacing = max(1 / max_rate, frame)
+        self.clock = clock
+        self.sleep = sleep
+        self.enabled = True
+        self._wanted = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def trigger(self, *args):
+        """Ask for a sound; takes and ignores any arguments, to fit any on_click callback"""
+        if self.enabled:
+            self._wanted.set()
+
+    def close(self):
+        """End the audio thread and close the sink"""
+        if not self._closed:
+            self._closed = True
+            self._wanted.set()
+            self._thread.join()
+            self.sink.close()
+
+    def _loop(self):
+        wanted = self._wanted
+        clock = self.clock
+        next_allowed = clock()
+        while True:
+            wanted.wait()
+            if self._closed:
+                return
+            # Clicks that arrive during this wait share the sound
+            remaining = next_allowed - clock()
+            if remaining > 0:
+                self.sleep(remaining)
+            wanted.clear()
+            if self._closed:
+                return
+            next_allowed = clock() + self.spacing
+            self.sink.play()
@@ -0,0 +1,339 @@
+"""
+Control server - Local JSON-lines API for driving the clicker from other programs
+An asyncio server on a Unix domain socket, on its own thread, so commands
+reach the engine directly rather than through the Tk main loop. Every
+request is one JSON object per line, such as {"id": 1, "cmd": "set", "cps": 50},
+and gets one reply line carrying the same id, "ok", and results or "error".
+Subscribers also get {"event": "stats", ...} lines until they unsubscribe.
+"""
+
+import asyncio
+import errno
+import json
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+import time
+from collections import deque
+
+from click_config import ClickConfig
+
+# Commands
+CMD_START = "start"
+CMD_STOP = "stop"
+CMD_TOGGLE = "toggle"
+CMD_STATUS = "status"
+CMD_STATS = "stats"
+CMD_SET = "set"  # any settings-file click setting, e.g. "cps", "random_variation", "fixed_x"
+CMD_PROFILE = "profile"  # "name": a profile from the settings file
+CMD_SUBSCRIBE = "subscribe"  # "interval": seconds between stats events
+CMD_UNSUBSCRIBE = "unsubscribe"
+
+# Keys of a request that aren't arguments
+ENVELOPE = ("id", "cmd")
+
+# Click settings "set" accepts: the ones the settings file holds
+SETTABLE = frozenset(ClickConfig().to_settings())
+
+DEFAULT_STATS_INTERVAL = 0.5  # seconds
+MIN_STATS_INTERVAL = 0.01
+
+# Longest request line accepted
+MAX_LINE = 64 * 1024
+
+
+def encode(message):
+    """One protocol line"""
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+def stats_snapshot(engine):
+    """Counters every stats reply and event carries; works for ClickEngine and EngineProcess"""
+    stats = engine.stats
+    p50, p99, worst = stats.error_percentiles()
+    return {
+        "running": engine.is_running,
+        "delaying": engine.is_delaying,
+        "clicks": engine.click_count,
+        "measured_cps": stats.measured_cps,
+        "overruns": stats.overruns,
+        "error_p50_us": p50,
+        "error_p99_us": p99,
+        "error_max_us": worst,
+    }
+
+
+class ControlServer:
+    """Serves the control API for one engine to any number of local clients
+
+    load_profile(name) returns the ClickConfig for a named profile and
+    raises KeyError for an unknown one; without it the profile command is
+    refused. The socket is only accessible to the current user.
+    """
+
+    def __init__(self, engine, path, load_profile=None, clock=time.perf_counter):
+        self.engine = engine
+        self.path = path
+        self.load_profile = load_profile
+        self.clock = clock
+        self.clients = 0
+        self._handlers = {
+            CMD_START: self._start,
+            CMD_STOP: self._stop,
+            CMD_TOGGLE: self._toggle,
+            CMD_STATUS: self._status,
+            CMD_STATS: self._stats,
+            CMD_SET: self._set,
+            CMD_PROFILE: self._profile,
+        }
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    # === Commands (event loop thread) ===
+
+    def handle(self, request):
+        """Run one decoded request and return the reply's results
+
+        Raises ValueError for a bad request, and passes on OSError or
+        RuntimeError from an engine that couldn't carry it out.
+        """
+        if not isinstance(request, dict):
+            raise ValueError("Requests must be JSON objects")
+        handler = self._handlers.get(request.get("cmd"))
+        if handler is None:
+            raise ValueError(f"Unknown command: {request.get('cmd')!r}")
+        return handler({key: value for key, value in request.items() if key not in ENVELOPE})
+
+    def _start(self, args):
+        self.engine.start(requested_at=self.clock())
+        return self._status(args)
+
+    def _stop(self, args):
+        self.engine.stop(requested_at=self.clock())
+        return self._status(args)
+
+    def _toggle(self, args):
+        if self.engine.is_running:
+            return self._stop(args)
+        return self._start(args)
+
+    def _status(self, args):
+        config = self.engine.config
+        status = {"running": self.engine.is_running, "delaying": self.engine.is_delaying,
+                  "clicks": self.engine.click_count, "config": config.to_settings()}
+        if config.macro is not None:
+            status["macro"] = config.macro.name
+        return status
+
+    def _stats(self, args):
+        return stats_snapshot(self.engine)
+
+    def _set(self, args):
+        unknown = set(args) - SETTABLE
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+        if not args:
+            raise ValueError("Nothing to set")
+        try:
+            self.engine.update(**args)
+        except (TypeError, OSError) as e:
+            raise ValueError(str(e)) from None
+        return self._status({})
+
+    def _profile(self, args):
+        if self.load_profile is None:
+            raise ValueError("No profiles are available")
+        try:
+            config = self.load_profile(args.get("name"))
+        except KeyError:
+            raise ValueError(f"Unknown profile: {args.get('name')!r}") from None
+        self.engine.configure(config)
+        return self._status({})
+
+    # === Connections ===
+
+    async def _client(self, reader, writer):
+        self.clients += 1
+        stream = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = {}
+                try:
+                    request = json.loads(line)
+                    reply["id"] = request.get("id") if isinstance(request, dict) else None
+                    cmd = request.get("cmd") if isinstance(request, dict) else None
+                    if cmd == CMD_SUBSCRIBE:
+                        interval = max(float(request.get("interval", DEFAULT_STATS_INTERVAL)), MIN_STATS_INTERVAL)
+                        if stream is not None:
+                            stream.cancel()
+                        stream = asyncio.ensure_future(self._stream_stats(writer, interval))
+                    elif cmd == CMD_UNSUBSCRIBE:
+                        if stream is not None:
+                            stream.cancel()
+                            stream = None
+                    else:
+                        reply.update(self.handle(request))
+                    reply["ok"] = True
+                except (ValueError, TypeError, OSError, RuntimeError) as e:
+                    # e.g. a profile's timings file can't be read, or the engine is closed
+                    reply.update(ok=False, error=str(e))
+                writer.write(encode(reply))
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass  # client went away, or sent a line longer than MAX_LINE
+        except asyncio.CancelledError:
+            pass  # server closing; finishing quietly keeps asyncio from logging the connection as failed
+        finally:
+            if stream is not None:
+                stream.cancel()
+            writer.close()
+            self.clients -= 1
+
+    async def _stream_stats(self, writer, interval):
+        """Send a stats event every interval seconds until cancelled"""
+        try:
+            while True:
+                event = stats_snapshot(self.engine)
+                event["event"] = CMD_STATS
+                writer.write(encode(event))
+                await writer.drain()
+                await asyncio.sleep(interval)
+        except ConnectionError:
+            pass
+
+    # === Server thread ===
+
+    def start(self):
+        """Listen on the socket from a background thread
+
+        Raises RuntimeError if the socket can't be opened here.
+        """
+        if not hasattr(asyncio, "start_unix_server"):
+            raise RuntimeError("The control API needs Unix domain sockets")
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            self._thread.join()
+            raise self._error
+
+    def _run(self):
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._open())
+        except OSError as e:
+            self._error = RuntimeError(f"Can't listen on {self.path}: {e.strerror or e}")
+            self._ready.set()
+            loop.close()
+            return
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    async def _open(self):
+        # A socket left behind by a process that died is in the way; a live
+        # server's socket, or anything else, isn't ours to remove
+        try:
+            if stat.S_ISSOCK(os.stat(self.path).st_mode):
+                probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    probe.connect(self.path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    os.unlink(self.path)
+                else:
+                    raise OSError(errno.EADDRINUSE, "another server is listening there")
+                finally:
+                    probe.close()
+        except FileNotFoundError:
+            pass
+        # Bound in a private directory and linked into place once it is
+        # owner-only, so there's no moment another user could connect; the
+        # umask is process-wide, so it is left alone
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        private = tempfile.mkdtemp(prefix=".", dir=os.path.dirname(os.path.abspath(self.path)))
+        try:
+            bound = os.path.join(private, "s")
+            sock.bind(bound)
+            os.chmod(bound, 0o600)
+            os.link(bound, self.path)  # unlike a rename, never replaces what is already there
+        except OSError:
+            sock.close()
+            raise
+        finally:
+            shutil.rmtree(private, ignore_errors=True)
+        self._server = await asyncio.start_unix_server(self._client, sock=sock, limit=MAX_LINE)
+
+    def close(self):
+        """Disconnect every client and remove the socket"""
+        if self._thread is not None and self._loop is not None and self._error is None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+
+class ControlClient:
+    """Blocking client for scripts, tests and the benchmark
+
+    Stats events that arrive while waiting for a reply are kept for next_event().
+    """
+
+    def __init__(self, path, timeout=5.0):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+        self._file = self.sock.makefile("rb")
+        self._events = deque()
+        self._next_id = 0
+
+    def request(self, cmd, **args):
+        """Send a command and return its reply; raises ValueError if the server refused it"""
+        self._next_id += 1
+        self.sock.sendall(encode(dict(args, id=self._next_id, cmd=cmd)))
+        while True:
+            message = self._read()
+            if "event" in message:
+                self._events.append(message)
+            elif message.get("id") == self._next_id:
+                if not message["ok"]:
+                    raise ValueError(message["error"])
+                return message
+
+    def next_event(self):
+        """The next stats event, waiting for it if none has arrived yet"""
+        if self._events:
+            return self._events.popleft()
+        while True:
+            message = self._read()
+            if "event" in message:
+                return message
+
+    def _read(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Control server closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self._file.close()
+        self.sock.close()
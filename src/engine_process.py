@@ -0,0 +1,283 @@
+"""
+Engine process - Run the click engine in a child process, away from the GUI's GIL
+Commands go to the child over a pipe; state and counters come back through
+a shared memory block that the GUI reads in place, so polling costs no IPC.
+"""
+
+import json
+import multiprocessing
+import threading
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+from click_config import ClickConfig
+from click_engine import ClickEngine
+from jitter import EMPIRICAL, load_timings
+from triggers import TRIGGER_TEMPLATE, load_template
+
+# Float64 slots in the shared block
+ACKED = 0  # sequence number of the last command the child has applied
+RUNNING = 1
+DELAYING = 2
+CLICKS = 3
+MEASURED_CPS = 4
+OVERRUNS = 5
+ERROR_P50 = 6  # interval error percentiles, in microseconds
+ERROR_P99 = 7
+ERROR_MAX = 8
+BUSY = 9  # the child's loop hasn't finished yet, which can be a while after RUNNING drops
+SLOT_COUNT = 10
+
+# How often the child republishes its state when no command arrives
+PUBLISH_INTERVAL = 0.02  # seconds
+
+# How long close() waits for the child before terminating it
+CLOSE_TIMEOUT = 2.0  # seconds
+
+# How long a stats request waits for a stopping loop, so a stuck one can't hold up the child's commands
+STATS_JOIN_TIMEOUT = 1.0  # seconds
+
+# Commands the parent waits on; the reply is the result, or the exception the command raised
+REPLY_COMMANDS = ("configure", "stats")
+
+
+class SharedCounters:
+    """Fixed block of float64 slots, read and written in place by both processes"""
+
+    SIZE = SLOT_COUNT * 8
+
+    def __init__(self, buf):
+        self.values = buf[:self.SIZE].cast("d")
+        self._published_clicks = -1
+
+    def __getitem__(self, slot):
+        return self.values[slot]
+
+    def publish(self, engine):
+        """Copy the engine's state and stats into the block"""
+        values = self.values
+        stats = engine.stats
+        values[RUNNING] = engine.is_running
+        values[BUSY] = engine.is_busy
+        values[DELAYING] = engine.is_delaying
+        values[CLICKS] = engine.click_count
+        values[MEASURED_CPS] = stats.measured_cps
+        values[OVERRUNS] = stats.overruns
+        # Percentiles scan the histogram, so only redo them after new clicks
+        if stats.clicks != self._published_clicks:
+            self._published_clicks = stats.clicks
+            values[ERROR_P50], values[ERROR_P99], values[ERROR_MAX] = stats.error_percentiles()
+
+    def release(self):
+        self.values.release()
+
+
+def serve(conn, shm_name, mouse_factory, config, precision=None, keyboard_factory=None, screen_factory=None):
+    """Child process body: apply commands from the pipe and keep the block current"""
+    shm = SharedMemory(name=shm_name)
+    counters = SharedCounters(shm.buf)
+    values = counters.values
+    options = precision.engine_options() if precision is not None else {}
+    keyboard = keyboard_factory() if keyboard_factory is not None else None
+    screen = screen_factory() if screen_factory is not None else None
+    engine = ClickEngine(mouse_factory(), config, keyboard=keyboard, screen=screen, **options)
+    engine.on_click = lambda: values.__setitem__(CLICKS, engine.click_count)
+    try:
+        while True:
+            if not conn.poll(PUBLISH_INTERVAL):
+                counters.publish(engine)
+                continue
+            seq, command, arg = conn.recv()
+            if command == "close":
+                break
+            reply = None
+            try:
+                if command == "start":
+                    engine.start(requested_at=arg)
+                elif command == "stop":
+                    engine.stop(requested_at=arg)
+                elif command == "configure":
+                    engine.configure(arg)
+                elif command == "stats":
+                    if not engine.is_running:
+                        engine.join(STATS_JOIN_TIMEOUT)  # let a stopping loop record its stop latency
+                    reply = engine.stats.to_dict()
+            except (ValueError, OSError, RuntimeError) as e:
+                reply = e
+            if command in REPLY_COMMANDS:
+                conn.send(reply)
+            # State first, so the parent never sees the ack without it
+            counters.publish(engine)
+            values[ACKED] = seq
+    except (EOFError, OSError):
+        pass  # parent went away
+    finally:
+        engine.close()
+        if screen is not None:
+            screen.close()
+        counters.release()
+        shm.close()
+
+
+class RemoteStats:
+    """The parts of ClickStats the GUI reads, served from the shared block"""
+
+    def __init__(self, engine):
+        self._engine = engine
+
+    @property
+    def measured_cps(self):
+        return self._engine.counters[MEASURED_CPS]
+
+    @property
+    def overruns(self):
+        return int(self._engine.counters[OVERRUNS])
+
+    def error_percentiles(self):
+        counters = self._engine.counters
+        return counters[ERROR_P50], counters[ERROR_P99], counters[ERROR_MAX]
+
+    def to_dict(self):
+        """Full session summary, fetched from the child"""
+        return self._engine.request("stats", reply=True)
+
+    def export_json(self, path):
+        """Write the session summary to a JSON file"""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+class EngineProcess:
+    """Drop-in for ClickEngine that runs the clicking loop in a child process
+
+    The mouse, keyboard and screen are built in the child from picklable
+    factories, such as what mouse_backends.backend_factory returns.
+    screen_size lets trigger regions be checked before they are sent, and a
+    PrecisionMode is applied to the child's click thread.
+    Timestamps come from time.perf_counter, the same monotonic clock in
+    both processes.
+    """
+
+    def __init__(self, mouse_factory, config=None, clock=time.perf_counter, precision=None,
+                 keyboard_factory=None, screen_factory=None, screen_size=None):
+        self.clock = clock
+        self.has_keyboard = keyboard_factory is not None
+        self.has_screen = screen_factory is not None
+        self.screen_size = screen_size
+        self.config = config if config is not None else ClickConfig()
+        self.stats = RemoteStats(self)
+        self._lock = threading.Lock()  # one sender at a time on the pipe
+        self._sent = 0
+        self._expected = (False, False)  # (is_running, is_delaying) after the last command sent
+        self._closed = False
+
+        self._shm = SharedMemory(create=True, size=SharedCounters.SIZE)
+        self.counters = SharedCounters(self._shm.buf)
+        # Spawn rather than fork: the parent has Tk and listener threads running
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self.process = context.Process(target=serve, daemon=True,
+                                       args=(child_conn, self._shm.name, mouse_factory, self.config,
+                                             precision, keyboard_factory, screen_factory))
+        self.process.start()
+        child_conn.close()
+
+    def request(self, command, arg=None, expected=None, reply=False):
+        """Send one command to the child, optionally waiting for its reply
+
+        An exception the child's engine raised for the command is raised here.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Engine is closed")
+            self._sent += 1
+            if expected is not None:
+                self._expected = expected
+            self._conn.send((self._sent, command, arg))
+            if reply:
+                result = self._conn.recv()
+                if isinstance(result, Exception):
+                    raise result
+                return result
+
+    # === ClickEngine control surface ===
+
+    def configure(self, config):
+        """Publish a complete new config snapshot"""
+        # Same early failures as ClickEngine for a recording that can't be
+        # loaded or a macro that can't run
+        if config.macro is not None and not self.has_keyboard and config.macro.needs_keyboard:
+            raise ValueError(f"Macro {config.macro.name!r} presses keys, but the engine has no keyboard")
+        if config.trigger and not self.has_screen:
+            raise ValueError("Screen triggers need a screen to capture, but the engine has none")
+        if config.jitter_distribution == EMPIRICAL and config.jitter_key() != self.config.jitter_key():
+            load_timings(config.jitter_timings_file)
+        if config.trigger and config.trigger_region_key() != self.config.trigger_region_key():
+            if self.screen_size is not None:
+                ClickEngine.check_trigger(config, self.screen_size)
+            elif config.trigger == TRIGGER_TEMPLATE:
+                load_template(config.trigger_template_file)
+        # Waits for the child, so whatever it still refuses is raised here
+        self.request("configure", config, reply=True)
+        self.config = config
+
+    def update(self, **changes):
+        """Publish a copy of the current config with some settings changed"""
+        self.configure(self.config.replace(**changes))
+
+    def start(self, requested_at=None):
+        at = self.clock() if requested_at is None else requested_at
+        self.request("start", at, expected=(True, self.config.start_delay > 0))
+
+    def stop(self, requested_at=None):
+        at = self.clock() if requested_at is None else requested_at
+        self.request("stop", at, expected=(False, False))
+
+    def _state(self):
+        # Until the child has caught up, report what the last command asked for
+        values = self.counters.values
+        if values[ACKED] < self._sent:
+            return self._expected
+        return bool(values[RUNNING]), bool(values[DELAYING])
+
+    @property
+    def is_running(self):
+        return self._state()[0]
+
+    @property
+    def is_delaying(self):
+        return self._state()[1]
+
+    @property
+    def click_count(self):
+        return int(self.counters[CLICKS])
+
+    def join(self, timeout=None):
+        """Wait until the current session has finished; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        values = self.counters.values
+        # Only a state published after the last command counts
+        while values[ACKED] < self._sent or values[BUSY]:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def close(self):
+        """Stop the child process and free the shared block"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            try:
+                self._conn.send((self._sent + 1, "close", None))
+            except OSError:
+                pass
+        self.process.join(CLOSE_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self._conn.close()
+        self.counters.release()
+        self._shm.close()
+        self._shm.unlink()
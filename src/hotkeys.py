@@ -0,0 +1,179 @@
+"""
+Hotkeys - Constant-time key chord bindings with handlers off the listener thread
+The input hook only looks the chord up in a dict and queues a match; the
+handlers run on a dispatch thread, so a slow handler can never hold up
+system input however many bindings there are.
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+
+log = logging.getLogger(__name__)
+
+# Available actions
+ACTION_TOGGLE = "toggle"  # press starts or stops clicking
+ACTION_HOLD = "hold"  # click while the chord is held down
+ACTION_CPS_UP = "cps_up"  # arg: CPS step
+ACTION_CPS_DOWN = "cps_down"  # arg: CPS step
+ACTION_PROFILE = "profile"  # arg: profile name
+ACTION_RUN_PROFILE = "run_profile"  # arg: profile name; clicks alongside the main clicker
+ACTION_EMERGENCY_STOP = "emergency_stop"
+ACTION_RECORD = "record"  # starts or stops recording input
+ACTION_REPLAY = "replay"  # arg: speed multiplier
+ACTIONS = (ACTION_TOGGLE, ACTION_HOLD, ACTION_CPS_UP, ACTION_CPS_DOWN, ACTION_PROFILE, ACTION_RUN_PROFILE,
+           ACTION_EMERGENCY_STOP, ACTION_RECORD, ACTION_REPLAY)
+
+# Actions that also fire when their key is released
+RELEASE_ACTIONS = (ACTION_HOLD,)
+
+# Modifier names recognised in chord strings
+MODIFIER_NAMES = ("ctrl", "shift", "alt", "cmd")
+
+
+def parse_chord(text):
+    """Split a chord like "ctrl+shift+f6" into (modifier names, key name)"""
+    parts = [part.strip().lower() for part in text.split("+")]
+    if not all(parts):
+        raise ValueError(f"Invalid hotkey: {text!r}")
+    *modifiers, key = parts
+    for name in modifiers:
+        if name not in MODIFIER_NAMES:
+            raise ValueError(f"Unknown modifier {name!r} in hotkey {text!r}")
+    if key in MODIFIER_NAMES:
+        raise ValueError(f"Hotkey {text!r} has no key besides modifiers")
+    return frozenset(modifiers), key
+
+
+@dataclass(frozen=True, slots=True)
+class Binding:
+    """One chord bound to an action"""
+
+    modifiers: frozenset  # modifier names that must be held
+    key: object  # hashable key as the listener reports it
+    action: str
+    arg: object = None
+
+
+class HotkeyDispatcher:
+    """Matches key events against a binding table and queues the handlers
+
+    Keys can be any hashable objects the listener reports; `modifiers` maps
+    the ones that act as modifiers to a name from MODIFIER_NAMES. Handlers
+    are called on the dispatch thread as handler(binding, pressed, at),
+    where `at` is the clock() time the key event arrived.
+    """
+
+    def __init__(self, modifiers=None, clock=time.perf_counter):
+        self.modifier_keys = dict(modifiers or {})
+        self.clock = clock
+        self.handlers = {}
+
+        # Replaced wholesale on every change, so the listener never sees a
+        # table mid-edit
+        self._bindings = {}  # (modifier names, key) -> Binding
+        self._held_modifiers = set()
+        self._modifiers = frozenset()  # kept in step with _held_modifiers
+        self._down = set()  # keys currently held, to ignore auto-repeat
+        self._releases = {}  # key -> Binding to fire again on release
+
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+
+    # === Binding table ===
+
+    def on(self, action, handler):
+        """Register the handler for an action"""
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown hotkey action: {action}")
+        self.handlers[action] = handler
+
+    def bind(self, modifiers, key, action, arg=None):
+        """Bind a chord to an action, replacing whatever it was bound to"""
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown hotkey action: {action}")
+        binding = Binding(frozenset(modifiers), key, action, arg)
+        bindings = dict(self._bindings)
+        bindings[binding.modifiers, key] = binding
+        self._bindings = bindings
+        return binding
+
+    def set_bindings(self, bindings):
+        """Replace the whole table with (modifiers, key, action, arg) entries"""
+        table = {}
+        for modifiers, key, action, arg in bindings:
+            if action not in ACTIONS:
+                raise ValueError(f"Unknown hotkey action: {action}")
+            binding = Binding(frozenset(modifiers), key, action, arg)
+            table[binding.modifiers, key] = binding
+        self._bindings = table
+
+    @property
+    def bindings(self):
+        return list(self._bindings.values())
+
+    # === Listener callbacks ===
+
+    def press(self, key):
+        """Key-down callback for the listener thread"""
+        name = self.modifier_keys.get(key)
+        if name is not None:
+            self._held_modifiers.add(name)
+            self._modifiers = frozenset(self._held_modifiers)
+            return
+        if key in self._down:
+            return  # auto-repeat
+        self._down.add(key)
+        binding = self._bindings.get((self._modifiers, key))
+        if binding is not None:
+            if binding.action in RELEASE_ACTIONS:
+                self._releases[key] = binding
+            self._queue.put((binding, True, self.clock()))
+
+    def release(self, key):
+        """Key-up callback for the listener thread"""
+        name = self.modifier_keys.get(key)
+        if name is not None:
+            self._held_modifiers.discard(name)
+            self._modifiers = frozenset(self._held_modifiers)
+            return
+        self._down.discard(key)
+        # Keyed by the key alone, so letting go of a modifier first still ends a hold
+        binding = self._releases.pop(key, None)
+        if binding is not None:
+            self._queue.put((binding, False, self.clock()))
+
+    # === Dispatch thread ===
+
+    def start(self):
+        """Start the dispatch thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Run whatever is already queued, then end the dispatch thread"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _dispatch_loop(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            self.dispatch(*event)
+
+    def dispatch(self, binding, pressed, at):
+        """Run the handler for one matched event"""
+        handler = self.handlers.get(binding.action)
+        if handler is None:
+            return
+        try:
+            handler(binding, pressed, at)
+        except Exception:
+            # A failing handler must not take the dispatch thread down with it
+            log.exception("Hotkey handler for %s failed", binding.action)
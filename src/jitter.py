@@ -0,0 +1,145 @@
+"""
+Jitter - Block-generated timing variation with pluggable distributions
+Samples are generated a block at a time (vectorized with NumPy when it is
+installed) so the clicking loop only reads the next value from a list.
+"""
+
+import json
+import math
+import random
+
+from optional import numpy
+
+# Available distributions
+UNIFORM = "uniform"
+GAUSSIAN = "gaussian"
+LOGNORMAL = "lognormal"
+EMPIRICAL = "empirical"
+DISTRIBUTIONS = (UNIFORM, GAUSSIAN, LOGNORMAL, EMPIRICAL)
+
+# Samples generated per refill; small enough that a pure-Python refill
+# fits in the slack before a 500 CPS deadline
+DEFAULT_BLOCK_SIZE = 512
+
+# Resolution of the inverse-CDF table built from recorded timings
+EMPIRICAL_TABLE_SIZE = 1024
+
+
+def load_timings(path):
+    """Load recorded click intervals (seconds) from a JSON list or one-per-line text file"""
+    with open(path, "r") as f:
+        text = f.read()
+    try:
+        timings = json.loads(text)
+    except ValueError:
+        timings = [line for line in text.split() if line]
+    return [float(t) for t in timings]
+
+
+def build_inverse_cdf(timings, size=EMPIRICAL_TABLE_SIZE):
+    """Turn recorded intervals into an inverse-CDF table of relative offsets
+
+    Entry i is the offset from the mean interval, as a fraction of it, at
+    quantile (i + 0.5) / size, so picking a random entry samples the recording.
+    """
+    timings = sorted(t for t in timings if t > 0)
+    if len(timings) < 2:
+        raise ValueError("Need at least two recorded intervals")
+    mean = sum(timings) / len(timings)
+    last = len(timings) - 1
+    table = []
+    for i in range(size):
+        # Linear interpolation between order statistics
+        pos = (i + 0.5) / size * last
+        lo = int(pos)
+        hi = min(lo + 1, last)
+        value = timings[lo] + (timings[hi] - timings[lo]) * (pos - lo)
+        table.append(value / mean - 1)
+    return table
+
+
+class JitterSource:
+    """Endless stream of relative timing offsets
+
+    Each sample is a fraction of the click interval, kept within ±spread, so
+    one source keeps working when the CPS changes mid-session.
+    """
+
+    def __init__(self, distribution=UNIFORM, spread=0.15, seed=None,
+                 block_size=DEFAULT_BLOCK_SIZE, timings=None, use_numpy=True):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown jitter distribution: {distribution}")
+        if distribution == EMPIRICAL and not timings:
+            raise ValueError("Empirical jitter needs recorded timings")
+        if not 0 <= spread < 1:
+            raise ValueError(f"Spread must be between 0 and 1, got {spread}")
+        if block_size < 1:
+            raise ValueError(f"Block size must be positive, got {block_size}")
+        self.distribution = distribution
+        self.spread = spread
+        self.seed = seed
+        self.block_size = block_size
+        self.table = build_inverse_cdf(timings) if distribution == EMPIRICAL else None
+
+        # Without variation every sample is 0, which needs no NumPy
+        np = numpy() if use_numpy and spread else None
+        if np is not None:
+            self._np_rng = np.random.default_rng(seed)
+            self._fill = self._fill_numpy
+        else:
+            self._rng = random.Random(seed)
+            self._fill = self._fill_python
+
+        # First block up front, so the first click doesn't pay for it
+        self._block = self._fill(block_size)
+        self._index = 0
+
+    def next(self):
+        """Next offset as a fraction of the interval"""
+        if self._index >= len(self._block):
+            self._block = self._fill(self.block_size)
+            self._index = 0
+        value = self._block[self._index]
+        self._index += 1
+        return value
+
+    def take(self, n):
+        """Next n offsets as a list"""
+        return [self.next() for _ in range(n)]
+
+    def _fill_python(self, n):
+        rng = self._rng
+        spread = self.spread
+        if spread == 0:
+            return [0.0] * n
+        if self.distribution == UNIFORM:
+            return [rng.uniform(-spread, spread) for _ in range(n)]
+        if self.distribution == GAUSSIAN:
+            # ±spread covers ±2 sigma; the rare tails are clipped
+            sigma = spread / 2
+            return [min(max(rng.gauss(0.0, sigma), -spread), spread) for _ in range(n)]
+        if self.distribution == LOGNORMAL:
+            # Right-skewed like human timing; median lands on the target interval
+            sigma = math.log1p(spread) / 2
+            return [min(max(math.exp(rng.gauss(0.0, sigma)) - 1, -spread), spread)
+                    for _ in range(n)]
+        table = self.table
+        size = len(table)
+        return [min(max(table[int(rng.random() * size)], -spread), spread) for _ in range(n)]
+
+    def _fill_numpy(self, n):
+        np = numpy()
+        rng = self._np_rng
+        spread = self.spread
+        if spread == 0:
+            return [0.0] * n
+        if self.distribution == UNIFORM:
+            samples = rng.uniform(-spread, spread, n)
+        elif self.distribution == GAUSSIAN:
+            samples = rng.normal(0.0, spread / 2, n)
+        elif self.distribution == LOGNORMAL:
+            samples = rng.lognormal(0.0, math.log1p(spread) / 2, n) - 1
+        else:
+            samples = np.asarray(self.table)[rng.integers(0, len(self.table), n)]
+        return np.clip(samples, -spread, spread).tolist()
+
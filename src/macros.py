@@ -0,0 +1,159 @@
+"""
+Macros - Step lists from the settings file compiled into flat opcode arrays
+Loops are unrolled and waits folded into each step's offset from the start
+of the macro, so the engine's macro loop only reads arrays and sleeps to
+absolute deadlines; it never looks anything up by name while running.
+"""
+
+from array import array
+
+# Opcodes
+OP_MOVE = 0  # arg_a: index of the (x, y) position in `objects`
+OP_CLICK = 1  # arg_a: index of the button, arg_b: click count
+OP_PRESS = 2  # arg_a: index of the button
+OP_RELEASE = 3  # arg_a: index of the button
+OP_KEY = 4  # arg_a: index of the key; pressed and released
+
+# Step types in the settings file
+STEP_OPS = {"move": OP_MOVE, "click": OP_CLICK, "press": OP_PRESS, "release": OP_RELEASE, "key": OP_KEY}
+STEP_WAIT = "wait"
+STEP_LOOP = "loop"
+
+BUTTON_NAMES = ("left", "middle", "right")
+
+# Most steps a macro can unroll to
+MAX_STEPS = 1_000_000
+
+
+class Macro:
+    """A compiled macro; step i runs offsets[i] seconds after the start of each repetition
+
+    `duration` includes trailing waits and is the spacing between
+    repetitions. `repeat` is how many times the macro runs (0 = until stopped).
+    """
+
+    __slots__ = ("name", "ops", "offsets", "arg_a", "arg_b", "objects", "duration", "repeat")
+
+    def __init__(self, name, ops, offsets, arg_a, arg_b, objects, duration, repeat=1):
+        self.name = name
+        self.ops = ops
+        self.offsets = offsets
+        self.arg_a = arg_a
+        self.arg_b = arg_b
+        self.objects = objects
+        self.duration = duration
+        self.repeat = repeat
+
+    def __len__(self):
+        return len(self.ops)
+
+    @property
+    def needs_keyboard(self):
+        return OP_KEY in self.ops
+
+    def __repr__(self):
+        return f"Macro({self.name!r}, steps={len(self)}, duration={self.duration:g}, repeat={self.repeat})"
+
+
+class _Compiler:
+    def __init__(self, resolve_key):
+        self.resolve_key = resolve_key
+        self.ops = array("B")
+        self.offsets = array("d")
+        self.arg_a = array("i")
+        self.arg_b = array("i")
+        self.objects = []
+        self._object_index = {}
+        self.time = 0.0
+
+    def intern(self, value):
+        """Index of value in the constant pool, adding it the first time"""
+        index = self._object_index.get(value)
+        if index is None:
+            index = self._object_index[value] = len(self.objects)
+            self.objects.append(value)
+        return index
+
+    def emit(self, op, a, b=0):
+        if len(self.ops) >= MAX_STEPS:
+            raise ValueError(f"Macro unrolls to more than {MAX_STEPS} steps")
+        self.ops.append(op)
+        self.offsets.append(self.time)
+        self.arg_a.append(a)
+        self.arg_b.append(b)
+
+    def steps(self, steps, path):
+        if not isinstance(steps, list):
+            raise ValueError(f"{path}: steps must be a list")
+        for number, step in enumerate(steps, 1):
+            where = f"{path} step {number}"
+            try:
+                self.step(step, where)
+            except (KeyError, TypeError) as e:
+                raise ValueError(f"{where}: invalid step {step!r} ({e})") from None
+
+    def step(self, step, where):
+        kind = step["op"]
+        if kind == STEP_WAIT:
+            seconds = float(step["seconds"])
+            if seconds < 0:
+                raise ValueError(f"{where}: wait can't be negative")
+            self.time += seconds
+        elif kind == STEP_LOOP:
+            times = int(step["times"])
+            if times < 0:
+                raise ValueError(f"{where}: loop count can't be negative")
+            for _ in range(times):
+                self.steps(step["steps"], where)
+        elif kind not in STEP_OPS:
+            raise ValueError(f"{where}: unknown step {kind!r}")
+        elif kind == "move":
+            self.emit(OP_MOVE, self.intern((int(step["x"]), int(step["y"]))))
+        elif kind == "key":
+            self.emit(OP_KEY, self.intern(self.resolve_key(step["key"])))
+        else:
+            button = step.get("button", "left")
+            if button not in BUTTON_NAMES:
+                raise ValueError(f"{where}: unknown button {button!r}")
+            count = int(step.get("count", 1))
+            if count < 1:
+                raise ValueError(f"{where}: click count must be at least 1")
+            self.emit(STEP_OPS[kind], self.intern(button), count)
+
+
+def compile_macro(name, macro, resolve_key=str):
+    """Compile a macro from the settings file
+
+    `macro` is {"steps": [...], "repeat": n}, where each step is one of
+    {"op": "move", "x": 10, "y": 20}, {"op": "click", "button": "left", "count": 2},
+    {"op": "press"/"release", "button": "left"}, {"op": "key", "key": "a"},
+    {"op": "wait", "seconds": 0.1} or {"op": "loop", "times": 3, "steps": [...]}.
+    Key names go through resolve_key. Raises ValueError if anything is wrong.
+    """
+    if not isinstance(macro, dict):
+        raise ValueError(f"Macro {name!r}: expected a dict with steps")
+    try:
+        repeat = int(macro.get("repeat", 1))
+    except TypeError:
+        raise ValueError(f"Macro {name!r}: repeat must be a number") from None
+    if repeat < 0:
+        raise ValueError(f"Macro {name!r}: repeat can't be negative")
+    compiler = _Compiler(resolve_key)
+    compiler.steps(macro.get("steps"), f"Macro {name!r}")
+    if not compiler.ops:
+        raise ValueError(f"Macro {name!r} has no steps that do anything")
+    if repeat != 1 and compiler.time <= 0:
+        raise ValueError(f"Macro {name!r} repeats, so it needs at least one wait")
+    return Macro(name, compiler.ops, compiler.offsets, compiler.arg_a, compiler.arg_b,
+                 tuple(compiler.objects), compiler.time, repeat)
+
+
+def compile_macros(macros, resolve_key=str):
+    """Compile every macro in a settings dict, leaving out the ones that don't compile"""
+    compiled = {}
+    for name, macro in macros.items():
+        try:
+            compiled[name] = compile_macro(name, macro, resolve_key)
+        except ValueError:
+            continue
+    return compiled
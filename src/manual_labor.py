@@ -5,17 +5,70 @@ Features: Adjustable CPS, multiple click modes, hotkeys, themes, and more
 
 import tkinter as tk
 from tkinter import ttk
-import threading
-import time
-import random
 import json
+import multiprocessing
 import os
-from pynput.mouse import Button, Controller as MouseController
-from pynput.keyboard import Key, Listener as KeyboardListener, KeyCode
+from pynput.mouse import Button, Listener as MouseListener
+from pynput.keyboard import Controller as KeyboardController, Key, Listener as KeyboardListener, KeyCode
+from click_config import ClickConfig
+from click_engine import ClickEngine
+from click_sound import DEFAULT_MAX_RATE, ClickSoundMixer, load_sample, open_sink, synth_click
+from control_server import ControlServer
+from engine_process import EngineProcess
+from hotkeys import (ACTION_CPS_DOWN, ACTION_CPS_UP, ACTION_EMERGENCY_STOP, ACTION_HOLD,
+                     ACTION_PROFILE, ACTION_RECORD, ACTION_REPLAY, ACTION_RUN_PROFILE, ACTION_TOGGLE,
+                     HotkeyDispatcher, parse_chord)
+from jitter import DISTRIBUTIONS
+from macros import compile_macros
+from mouse_backends import PYNPUT, UINPUT, PynputMouse, backend_factory
+from patterns import PATTERN_GRID, PATTERN_OFF, PATTERN_POINTS, PATTERN_REGION
+from precision import POLICY_FIFO, PrecisionMode
+from profile_engine import ProfileEngine
+from recording import InputRecorder, Replayer
+from screens import open_screen
+from triggers import (DEFAULT_TEMPLATE_SIZE, TRIGGER_OFF, TRIGGER_PIXEL, TRIGGER_TEMPLATE, save_template,
+                      watch_region)
 
 # Settings file path
 SETTINGS_FILE = os.path.join(os.path.expanduser("~"), ".manual_labor_settings.json")
 
+# Session stats export path
+STATS_FILE = os.path.join(os.path.expanduser("~"), ".manual_labor_stats.json")
+
+# Input recording path, for the record and replay hotkeys
+RECORDING_FILE = os.path.join(os.path.expanduser("~"), ".manual_labor_recording.mlr")
+
+# Control API socket, when control_api is on
+CONTROL_SOCKET = os.path.join(os.path.expanduser("~"), ".manual_labor.sock")
+
+# Template image taken by Capture when the template trigger is on
+TEMPLATE_FILE = os.path.join(os.path.expanduser("~"), ".manual_labor_template.ppm")
+
+# CPS slider range
+MIN_CPS = 1
+MAX_CPS = 500
+
+# Mouse button choices
+BUTTON_OPTIONS = {
+    "Left": Button.left,
+    "Right": Button.right,
+    "Middle": Button.middle,
+}
+
+# Click pattern choices
+PATTERN_OPTIONS = {
+    "Off": PATTERN_OFF,
+    "Points": PATTERN_POINTS,
+    "Grid": PATTERN_GRID,
+    "Region": PATTERN_REGION,
+}
+
+# Time to move the mouse before each capture
+CAPTURE_DELAY_MS = 2000
+
+# How often the counter and status are redrawn
+DEFAULT_REFRESH_HZ = 20
+
 # Available hotkeys
 HOTKEY_OPTIONS = {
     "F6": Key.f6,
@@ -25,46 +78,163 @@ HOTKEY_OPTIONS = {
     "F10": Key.f10,
 }
 
+# Keys the hotkey dispatcher treats as modifiers
+MODIFIER_KEYS = {
+    Key.ctrl: "ctrl", Key.ctrl_l: "ctrl", Key.ctrl_r: "ctrl",
+    Key.shift: "shift", Key.shift_l: "shift", Key.shift_r: "shift",
+    Key.alt: "alt", Key.alt_l: "alt", Key.alt_r: "alt",
+    Key.cmd: "cmd", Key.cmd_l: "cmd", Key.cmd_r: "cmd",
+}
+
+# Extra bindings on top of the main hotkey; CPS steps and profile names go in "arg"
+DEFAULT_BINDINGS = [
+    {"hotkey": "shift+esc", "action": ACTION_EMERGENCY_STOP},
+]
+
+# CPS change for a cps_up/cps_down binding without an arg
+DEFAULT_CPS_STEP = 5
+
+
+def resolve_key(name):
+    """pynput key for a key name from a hotkey string, such as f6 or a"""
+    if name in Key.__members__:
+        return Key[name]
+    if len(name) == 1:
+        return KeyCode.from_char(name)
+    raise ValueError(f"Unknown key: {name}")
+
+
+def replay_key(is_char, code):
+    """pynput key for a recorded key"""
+    return KeyCode.from_char(chr(code)) if is_char else KeyCode.from_vk(code)
+
 
 class AutoClicker:
     def __init__(self, root):
         self.root = root
         self.root.title("Manual Labor")
-        self.root.geometry("350x580")
+        self.root.geometry("350x830")
         self.root.resizable(False, False)
 
-        # State
-        self.is_running = False
-        self.click_count = 0
-        self.cps = 10
-        self.mouse_button = Button.left
-        self.mouse = MouseController()
-        self.click_thread = None
-
-        # Feature settings
-        self.random_variation = 15  # ±15% timing variation
-        self.click_limit = 0  # 0 = unlimited
+        # Clicking state and settings live in the engine
+        self.mouse = PynputMouse()
+        self.keyboard = KeyboardController()  # for macro key steps
+        self.mouse_button_name = "Left"
+        self.engine = ClickEngine(self.mouse, ClickConfig(mouse_button=Button.left), keyboard=self.keyboard)
+
+        # GUI-only settings
         self.hotkey = Key.f6
         self.hotkey_name = "F6"
-        self.use_fixed_position = False
-        self.fixed_x = 0
-        self.fixed_y = 0
-        self.double_click = False
-        self.start_delay = 0  # seconds
         self.hold_mode = False
-        self.is_holding = False
+        self.bindings = list(DEFAULT_BINDINGS)  # extra hotkeys, as saved in the settings
+        self.profiles = {}  # name -> click settings, for profile hotkeys
+        self.macros = {}  # name -> macro steps, as saved in the settings
+        self.compiled_macros = {}  # name -> Macro, for the ones that compiled
         self.dark_mode = False
         self.click_sound = False
+        self.click_sound_rate = DEFAULT_MAX_RATE  # most sounds per second
+        self.click_sound_file = ""  # 16-bit WAV to play instead of the built-in click
+        self.sound = None  # ClickSoundMixer, opened the first time click sound is on
+        self.refresh_hz = DEFAULT_REFRESH_HZ
+        self.engine_process = False  # run the engine in a child process
+        self.precision_mode = False  # real-time scheduling and absolute sleeps (Linux)
+        self.precision_cpu = None  # core to pin the click thread to
+        self.precision_policy = POLICY_FIFO
+        self.precision = None
+        self.mouse_backend = PYNPUT  # any name in mouse_backends.BACKENDS
+        self.control_api = False  # serve the JSON control API on CONTROL_SOCKET
+        self.screen = None  # region capture for triggers, opened when the settings have one
+        self.settings_warning = None  # shown once the GUI is up, for saved settings that couldn't apply
+
+        # What the status area currently shows
+        # Engine (is_running, is_delaying), recording, replaying, running profiles
+        self.shown_state = (False, False, False, False, ())
+        self.shown_count = 0
+        self.shown_config = None
+        self.capturing_points = False  # capture multiple is running
 
         # Load saved settings
         self.load_settings()
 
+        if self.precision_mode:
+            try:
+                self.precision = PrecisionMode(cpu=self.precision_cpu, policy=self.precision_policy)
+            except ValueError:
+                self.precision = PrecisionMode(cpu=self.precision_cpu)
+
+        # Clicks go through the chosen backend; the GUI keeps pynput for reading the pointer
+        mouse, mouse_factory = self.mouse, PynputMouse
+        if self.mouse_backend != PYNPUT:
+            options = {}
+            if self.mouse_backend == UINPUT:
+                options["screen_size"] = (self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+            try:
+                factory = backend_factory(self.mouse_backend, **options)
+                mouse, mouse_factory = factory(), factory
+            except (ValueError, RuntimeError):
+                pass  # Unknown backend, or it can't run here: stay on pynput
+
+        # Optionally move the clicking loop out of this process, so GUI work
+        # can't hold the GIL while a click is due
+        if self.engine_process:
+            if mouse is not self.mouse:
+                mouse.close()  # the child opens its own
+                mouse = self.mouse
+            self.engine = EngineProcess(mouse_factory, self.engine.config, precision=self.precision,
+                                        keyboard_factory=KeyboardController,
+                                        screen_factory=type(self.screen) if self.screen is not None else None,
+                                        screen_size=self.screen.size if self.screen is not None else None)
+        elif self.precision is not None or mouse is not self.mouse:
+            options = self.precision.engine_options() if self.precision is not None else {}
+            self.engine = ClickEngine(mouse, self.engine.config, keyboard=self.keyboard, screen=self.screen,
+                                      **options)
+        self.click_mouse = mouse
+
+        # Profiles bound to run_profile click on one thread of their own, but
+        # never while the main clicker or a replay is moving the same pointer
+        self.profile_engine = ProfileEngine(mouse, clock=self.engine.clock)
+        if self.click_sound:
+            self.open_sound()
+
         # Apply theme
         self.setup_styles()
 
         # Build the GUI
         self.setup_gui()
 
+        # Start the periodic counter/status refresh
+        self.refresh_tick()
+        if self.settings_warning:
+            self.status_label.config(text=self.settings_warning, foreground="red")
+            self.root.after(5000, self.show_status)
+
+        # Hotkey handlers run on the dispatcher's thread, never the listener's
+        self.hotkeys = HotkeyDispatcher(MODIFIER_KEYS, clock=self.engine.clock)
+        self.hotkeys.on(ACTION_TOGGLE, self.on_hotkey_toggle)
+        self.hotkeys.on(ACTION_HOLD, self.on_hotkey_hold)
+        self.hotkeys.on(ACTION_CPS_UP, self.on_hotkey_cps)
+        self.hotkeys.on(ACTION_CPS_DOWN, self.on_hotkey_cps)
+        self.hotkeys.on(ACTION_PROFILE, self.on_hotkey_profile)
+        self.hotkeys.on(ACTION_RUN_PROFILE, self.on_hotkey_run_profile)
+        self.hotkeys.on(ACTION_EMERGENCY_STOP, self.on_hotkey_emergency_stop)
+        self.hotkeys.on(ACTION_RECORD, self.on_hotkey_record)
+        self.hotkeys.on(ACTION_REPLAY, self.on_hotkey_replay)
+        self.recorder = None  # records input while set
+        self.mouse_listener = None  # feeds the recorder
+        self.replayer = None
+        self.apply_bindings()
+        self.hotkeys.start()
+
+        # Other programs can drive the engine too, without going through Tk
+        self.control = None
+        if self.control_api:
+            control = ControlServer(self.engine, CONTROL_SOCKET, load_profile=self.profile_config)
+            try:
+                control.start()
+                self.control = control
+            except RuntimeError:
+                pass  # no Unix sockets here, or the path is taken
+
         # Start keyboard listener
         self.keyboard_listener = KeyboardListener(
             on_press=self.on_key_press,
@@ -115,10 +285,10 @@ class AutoClicker:
         cps_row = ttk.Frame(cps_frame)
         cps_row.pack(fill=tk.X)
         ttk.Label(cps_row, text="Clicks per second:").pack(side=tk.LEFT)
-        self.cps_label = ttk.Label(cps_row, text=str(self.cps))
+        self.cps_label = ttk.Label(cps_row, text=f"{self.engine.config.cps:g}")
         self.cps_label.pack(side=tk.RIGHT)
 
-        self.cps_slider = ttk.Scale(cps_frame, from_=1, to=50, value=self.cps,
+        self.cps_slider = ttk.Scale(cps_frame, from_=MIN_CPS, to=MAX_CPS, value=self.engine.config.cps,
                                      orient=tk.HORIZONTAL, command=self.update_cps)
         self.cps_slider.pack(fill=tk.X)
 
@@ -126,13 +296,23 @@ class AutoClicker:
         var_row = ttk.Frame(cps_frame)
         var_row.pack(fill=tk.X, pady=(5, 0))
         ttk.Label(var_row, text="Timing variation ±%:").pack(side=tk.LEFT)
-        self.variation_label = ttk.Label(var_row, text=str(self.random_variation))
+        self.variation_label = ttk.Label(var_row, text=f"{self.engine.config.random_variation:g}")
         self.variation_label.pack(side=tk.RIGHT)
 
-        self.variation_slider = ttk.Scale(cps_frame, from_=0, to=30, value=self.random_variation,
+        self.variation_slider = ttk.Scale(cps_frame, from_=0, to=30, value=self.engine.config.random_variation,
                                           orient=tk.HORIZONTAL, command=self.update_variation)
         self.variation_slider.pack(fill=tk.X)
 
+        # Variation distribution
+        dist_row = ttk.Frame(cps_frame)
+        dist_row.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(dist_row, text="Variation shape:").pack(side=tk.LEFT)
+        self.distribution_var = tk.StringVar(value=self.engine.config.jitter_distribution)
+        dist_combo = ttk.Combobox(dist_row, textvariable=self.distribution_var,
+                                  values=list(DISTRIBUTIONS), state="readonly", width=10)
+        dist_combo.pack(side=tk.RIGHT)
+        dist_combo.bind("<<ComboboxSelected>>", self.update_distribution)
+
         # === Click Options ===
         options_frame = ttk.LabelFrame(main_frame, text="Click Options", padding="5")
         options_frame.pack(fill=tk.X, pady=5)
@@ -141,14 +321,14 @@ class AutoClicker:
         btn_row = ttk.Frame(options_frame)
         btn_row.pack(fill=tk.X, pady=2)
         ttk.Label(btn_row, text="Mouse button:").pack(side=tk.LEFT)
-        self.button_var = tk.StringVar(value="Left" if self.mouse_button == Button.left else "Right")
+        self.button_var = tk.StringVar(value=self.mouse_button_name)
         btn_combo = ttk.Combobox(btn_row, textvariable=self.button_var,
-                                  values=["Left", "Right", "Middle"], state="readonly", width=10)
+                                  values=list(BUTTON_OPTIONS.keys()), state="readonly", width=10)
         btn_combo.pack(side=tk.RIGHT)
         btn_combo.bind("<<ComboboxSelected>>", self.update_button)
 
         # Double click checkbox
-        self.double_var = tk.BooleanVar(value=self.double_click)
+        self.double_var = tk.BooleanVar(value=self.engine.config.double_click)
         ttk.Checkbutton(options_frame, text="Double click", variable=self.double_var,
                         command=self.update_double_click).pack(anchor=tk.W)
 
@@ -156,33 +336,67 @@ class AutoClicker:
         limit_row = ttk.Frame(options_frame)
         limit_row.pack(fill=tk.X, pady=2)
         ttk.Label(limit_row, text="Click limit (0=unlimited):").pack(side=tk.LEFT)
-        self.limit_var = tk.StringVar(value=str(self.click_limit))
+        self.limit_var = tk.StringVar(value=str(self.engine.config.click_limit))
         limit_entry = ttk.Entry(limit_row, textvariable=self.limit_var, width=8)
         limit_entry.pack(side=tk.RIGHT)
         limit_entry.bind("<FocusOut>", self.update_click_limit)
 
+        # Burst size
+        burst_row = ttk.Frame(options_frame)
+        burst_row.pack(fill=tk.X, pady=2)
+        ttk.Label(burst_row, text="Burst clicks (0=off):").pack(side=tk.LEFT)
+        self.burst_var = tk.StringVar(value=str(self.engine.config.burst_size))
+        burst_entry = ttk.Entry(burst_row, textvariable=self.burst_var, width=8)
+        burst_entry.pack(side=tk.RIGHT)
+        burst_entry.bind("<FocusOut>", self.update_burst_size)
+
         # === Position ===
         pos_frame = ttk.LabelFrame(main_frame, text="Position", padding="5")
         pos_frame.pack(fill=tk.X, pady=5)
 
-        self.pos_var = tk.BooleanVar(value=self.use_fixed_position)
+        self.pos_var = tk.BooleanVar(value=self.engine.config.use_fixed_position)
         ttk.Checkbutton(pos_frame, text="Use fixed position", variable=self.pos_var,
                         command=self.toggle_fixed_position).pack(anchor=tk.W)
 
         pos_row = ttk.Frame(pos_frame)
         pos_row.pack(fill=tk.X, pady=2)
         ttk.Label(pos_row, text="X:").pack(side=tk.LEFT)
-        self.x_var = tk.StringVar(value=str(self.fixed_x))
-        self.x_entry = ttk.Entry(pos_row, textvariable=self.x_var, width=6, state="disabled")
+        pos_state = "normal" if self.engine.config.use_fixed_position else "disabled"
+        self.x_var = tk.StringVar(value=str(self.engine.config.fixed_x))
+        self.x_entry = ttk.Entry(pos_row, textvariable=self.x_var, width=6, state=pos_state)
         self.x_entry.pack(side=tk.LEFT, padx=(0, 10))
         ttk.Label(pos_row, text="Y:").pack(side=tk.LEFT)
-        self.y_var = tk.StringVar(value=str(self.fixed_y))
-        self.y_entry = ttk.Entry(pos_row, textvariable=self.y_var, width=6, state="disabled")
+        self.y_var = tk.StringVar(value=str(self.engine.config.fixed_y))
+        self.y_entry = ttk.Entry(pos_row, textvariable=self.y_var, width=6, state=pos_state)
         self.y_entry.pack(side=tk.LEFT)
+        # Applied when committed rather than per keystroke, as a trigger checks (and may load) its region
+        for entry in (self.x_entry, self.y_entry):
+            entry.bind("<FocusOut>", self.update_position)
+            entry.bind("<Return>", self.update_position)
 
-        self.capture_btn = ttk.Button(pos_row, text="Capture", command=self.capture_position, state="disabled")
+        self.capture_btn = ttk.Button(pos_row, text="Capture", command=self.capture_position, state=pos_state)
         self.capture_btn.pack(side=tk.RIGHT)
 
+        # Click pattern
+        pattern_row = ttk.Frame(pos_frame)
+        pattern_row.pack(fill=tk.X, pady=2)
+        ttk.Label(pattern_row, text="Pattern:").pack(side=tk.LEFT)
+        pattern_names = {value: name for name, value in PATTERN_OPTIONS.items()}
+        self.pattern_var = tk.StringVar(value=pattern_names[self.engine.config.pattern])
+        pattern_combo = ttk.Combobox(pattern_row, textvariable=self.pattern_var,
+                                     values=list(PATTERN_OPTIONS.keys()), state="readonly", width=10)
+        pattern_combo.pack(side=tk.RIGHT)
+        pattern_combo.bind("<<ComboboxSelected>>", self.update_pattern)
+
+        points_row = ttk.Frame(pos_frame)
+        points_row.pack(fill=tk.X, pady=2)
+        self.points_label = ttk.Label(points_row, text=f"Points: {len(self.engine.config.pattern_points)}")
+        self.points_label.pack(side=tk.LEFT)
+        ttk.Button(points_row, text="Clear", command=self.clear_points).pack(side=tk.RIGHT)
+        self.capture_multi_btn = ttk.Button(points_row, text="Capture multiple",
+                                            command=self.toggle_capture_multiple)
+        self.capture_multi_btn.pack(side=tk.RIGHT, padx=2)
+
         # === Hotkey & Delay ===
         control_frame = ttk.LabelFrame(main_frame, text="Controls", padding="5")
         control_frame.pack(fill=tk.X, pady=5)
@@ -206,7 +420,7 @@ class AutoClicker:
         delay_row = ttk.Frame(control_frame)
         delay_row.pack(fill=tk.X, pady=2)
         ttk.Label(delay_row, text="Start delay (seconds):").pack(side=tk.LEFT)
-        self.delay_var = tk.StringVar(value=str(self.start_delay))
+        self.delay_var = tk.StringVar(value=f"{self.engine.config.start_delay:g}")
         delay_entry = ttk.Entry(delay_row, textvariable=self.delay_var, width=6)
         delay_entry.pack(side=tk.RIGHT)
         delay_entry.bind("<FocusOut>", self.update_delay)
@@ -223,6 +437,19 @@ class AutoClicker:
         ttk.Checkbutton(extras_frame, text="Dark mode", variable=self.dark_var,
                         command=self.toggle_dark_mode).pack(anchor=tk.W)
 
+        # === Performance ===
+        perf_frame = ttk.LabelFrame(main_frame, text="Performance", padding="5")
+        perf_frame.pack(fill=tk.X, pady=5)
+
+        self.measured_label = ttk.Label(perf_frame, text="Measured CPS: -")
+        self.measured_label.pack(anchor=tk.W)
+        self.error_label = ttk.Label(perf_frame, text="Interval error p50/p99/max: -")
+        self.error_label.pack(anchor=tk.W)
+        self.overrun_label = ttk.Label(perf_frame, text="Overruns: 0")
+        self.overrun_label.pack(anchor=tk.W)
+        self.precision_label = ttk.Label(perf_frame, text=f"Precision: {self.describe_precision()}")
+        self.precision_label.pack(anchor=tk.W)
+
         # === Status ===
         status_frame = ttk.Frame(main_frame)
         status_frame.pack(fill=tk.X, pady=10)
@@ -231,7 +458,8 @@ class AutoClicker:
                                        style="Status.TLabel", foreground="red")
         self.status_label.pack()
 
-        self.counter_label = ttk.Label(status_frame, text="Clicks: 0")
+        self.shown_count = self.engine.click_count
+        self.counter_label = ttk.Label(status_frame, text=f"Clicks: {self.shown_count}")
         self.counter_label.pack()
 
         # Start/Stop button
@@ -239,77 +467,209 @@ class AutoClicker:
                                          command=self.toggle_clicking)
         self.toggle_button.pack(pady=5, ipadx=20, ipady=5)
 
-        # Save button
-        ttk.Button(main_frame, text="Save Settings", command=self.save_settings).pack(pady=2)
+        # Save buttons
+        save_row = ttk.Frame(main_frame)
+        save_row.pack(pady=2)
+        ttk.Button(save_row, text="Save Settings", command=self.save_settings).pack(side=tk.LEFT, padx=2)
+        ttk.Button(save_row, text="Export Stats", command=self.export_stats).pack(side=tk.LEFT, padx=2)
 
         # Hint
         ttk.Label(main_frame, text=f"Press {self.hotkey_name} to toggle",
                   font=("Arial", 8), foreground="gray").pack()
 
     def update_cps(self, value):
-        self.cps = int(float(value))
-        self.cps_label.config(text=str(self.cps))
+        self.engine.update(cps=int(float(value)))
+        self.cps_label.config(text=f"{self.engine.config.cps:g}")
 
     def update_variation(self, value):
-        self.random_variation = int(float(value))
-        self.variation_label.config(text=str(self.random_variation))
+        self.engine.update(random_variation=int(float(value)))
+        self.variation_label.config(text=f"{self.engine.config.random_variation:g}")
+
+    def update_distribution(self, event=None):
+        try:
+            self.engine.update(jitter_distribution=self.distribution_var.get())
+        except (ValueError, OSError) as e:
+            self.distribution_var.set(self.engine.config.jitter_distribution)
+            self.status_label.config(text=f"Variation: {e}", foreground="red")
 
     def update_button(self, event=None):
-        btn = self.button_var.get()
-        if btn == "Left":
-            self.mouse_button = Button.left
-        elif btn == "Right":
-            self.mouse_button = Button.right
-        else:
-            self.mouse_button = Button.middle
+        self.mouse_button_name = self.button_var.get()
+        self.engine.update(mouse_button=BUTTON_OPTIONS[self.mouse_button_name])
 
     def update_double_click(self):
-        self.double_click = self.double_var.get()
+        self.engine.update(double_click=self.double_var.get())
 
     def update_click_limit(self, event=None):
         try:
-            self.click_limit = int(self.limit_var.get())
+            self.engine.update(click_limit=int(self.limit_var.get()))
         except ValueError:
-            self.click_limit = 0
+            self.engine.update(click_limit=0)
             self.limit_var.set("0")
 
+    def update_burst_size(self, event=None):
+        try:
+            self.engine.update(burst_size=int(self.burst_var.get()))
+        except ValueError:
+            self.engine.update(burst_size=0)
+            self.burst_var.set("0")
+
     def toggle_fixed_position(self):
-        self.use_fixed_position = self.pos_var.get()
-        state = "normal" if self.use_fixed_position else "disabled"
+        self.engine.update(use_fixed_position=self.pos_var.get())
+        state = "normal" if self.engine.config.use_fixed_position else "disabled"
         self.x_entry.config(state=state)
         self.y_entry.config(state=state)
         self.capture_btn.config(state=state)
 
+    def update_position(self, event=None):
+        """Push the X/Y entries to the engine, ignoring incomplete input"""
+        try:
+            x, y = int(self.x_var.get()), int(self.y_var.get())
+        except ValueError:
+            return
+        try:
+            self.engine.update(fixed_x=x, fixed_y=y)
+        except (ValueError, OSError) as e:
+            # e.g. off the screen, or a trigger template that can't be read
+            self.status_label.config(text=f"Position: {e}", foreground="red")
+
     def capture_position(self):
         """Capture current mouse position after 2 seconds"""
         self.capture_btn.config(text="Move mouse...")
-        self.root.after(2000, self._do_capture)
+        self.root.after(CAPTURE_DELAY_MS, self._do_capture)
 
     def _do_capture(self):
         pos = self.mouse.position
-        self.fixed_x = int(pos[0])
-        self.fixed_y = int(pos[1])
-        self.x_var.set(str(self.fixed_x))
-        self.y_var.set(str(self.fixed_y))
+        self.x_var.set(str(int(pos[0])))
+        self.y_var.set(str(int(pos[1])))
+        self.update_position()
+        self.capture_trigger(int(pos[0]), int(pos[1]))
         self.capture_btn.config(text="Capture")
 
+    def capture_trigger(self, x, y):
+        """Take the pixel or template trigger's target from the screen at the captured position"""
+        config = self.engine.config
+        if config.trigger not in (TRIGGER_PIXEL, TRIGGER_TEMPLATE):
+            return
+        # A screen of its own, so this never captures at the same time as the click thread
+        screen = open_screen()
+        if screen is None:
+            self.status_label.config(text="Trigger: can't read the screen", foreground="red")
+            return
+        try:
+            if config.trigger == TRIGGER_PIXEL:
+                self.engine.update(trigger_color=screen.capture(x, y, 1, 1).pixel(0, 0))
+            else:
+                # The whole rect when one is set, as the trigger watches; otherwise a square around the pointer
+                if config.trigger_rect is not None:
+                    region = watch_region(config.trigger_rect, None)
+                else:
+                    region = watch_region(None, (x, y), (DEFAULT_TEMPLATE_SIZE, DEFAULT_TEMPLATE_SIZE))
+                save_template(screen.capture(*region), TEMPLATE_FILE)
+                self.engine.update(trigger_template_file=TEMPLATE_FILE)
+        except (ValueError, RuntimeError, OSError) as e:
+            self.status_label.config(text=f"Trigger: {e}", foreground="red")
+        finally:
+            screen.close()
+
+    def update_pattern(self, event=None):
+        try:
+            self.engine.update(pattern=PATTERN_OPTIONS[self.pattern_var.get()])
+        except ValueError as e:
+            self.show_config()
+            self.status_label.config(text=f"Pattern: {e}", foreground="red")
+
+    def toggle_capture_multiple(self):
+        """Capture the mouse position every 2 seconds until pressed again"""
+        self.capturing_points = not self.capturing_points
+        if self.capturing_points:
+            self.capture_multi_btn.config(text="Stop capturing")
+            self.root.after(CAPTURE_DELAY_MS, self._capture_point)
+        else:
+            self.capture_multi_btn.config(text="Capture multiple")
+
+    def _capture_point(self):
+        if not self.capturing_points:
+            return
+        x, y = self.mouse.position
+        self.engine.update(pattern_points=self.engine.config.pattern_points + ((int(x), int(y)),))
+        self.show_config()
+        self.root.bell()
+        self.root.after(CAPTURE_DELAY_MS, self._capture_point)
+
+    def clear_points(self):
+        try:
+            self.engine.update(pattern_points=())
+        except ValueError:
+            self.engine.update(pattern=PATTERN_OFF, pattern_points=())  # the pattern needs points
+        self.show_config()
+
     def update_hotkey(self, event=None):
         self.hotkey_name = self.hotkey_var.get()
         self.hotkey = HOTKEY_OPTIONS[self.hotkey_name]
         self.toggle_button.config(text=f"Start ({self.hotkey_name})")
+        self.apply_bindings()
 
     def update_hold_mode(self):
         self.hold_mode = self.hold_var.get()
+        self.apply_bindings()
+
+    def apply_bindings(self):
+        """Rebuild the hotkey table from the main hotkey and the saved bindings
+
+        Saved bindings that can't be parsed are left out, as are profile
+        bindings naming a profile that doesn't exist; those are reported in
+        the status area rather than failing when the key is pressed.
+        """
+        action = ACTION_HOLD if self.hold_mode else ACTION_TOGGLE
+        table = [((), self.hotkey, action, None)]
+        unknown = []
+        for entry in self.bindings:
+            try:
+                modifiers, name = parse_chord(entry["hotkey"])
+                if entry["action"] in (ACTION_PROFILE, ACTION_RUN_PROFILE) and entry.get("arg") not in self.profiles:
+                    unknown.append(f"{entry['hotkey']} ({entry.get('arg')})")
+                    continue
+                table.append((modifiers, resolve_key(name), entry["action"], entry.get("arg")))
+            except (KeyError, TypeError, ValueError, AttributeError):
+                continue
+        self.hotkeys.set_bindings(table)
+        if unknown:
+            self.status_label.config(text=f"Unknown profile for {', '.join(unknown)}", foreground="red")
+            self.root.after(5000, self.show_status)
 
     def update_delay(self, event=None):
         try:
-            self.start_delay = float(self.delay_var.get())
+            self.engine.update(start_delay=float(self.delay_var.get()))
         except ValueError:
-            self.start_delay = 0
+            self.engine.update(start_delay=0)
             self.delay_var.set("0")
 
     def update_sound(self):
         self.click_sound = self.sound_var.get()
+        if self.click_sound and self.sound is None:
+            self.open_sound()
+        if self.sound is not None:
+            self.sound.enabled = self.click_sound
+
+    def open_sound(self):
+        """Start the audio thread and have the click threads trigger it directly
+
+        Leaves self.sound unset if there is no way to play audio here, so
+        the refresh tick falls back to the Tk bell.
+        """
+        sample = synth_click()
+        if self.click_sound_file:
+            try:
+                sample = load_sample(self.click_sound_file)
+            except (OSError, ValueError):
+                pass  # keep the built-in click
+        sink = open_sink(sample)
+        if sink is None:
+            return
+        self.sound = ClickSoundMixer(sink, max_rate=self.click_sound_rate)
+        self.profile_engine.on_click = self.sound.trigger
+        if isinstance(self.engine, ClickEngine):
+            self.engine.on_click = self.sound.trigger
 
     def toggle_dark_mode(self):
         self.dark_mode = self.dark_var.get()
@@ -320,90 +680,230 @@ class AutoClicker:
         self.setup_gui()
 
     def toggle_clicking(self):
-        if self.is_running:
+        if self.engine.is_running:
             self.stop_clicking()
         else:
             self.start_clicking()
 
     def start_clicking(self):
-        """Start the auto clicker with optional delay"""
-        if self.start_delay > 0:
-            self.status_label.config(text=f"Starting in {self.start_delay}s...", foreground="orange")
-            self.root.after(int(self.start_delay * 1000), self._do_start)
-        else:
-            self._do_start()
-
-    def _do_start(self):
-        self.is_running = True
-        self.click_count = 0
-        self.status_label.config(text="Status: Running", foreground="green")
-        self.toggle_button.config(text=f"Stop ({self.hotkey_name})")
-        self.click_thread = threading.Thread(target=self.clicking_loop, daemon=True)
-        self.click_thread.start()
+        """Start the auto clicker; the engine waits out any start delay"""
+        self.profile_engine.stop_all()
+        self.engine.start()
+        self.show_status()
 
     def stop_clicking(self):
-        self.is_running = False
-        self.status_label.config(text="Status: Stopped", foreground="red")
-        self.toggle_button.config(text=f"Start ({self.hotkey_name})")
-
-    def clicking_loop(self):
-        """Main clicking loop with all features"""
-        while self.is_running:
-            # Check click limit
-            if self.click_limit > 0 and self.click_count >= self.click_limit:
-                self.root.after(0, self.stop_clicking)
-                break
-
-            # Move to fixed position if enabled
-            if self.use_fixed_position:
-                try:
-                    self.fixed_x = int(self.x_var.get())
-                    self.fixed_y = int(self.y_var.get())
-                    self.mouse.position = (self.fixed_x, self.fixed_y)
-                except ValueError:
-                    pass
-
-            # Perform click(s)
-            clicks = 2 if self.double_click else 1
-            for _ in range(clicks):
-                self.mouse.click(self.mouse_button)
-
-            self.click_count += 1
-
-            # Play sound if enabled
-            if self.click_sound:
-                self.root.after(0, lambda: self.root.bell())
-
-            # Update counter
-            self.root.after(0, self.update_counter)
-
-            # Calculate delay with random variation
-            base_delay = 1 / self.cps
-            if self.random_variation > 0:
-                variation = base_delay * (self.random_variation / 100)
-                delay = base_delay + random.uniform(-variation, variation)
-                delay = max(0.001, delay)  # Ensure positive delay
-            else:
-                delay = base_delay
-
-            time.sleep(delay)
-
-    def update_counter(self):
-        self.counter_label.config(text=f"Clicks: {self.click_count}")
+        self.engine.stop()
+        self.show_status()
+
+    def show_status(self):
+        """Show the engine's current state in the status area"""
+        self.shown_state = self.current_state()
+        if self.recorder is not None:
+            self.status_label.config(text="Recording input...", foreground="orange")
+        elif self.replayer is not None and self.replayer.is_running:
+            self.status_label.config(text="Replaying recording...", foreground="green")
+        elif self.engine.is_delaying:
+            self.status_label.config(text=f"Starting in {self.engine.config.start_delay:g}s...",
+                                     foreground="orange")
+        elif self.engine.is_running and self.engine.config.macro is not None:
+            self.status_label.config(text=f"Status: Running {self.engine.config.macro.name}", foreground="green")
+        elif self.engine.is_running:
+            self.status_label.config(text="Status: Running", foreground="green")
+        elif self.profile_engine.is_running:
+            self.status_label.config(text=f"Status: Running {', '.join(self.profile_engine.active())}",
+                                     foreground="green")
+        elif getattr(self.engine, "error", None) is not None:
+            self.status_label.config(text=f"Status: Stopped: {self.engine.error}", foreground="red")
+        else:
+            self.status_label.config(text="Status: Stopped", foreground="red")
+        action = "Stop" if self.engine.is_running else "Start"
+        self.toggle_button.config(text=f"{action} ({self.hotkey_name})")
+
+    def refresh_tick(self):
+        """Redraw the counter and status from the engine at a fixed rate
+
+        The click thread never touches Tk; this tick is the only thing that
+        reads its counter, so the UI cost doesn't grow with the click rate.
+        """
+        count = self.engine.click_count
+        if count != self.shown_count:
+            # Without an audio thread, one bell per tick however many clicks
+            # happened since the last one
+            if self.click_sound and count > self.shown_count:
+                if self.sound is None:
+                    self.root.bell()
+                elif not isinstance(self.engine, ClickEngine):
+                    self.sound.trigger()  # the engine process can't reach the audio thread itself
+            self.shown_count = count
+            self.counter_label.config(text=f"Clicks: {count}")
+            self.update_stats_panel()
+
+        # Config published off the Tk thread, e.g. by a CPS or profile hotkey
+        if self.engine.config is not self.shown_config:
+            self.show_config()
+
+        # Start delay over, engine stopped itself (click limit reached), or a
+        # recording, replay or profile started or ended
+        if self.current_state() != self.shown_state:
+            self.show_status()
+
+        self.root.after(int(1000 / self.refresh_hz), self.refresh_tick)
+
+    def current_state(self):
+        replaying = self.replayer is not None and self.replayer.is_running
+        return (self.engine.is_running, self.engine.is_delaying, self.recorder is not None, replaying,
+                tuple(self.profile_engine.active()))
+
+    def show_config(self):
+        """Bring the settings widgets in line with the engine's config
+
+        Only widgets that differ are touched, since some of them publish their
+        value back to the engine when set.
+        """
+        config = self.engine.config
+        if self.cps_slider.get() != config.cps:
+            self.cps_slider.set(config.cps)
+            self.cps_label.config(text=f"{config.cps:g}")
+        if self.variation_slider.get() != config.random_variation:
+            self.variation_slider.set(config.random_variation)
+            self.variation_label.config(text=f"{config.random_variation:g}")
+        if self.distribution_var.get() != config.jitter_distribution:
+            self.distribution_var.set(config.jitter_distribution)
+        if self.double_var.get() != config.double_click:
+            self.double_var.set(config.double_click)
+        if self.limit_var.get() != str(config.click_limit):
+            self.limit_var.set(str(config.click_limit))
+        if self.burst_var.get() != str(config.burst_size):
+            self.burst_var.set(str(config.burst_size))
+        if self.pos_var.get() != config.use_fixed_position:
+            self.pos_var.set(config.use_fixed_position)
+            self.toggle_fixed_position()
+        if PATTERN_OPTIONS[self.pattern_var.get()] != config.pattern:
+            self.pattern_var.set(next(name for name, value in PATTERN_OPTIONS.items() if value == config.pattern))
+        self.points_label.config(text=f"Points: {len(config.pattern_points)}")
+        if self.x_var.get() != str(config.fixed_x):
+            self.x_var.set(str(config.fixed_x))
+        if self.y_var.get() != str(config.fixed_y):
+            self.y_var.set(str(config.fixed_y))
+        if self.delay_var.get() != f"{config.start_delay:g}":
+            self.delay_var.set(f"{config.start_delay:g}")
+        self.shown_config = self.engine.config
+
+    def update_stats_panel(self):
+        stats = self.engine.stats
+        p50, p99, worst = stats.error_percentiles()
+        self.measured_label.config(text=f"Measured CPS: {stats.measured_cps:.1f}")
+        self.error_label.config(
+            text=f"Interval error p50/p99/max: {p50 / 1000:.2f} / {p99 / 1000:.2f} / {worst / 1000:.2f} ms")
+        self.overrun_label.config(text=f"Overruns: {stats.overruns}")
+        self.precision_label.config(text=f"Precision: {self.describe_precision()}")
+
+    def describe_precision(self):
+        if self.precision is None:
+            return "off"
+        if self.engine_process:
+            return "in engine process"
+        return self.precision.describe()
+
+    def export_stats(self):
+        """Save the current session's stats as JSON"""
+        try:
+            self.engine.stats.export_json(STATS_FILE)
+            self.status_label.config(text="Stats exported!", foreground="blue")
+        except Exception as e:
+            self.status_label.config(text=f"Export failed: {e}", foreground="red")
 
     def on_key_press(self, key):
-        if key == self.hotkey:
-            if self.hold_mode:
-                if not self.is_holding:
-                    self.is_holding = True
-                    self.root.after(0, self.start_clicking)
-            else:
-                self.root.after(0, self.toggle_clicking)
+        """Listener callback: a table lookup and an enqueue, nothing else"""
+        key = self.keyboard_listener.canonical(key)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.on_press(key)
+        self.hotkeys.press(key)
 
     def on_key_release(self, key):
-        if key == self.hotkey and self.hold_mode:
-            self.is_holding = False
-            self.root.after(0, self.stop_clicking)
+        key = self.keyboard_listener.canonical(key)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.on_release(key)
+        self.hotkeys.release(key)
+
+    # === Hotkey actions (dispatcher thread) ===
+    # These signal the engine directly and leave the widgets to refresh_tick
+
+    def on_hotkey_toggle(self, binding, pressed, at):
+        if self.engine.is_running:
+            self.engine.stop(requested_at=at)
+        else:
+            self.profile_engine.stop_all(requested_at=at)
+            self.engine.start(requested_at=at)
+
+    def on_hotkey_hold(self, binding, pressed, at):
+        if pressed:
+            self.profile_engine.stop_all(requested_at=at)
+            self.engine.start(requested_at=at)
+        else:
+            self.engine.stop(requested_at=at)
+
+    def on_hotkey_cps(self, binding, pressed, at):
+        step = binding.arg or DEFAULT_CPS_STEP
+        if binding.action == ACTION_CPS_DOWN:
+            step = -step
+        self.engine.update(cps=min(max(self.engine.config.cps + step, MIN_CPS), MAX_CPS))
+
+    def on_hotkey_profile(self, binding, pressed, at):
+        self.engine.configure(self.profile_config(binding.arg))
+
+    def profile_config(self, name):
+        """Config for a profile from the settings file; raises KeyError for an unknown name"""
+        profile = self.profiles[name]
+        return ClickConfig.from_settings(profile, mouse_button=self.engine.config.mouse_button,
+                                         macro=self.compiled_macros.get(profile.get("macro")))
+
+    def on_hotkey_run_profile(self, binding, pressed, at):
+        # Another thread moving the pointer could send a profile's click somewhere
+        # else between its move and its click, so profiles only start on their own
+        if not self.profile_engine.is_active(binding.arg) and (
+                self.engine.is_running or (self.replayer is not None and self.replayer.is_running)):
+            return
+        profile = self.profiles[binding.arg]
+        button = BUTTON_OPTIONS.get(profile.get("mouse_button"), self.engine.config.mouse_button)
+        self.profile_engine.toggle(binding.arg, ClickConfig.from_settings(profile, mouse_button=button),
+                                   requested_at=at)
+
+    def on_hotkey_emergency_stop(self, binding, pressed, at):
+        self.engine.stop(requested_at=at)
+        self.profile_engine.stop_all(requested_at=at)
+        self.stop_replay()
+
+    def on_hotkey_record(self, binding, pressed, at):
+        if self.recorder is not None:
+            self.stop_recording()
+            return
+        # Hotkeys are left out, so a replay can't start or stop anything
+        self.recorder = InputRecorder(RECORDING_FILE, ignore={b.key for b in self.hotkeys.bindings})
+        self.mouse_listener = MouseListener(on_move=self.recorder.on_move, on_click=self.recorder.on_click)
+        self.mouse_listener.start()
+
+    def on_hotkey_replay(self, binding, pressed, at):
+        if self.replayer is not None and self.replayer.is_running:
+            self.stop_replay()
+        elif self.recorder is None and os.path.exists(RECORDING_FILE):
+            self.profile_engine.stop_all(requested_at=at)
+            self.replayer = Replayer(RECORDING_FILE, self.click_mouse, self.keyboard,
+                                     speed=binding.arg or 1.0, decode_key=replay_key)
+            self.replayer.start()
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.mouse_listener.stop()
+            self.recorder.close()
+            self.recorder = self.mouse_listener = None
+
+    def stop_replay(self):
+        if self.replayer is not None:
+            self.replayer.stop()
+            self.replayer.join()
 
     def on_minimize(self, event):
         """Handle minimize to tray"""
@@ -413,27 +913,33 @@ class AutoClicker:
 
     def save_settings(self):
         """Save settings to file"""
-        settings = {
-            "cps": self.cps,
-            "random_variation": self.random_variation,
-            "mouse_button": self.button_var.get(),
-            "double_click": self.double_click,
-            "click_limit": self.click_limit,
-            "use_fixed_position": self.use_fixed_position,
-            "fixed_x": self.fixed_x,
-            "fixed_y": self.fixed_y,
+        settings = self.engine.config.to_settings()
+        macro = self.engine.config.macro
+        settings.update({
+            "mouse_button": self.mouse_button_name,
+            "macro": macro.name if macro is not None else "",
+            "macros": self.macros,
             "hotkey": self.hotkey_name,
             "hold_mode": self.hold_mode,
-            "start_delay": self.start_delay,
+            "bindings": self.bindings,
+            "profiles": self.profiles,
             "click_sound": self.click_sound,
+            "click_sound_rate": self.click_sound_rate,
+            "click_sound_file": self.click_sound_file,
             "dark_mode": self.dark_mode,
-        }
+            "refresh_hz": self.refresh_hz,
+            "engine_process": self.engine_process,
+            "mouse_backend": self.mouse_backend,
+            "control_api": self.control_api,
+            "precision_mode": self.precision_mode,
+            "precision_cpu": self.precision_cpu,
+            "precision_policy": self.precision_policy,
+        })
         try:
             with open(SETTINGS_FILE, "w") as f:
                 json.dump(settings, f, indent=2)
             self.status_label.config(text="Settings saved!", foreground="blue")
-            self.root.after(2000, lambda: self.status_label.config(
-                text="Status: Stopped", foreground="red"))
+            self.root.after(2000, self.show_status)
         except Exception as e:
             self.status_label.config(text=f"Save failed: {e}", foreground="red")
 
@@ -443,36 +949,75 @@ class AutoClicker:
             if os.path.exists(SETTINGS_FILE):
                 with open(SETTINGS_FILE, "r") as f:
                     settings = json.load(f)
-                self.cps = settings.get("cps", 10)
-                self.random_variation = settings.get("random_variation", 15)
-                btn = settings.get("mouse_button", "Left")
-                if btn == "Left":
-                    self.mouse_button = Button.left
-                elif btn == "Right":
-                    self.mouse_button = Button.right
-                else:
-                    self.mouse_button = Button.middle
-                self.double_click = settings.get("double_click", False)
-                self.click_limit = settings.get("click_limit", 0)
-                self.use_fixed_position = settings.get("use_fixed_position", False)
-                self.fixed_x = settings.get("fixed_x", 0)
-                self.fixed_y = settings.get("fixed_y", 0)
+                self.mouse_button_name = settings.get("mouse_button", "Left")
+                if self.mouse_button_name not in BUTTON_OPTIONS:
+                    self.mouse_button_name = "Left"
+                self.macros = dict(settings.get("macros", {}))
+                self.compiled_macros = compile_macros(self.macros, resolve_key)
+                self.load_click_settings(settings)
                 self.hotkey_name = settings.get("hotkey", "F6")
                 self.hotkey = HOTKEY_OPTIONS.get(self.hotkey_name, Key.f6)
                 self.hold_mode = settings.get("hold_mode", False)
-                self.start_delay = settings.get("start_delay", 0)
+                self.bindings = list(settings.get("bindings", DEFAULT_BINDINGS))
+                self.profiles = dict(settings.get("profiles", {}))
                 self.click_sound = settings.get("click_sound", False)
+                self.click_sound_rate = min(max(float(settings.get("click_sound_rate", DEFAULT_MAX_RATE)), 1), 60)
+                self.click_sound_file = settings.get("click_sound_file", "")
                 self.dark_mode = settings.get("dark_mode", False)
+                self.engine_process = bool(settings.get("engine_process", False))
+                self.mouse_backend = settings.get("mouse_backend", PYNPUT)
+                self.control_api = bool(settings.get("control_api", False))
+                self.precision_mode = bool(settings.get("precision_mode", False))
+                self.precision_cpu = settings.get("precision_cpu")
+                self.precision_policy = settings.get("precision_policy", POLICY_FIFO)
+                self.refresh_hz = min(max(int(settings.get("refresh_hz", DEFAULT_REFRESH_HZ)), 1), 100)
         except Exception:
             pass  # Use defaults if load fails
 
+    def load_click_settings(self, settings):
+        """Configure the engine from saved settings, falling back rather than failing
+
+        A trigger depends on the display it was set up on, so one that can't
+        run here is turned off first; any other click setting that can't be
+        applied (a missing timings file, say) leaves the click settings at
+        their defaults. Either way the rest of the settings still load.
+        """
+        button = BUTTON_OPTIONS[self.mouse_button_name]
+        macro = self.compiled_macros.get(settings.get("macro"))
+        if settings.get("trigger"):
+            self.engine.screen = self.screen = open_screen()
+            try:
+                self.engine.configure(ClickConfig.from_settings(settings, mouse_button=button, macro=macro))
+                return
+            except (ValueError, OSError) as e:
+                self.settings_warning = f"Trigger turned off: {e}"
+                settings = dict(settings, trigger=TRIGGER_OFF)
+        try:
+            self.engine.configure(ClickConfig.from_settings(settings, mouse_button=button, macro=macro))
+        except (ValueError, OSError) as e:
+            self.settings_warning = f"Click settings reset: {e}"
+            self.engine.configure(ClickConfig(mouse_button=button))
+
     def on_close(self):
-        self.is_running = False
+        if self.control is not None:
+            self.control.close()
+        self.engine.close()
+        self.profile_engine.close()
+        if self.screen is not None:
+            self.screen.close()
+        if self.sound is not None:
+            self.sound.close()
+        self.stop_recording()
+        self.stop_replay()
+        if self.click_mouse is not self.mouse:
+            self.click_mouse.close()  # e.g. removes the uinput device
         self.keyboard_listener.stop()
+        self.hotkeys.stop(1)
         self.root.destroy()
 
 
 def main():
+    multiprocessing.freeze_support()  # lets the frozen executable spawn the engine process
     root = tk.Tk()
     app = AutoClicker(root)
     root.mainloop()
@@ -0,0 +1,347 @@
+"""
+Mouse backends - Interchangeable ways for the click engine to drive the mouse
+Every backend has move(x, y) to absolute screen coordinates, press(button),
+release(button), click(button, count), a writable `position` and close().
+Buttons can be pynput Button values or their names ("left", "middle", "right").
+Backends that need something missing raise RuntimeError when opened.
+"""
+
+import functools
+import os
+import struct
+
+try:
+    import fcntl
+except ImportError:  # not on Windows, and neither is uinput
+    fcntl = None
+
+try:
+    from Xlib import X
+    from Xlib.display import Display
+    from Xlib.ext import xtest
+except ImportError:  # python-xlib is optional
+    Display = None
+
+try:
+    from pynput.mouse import Button as PynputButton, Controller as PynputController
+except ImportError:  # no pynput, or no display for it to talk to
+    PynputController = None
+
+# Backend names, as used by the mouse_backend setting
+PYNPUT = "pynput"
+XTEST = "xtest"
+UINPUT = "uinput"
+NULL = "null"
+RECORDING = "recording"
+
+# X11 pointer button numbers
+X_BUTTONS = {"left": 1, "middle": 2, "right": 3}
+
+# Linux input event codes (linux/input-event-codes.h)
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_ABS = 0x03
+SYN_REPORT = 0
+ABS_X = 0x00
+ABS_Y = 0x01
+UINPUT_BUTTONS = {"left": 0x110, "right": 0x111, "middle": 0x112}
+
+# uinput ioctls (linux/uinput.h), _IO/_IOW on the 'U' type
+UI_DEV_CREATE = 0x5501
+UI_DEV_DESTROY = 0x5502
+UI_DEV_SETUP = 0x405C5503  # struct uinput_setup, 92 bytes
+UI_ABS_SETUP = 0x401C5504  # struct uinput_abs_setup, 28 bytes
+UI_SET_EVBIT = 0x40045564
+UI_SET_KEYBIT = 0x40045565
+UI_SET_ABSBIT = 0x40045567
+BUS_VIRTUAL = 0x06
+
+# struct input_event: a timeval the kernel fills in, then type, code and value
+INPUT_EVENT = struct.Struct("@llHHi")
+UINPUT_SETUP = struct.Struct("@HHHH80sI")
+UINPUT_ABS_SETUP = struct.Struct("@H2x6i")
+
+UINPUT_PATH = "/dev/uinput"
+UINPUT_NAME = b"Manual Labor virtual mouse"
+
+
+def button_name(button):
+    """Name of a pynput Button or a button name"""
+    return getattr(button, "name", button)
+
+
+def pack_events(events):
+    """input_event structs for (type, code, value) triples, ready for one write()"""
+    pack = INPUT_EVENT.pack
+    return b"".join(pack(0, 0, kind, code, value) for kind, code, value in events)
+
+
+class MouseBackend:
+    """Base for the mouse backends
+
+    Subclasses implement move, press, release and position; the base class
+    builds click() and the `position` setter on top of them. A backend that
+    can send several events at once overrides click() too.
+    """
+
+    @property
+    def position(self):
+        raise NotImplementedError
+
+    @position.setter
+    def position(self, value):
+        x, y = value
+        self.move(x, y)
+
+    def move(self, x, y):
+        raise NotImplementedError
+
+    def press(self, button):
+        raise NotImplementedError
+
+    def release(self, button):
+        raise NotImplementedError
+
+    def click(self, button, count=1):
+        for _ in range(count):
+            self.press(button)
+            self.release(button)
+
+    def close(self):
+        pass
+
+
+class PynputMouse(MouseBackend):
+    """Clicks through pynput's mouse Controller; the default, and the only one on Windows and macOS"""
+
+    def __init__(self):
+        if PynputController is None:
+            raise RuntimeError("pynput clicking needs pynput and a display")
+        self.controller = PynputController()
+
+    @staticmethod
+    def _button(button):
+        return PynputButton[button] if isinstance(button, str) else button
+
+    @property
+    def position(self):
+        return self.controller.position
+
+    @position.setter
+    def position(self, value):
+        self.controller.position = value
+
+    def move(self, x, y):
+        self.controller.position = (x, y)
+
+    def press(self, button):
+        self.controller.press(self._button(button))
+
+    def release(self, button):
+        self.controller.release(self._button(button))
+
+    def click(self, button, count=1):
+        self.controller.click(self._button(button), count)
+
+
+class XTestMouse(MouseBackend):
+    """Injects clicks through the X11 XTEST extension
+
+    Every press and release of one click() call is queued and sent to the
+    X server in a single flush, so a double click or a burst costs one
+    round trip however many clicks it holds.
+    """
+
+    def __init__(self, display=None):
+        if Display is None:
+            raise RuntimeError("XTest clicking needs python-xlib")
+        try:
+            self.display = Display(display)
+        except Exception as e:  # python-xlib raises its own errors for a missing or refused display
+            raise RuntimeError(f"Can't open the X display: {e}") from e
+        if not self.display.has_extension("XTEST"):
+            self.display.close()
+            raise RuntimeError("X server has no XTEST extension")
+        self._root = self.display.screen().root
+
+    @property
+    def position(self):
+        pointer = self._root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    @position.setter
+    def position(self, value):
+        x, y = value
+        self.move(x, y)
+
+    def move(self, x, y):
+        xtest.fake_input(self.display, X.MotionNotify, x=int(x), y=int(y))
+        self.display.flush()
+
+    def press(self, button):
+        xtest.fake_input(self.display, X.ButtonPress, X_BUTTONS[button_name(button)])
+        self.display.flush()
+
+    def release(self, button):
+        xtest.fake_input(self.display, X.ButtonRelease, X_BUTTONS[button_name(button)])
+        self.display.flush()
+
+    def click(self, button, count=1):
+        number = X_BUTTONS[button_name(button)]
+        display = self.display
+        fake_input = xtest.fake_input
+        for _ in range(count):
+            fake_input(display, X.ButtonPress, number)
+            fake_input(display, X.ButtonRelease, number)
+        display.flush()
+
+    def close(self):
+        self.display.close()
+
+
+class UinputMouse(MouseBackend):
+    """Clicks through a virtual absolute-pointer device made with Linux /dev/uinput
+
+    Works under X11 and Wayland alike, but needs write access to /dev/uinput
+    (root, or a udev rule for the user). The device's axes span screen_size,
+    so coordinates are screen pixels. One click() call, however many clicks
+    it holds, is a single write(). The kernel can't report where the pointer
+    is, so `position` is the last position this backend moved to.
+    """
+
+    def __init__(self, screen_size=(1920, 1080), path=UINPUT_PATH):
+        if fcntl is None:
+            raise RuntimeError("uinput clicking needs Linux")
+        try:
+            self.fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+        except OSError as e:
+            raise RuntimeError(f"Can't open {path}: {e.strerror}") from e
+        try:
+            self._create(screen_size)
+        except OSError as e:
+            os.close(self.fd)
+            raise RuntimeError(f"Can't create a uinput device: {e.strerror}") from e
+        self._position = (0, 0)
+
+    def _create(self, screen_size):
+        fd = self.fd
+        fcntl.ioctl(fd, UI_SET_EVBIT, EV_KEY)
+        for code in UINPUT_BUTTONS.values():
+            fcntl.ioctl(fd, UI_SET_KEYBIT, code)
+        fcntl.ioctl(fd, UI_SET_EVBIT, EV_ABS)
+        for axis, size in ((ABS_X, screen_size[0]), (ABS_Y, screen_size[1])):
+            fcntl.ioctl(fd, UI_SET_ABSBIT, axis)
+            fcntl.ioctl(fd, UI_ABS_SETUP, UINPUT_ABS_SETUP.pack(axis, 0, 0, size - 1, 0, 0, 0))
+        fcntl.ioctl(fd, UI_DEV_SETUP, UINPUT_SETUP.pack(BUS_VIRTUAL, 0, 0, 0, UINPUT_NAME, 0))
+        fcntl.ioctl(fd, UI_DEV_CREATE)
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        x, y = value
+        self.move(x, y)
+
+    def move(self, x, y):
+        self._position = (int(x), int(y))
+        os.write(self.fd, pack_events(((EV_ABS, ABS_X, int(x)), (EV_ABS, ABS_Y, int(y)),
+                                       (EV_SYN, SYN_REPORT, 0))))
+
+    def press(self, button):
+        os.write(self.fd, pack_events(((EV_KEY, UINPUT_BUTTONS[button_name(button)], 1),
+                                       (EV_SYN, SYN_REPORT, 0))))
+
+    def release(self, button):
+        os.write(self.fd, pack_events(((EV_KEY, UINPUT_BUTTONS[button_name(button)], 0),
+                                       (EV_SYN, SYN_REPORT, 0))))
+
+    def click(self, button, count=1):
+        code = UINPUT_BUTTONS[button_name(button)]
+        os.write(self.fd, pack_events(((EV_KEY, code, 1), (EV_SYN, SYN_REPORT, 0),
+                                       (EV_KEY, code, 0), (EV_SYN, SYN_REPORT, 0)) * count))
+
+    def close(self):
+        if self.fd >= 0:
+            fcntl.ioctl(self.fd, UI_DEV_DESTROY)
+            os.close(self.fd)
+            self.fd = -1
+
+
+class NullMouse(MouseBackend):
+    """Mouse that clicks nothing, for profiling and tests; importable in the engine process"""
+
+    position = None  # a plain attribute instead of the base class property, so moves cost nothing
+
+    def __init__(self):
+        self.position = (0, 0)
+        self.clicks = 0
+
+    def move(self, x, y):
+        self.position = (x, y)
+
+    def press(self, button):
+        pass
+
+    def release(self, button):
+        pass
+
+    def click(self, button, count=1):
+        self.clicks += count
+
+
+class RecordingMouse(MouseBackend):
+    """Mouse that clicks nothing and keeps every call as ("move", x, y) or (method, button, count)"""
+
+    def __init__(self):
+        self._position = (0, 0)
+        self.calls = []
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        x, y = value
+        self.move(x, y)
+
+    def move(self, x, y):
+        self._position = (x, y)
+        self.calls.append(("move", x, y))
+
+    def press(self, button):
+        self.calls.append(("press", button_name(button), 1))
+
+    def release(self, button):
+        self.calls.append(("release", button_name(button), 1))
+
+    def click(self, button, count=1):
+        self.calls.append(("click", button_name(button), count))
+
+    @property
+    def clicks(self):
+        return sum(count for method, _, count in self.calls if method == "click")
+
+
+BACKENDS = {
+    PYNPUT: PynputMouse,
+    XTEST: XTestMouse,
+    UINPUT: UinputMouse,
+    NULL: NullMouse,
+    RECORDING: RecordingMouse,
+}
+
+
+def backend_factory(name, **options):
+    """Picklable callable that opens the named backend with the given options
+
+    Raises ValueError for an unknown name; calling the factory raises
+    RuntimeError if the backend can't run here.
+    """
+    try:
+        backend = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown mouse backend: {name}") from None
+    return functools.partial(backend, **options) if options else backend
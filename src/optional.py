@@ -0,0 +1,21 @@
+"""
+Optional - Optional dependencies, imported the first time a code path needs them
+NumPy alone takes longer to import than the headless CLI takes to reach
+its first click, so modules that vectorize with it ask for it here when a
+vectorized path is chosen, rather than importing it at the top.
+"""
+
+_UNTRIED = object()
+_numpy = _UNTRIED
+
+
+def numpy():
+    """The numpy module, imported on the first call; None if it isn't installed"""
+    global _numpy
+    if _numpy is _UNTRIED:
+        try:
+            import numpy as np
+        except ImportError:  # NumPy is optional
+            np = None
+        _numpy = np
+    return _numpy
@@ -0,0 +1,141 @@
+"""
+Paths - Human-like pointer paths between click targets
+Minimum-jerk or curved Bezier trajectories are generated a batch at a time
+(vectorized with NumPy when it is installed) and cached per (from, to)
+pair, so a pattern that revisits the same targets computes each path once.
+"""
+
+import random
+from array import array
+from collections import OrderedDict
+
+from optional import numpy
+
+# Available path shapes
+MOVE_OFF = ""
+MOVE_MINIMUM_JERK = "minimum_jerk"  # straight line, smooth bell-shaped speed
+MOVE_BEZIER = "bezier"  # cubic curve bowed to one side, with the same speed profile
+MOVE_SHAPES = (MOVE_OFF, MOVE_MINIMUM_JERK, MOVE_BEZIER)
+
+# Paths kept before the least recently used one is dropped
+DEFAULT_CACHE_SIZE = 256
+
+# Largest sideways bow of a Bezier path, as a fraction of its length
+MAX_BEND = 0.2
+
+
+def minimum_jerk_profile(steps):
+    """Progress from 0 to 1 at each of `steps` evenly spaced times, ending at 1"""
+    profile = []
+    for i in range(1, steps + 1):
+        t = i / steps
+        profile.append(t * t * t * (10 - 15 * t + 6 * t * t))
+    return profile
+
+
+class PathCache:
+    """Pointer paths between pairs of points, generated in batches and LRU-cached
+
+    A path is a flat array('i') of x, y pairs sampled at `rate` per second
+    over `duration` seconds; it leaves out the start and ends on the target.
+    """
+
+    def __init__(self, shape=MOVE_MINIMUM_JERK, duration=0.1, rate=120, seed=None,
+                 cache_size=DEFAULT_CACHE_SIZE, use_numpy=True):
+        if shape not in MOVE_SHAPES or shape == MOVE_OFF:
+            raise ValueError(f"Unknown move shape: {shape!r}")
+        if duration <= 0 or rate <= 0:
+            raise ValueError(f"Move duration and rate must be positive, got {duration} and {rate}")
+        self.shape = shape
+        self.duration = duration
+        self.rate = rate
+        self.steps = max(1, round(duration * rate))
+        self.cache_size = cache_size
+        self.use_numpy = use_numpy and numpy() is not None
+        self._rng = random.Random(seed)
+        self._profile = minimum_jerk_profile(self.steps)
+        self._paths = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, start, end):
+        """Path from start to end, from the cache when possible"""
+        key = (start, end)
+        path = self._paths.get(key)
+        if path is not None:
+            self._paths.move_to_end(key)
+            self.hits += 1
+            return path
+        self.misses += 1
+        self._store(key, self.generate([key])[0])
+        return self._paths[key]
+
+    def prefetch(self, pairs):
+        """Generate every missing path among (start, end) pairs in one batch"""
+        missing = list(dict.fromkeys(pair for pair in pairs if pair not in self._paths))
+        missing = missing[-self.cache_size:]
+        for key, path in zip(missing, self.generate(missing)):
+            self._store(key, path)
+
+    def _store(self, key, path):
+        self._paths[key] = path
+        self._paths.move_to_end(key)
+        while len(self._paths) > self.cache_size:
+            self._paths.popitem(last=False)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def _bends(self, n):
+        if self.shape != MOVE_BEZIER:
+            return [0.0] * n
+        uniform = self._rng.uniform
+        return [uniform(-MAX_BEND, MAX_BEND) for _ in range(n)]
+
+    def generate(self, pairs):
+        """Paths for a list of (start, end) pairs, bypassing the cache"""
+        if not pairs:
+            return []
+        bends = self._bends(len(pairs))
+        if self.use_numpy:
+            return self._generate_numpy(pairs, bends)
+        return [self._generate_python(start, end, bend) for (start, end), bend in zip(pairs, bends)]
+
+    def _generate_python(self, start, end, bend):
+        (x0, y0), (x1, y1) = start, end
+        dx, dy = x1 - x0, y1 - y0
+        coords = array("i")
+        if self.shape == MOVE_MINIMUM_JERK:
+            for s in self._profile:
+                coords.append(round(x0 + dx * s))
+                coords.append(round(y0 + dy * s))
+            return coords
+        # Control points a third and two thirds along, pushed sideways by the bend
+        px, py = -dy * bend, dx * bend
+        c1x, c1y = x0 + dx / 3 + px, y0 + dy / 3 + py
+        c2x, c2y = x0 + dx * 2 / 3 + px, y0 + dy * 2 / 3 + py
+        for s in self._profile:
+            u = 1 - s
+            a, b, c, d = u * u * u, 3 * u * u * s, 3 * u * s * s, s * s * s
+            coords.append(round(a * x0 + b * c1x + c * c2x + d * x1))
+            coords.append(round(a * y0 + b * c1y + c * c2y + d * y1))
+        return coords
+
+    def _generate_numpy(self, pairs, bends):
+        np = numpy()
+        points = np.asarray(pairs, dtype=np.float64)  # (n, 2 ends, 2 coords)
+        start, end = points[:, 0], points[:, 1]
+        delta = end - start
+        s = np.asarray(self._profile)[None, :, None]  # (1, steps, 1)
+        if self.shape == MOVE_MINIMUM_JERK:
+            paths = start[:, None, :] + delta[:, None, :] * s
+        else:
+            bend = np.asarray(bends)[:, None]
+            side = np.stack((-delta[:, 1], delta[:, 0]), axis=1) * bend
+            c1 = start + delta / 3 + side
+            c2 = start + delta * 2 / 3 + side
+            u = 1 - s
+            paths = (u ** 3 * start[:, None, :] + 3 * u * u * s * c1[:, None, :]
+                     + 3 * u * s * s * c2[:, None, :] + s ** 3 * end[:, None, :])
+        paths = np.rint(paths).astype(np.int32)
+        return [array("i", path.tobytes()) for path in paths]
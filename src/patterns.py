@@ -0,0 +1,104 @@
+"""
+Patterns - Precomputed click coordinates for multi-point clicking
+Points are laid out in a flat array('i') of x, y pairs when a session
+starts (random ones a block at a time, vectorized with NumPy when it is
+installed), so the clicking loop only indexes into it.
+"""
+
+import random
+from array import array
+
+from optional import numpy
+
+# Available patterns
+PATTERN_OFF = ""
+PATTERN_POINTS = "points"  # round-robin over a list of points
+PATTERN_GRID = "grid"  # rows x cols cell centres over a rectangle, row by row
+PATTERN_REGION = "region"  # a random point within a rectangle
+PATTERNS = (PATTERN_OFF, PATTERN_POINTS, PATTERN_GRID, PATTERN_REGION)
+
+# Random points generated per refill
+DEFAULT_BLOCK_SIZE = 512
+
+
+def bounding_rect(points):
+    """(left, top, right, bottom) around a list of points"""
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def grid_points(rect, rows, cols):
+    """Centres of the cells of a rows x cols grid over rect, row by row"""
+    left, top, right, bottom = rect
+    width = (right - left) / cols
+    height = (bottom - top) / rows
+    return [(round(left + (col + 0.5) * width), round(top + (row + 0.5) * height))
+            for row in range(rows) for col in range(cols)]
+
+
+class PointSource:
+    """Endless stream of click positions for a pattern
+
+    Fixed patterns are laid out once and cycled; the region pattern draws a
+    fresh block of random points whenever the last one runs out.
+    """
+
+    def __init__(self, pattern, points=(), rect=None, rows=1, cols=1, seed=None,
+                 block_size=DEFAULT_BLOCK_SIZE, use_numpy=True):
+        if pattern not in PATTERNS or pattern == PATTERN_OFF:
+            raise ValueError(f"Unknown click pattern: {pattern!r}")
+        if pattern == PATTERN_POINTS and not points:
+            raise ValueError("The points pattern needs at least one point")
+        if pattern != PATTERN_POINTS and rect is None:
+            raise ValueError(f"The {pattern} pattern needs a rectangle")
+        if rows < 1 or cols < 1:
+            raise ValueError(f"Grid must be at least 1x1, got {rows}x{cols}")
+        self.pattern = pattern
+        self.rect = rect
+        self.block_size = block_size
+
+        if pattern == PATTERN_REGION:
+            np = numpy() if use_numpy else None
+            if np is not None:
+                self._np_rng = np.random.default_rng(seed)
+                self._fill = self._fill_numpy
+            else:
+                self._rng = random.Random(seed)
+                self._fill = self._fill_python
+            self.coords = self._fill(block_size)
+        else:
+            self._fill = None
+            fixed = points if pattern == PATTERN_POINTS else grid_points(rect, rows, cols)
+            self.coords = array("i", [value for point in fixed for value in point])
+        self._index = 0
+
+    def next(self):
+        """Next (x, y) to click at"""
+        coords = self.coords
+        i = self._index
+        if i >= len(coords):
+            if self._fill is not None:
+                coords = self.coords = self._fill(self.block_size)
+            i = 0
+        self._index = i + 2
+        return coords[i], coords[i + 1]
+
+    def take(self, n):
+        """Next n positions as a list"""
+        return [self.next() for _ in range(n)]
+
+    def _fill_python(self, n):
+        left, top, right, bottom = self.rect
+        randint = self._rng.randint
+        coords = array("i")
+        for _ in range(n):
+            coords.append(randint(left, right))
+            coords.append(randint(top, bottom))
+        return coords
+
+    def _fill_numpy(self, n):
+        left, top, right, bottom = self.rect
+        np = numpy()
+        pairs = self._np_rng.integers((left, top), (right + 1, bottom + 1), size=(n, 2), dtype=np.int32)
+        return array("i", pairs.tobytes())
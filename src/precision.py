@@ -0,0 +1,169 @@
+"""
+Precision - Opt-in real-time setup for the click thread on Linux
+Pins the worker to a core, asks for a real-time scheduling policy and sleeps
+to absolute CLOCK_MONOTONIC deadlines with a timerfd. Every step falls back
+to the normal behaviour when the platform or privileges don't allow it.
+"""
+
+import ctypes
+import os
+import select
+import sys
+import time
+
+# Scheduling policies
+POLICY_FIFO = "fifo"
+POLICY_RR = "rr"
+POLICY_NONE = "none"  # leave the scheduler alone
+POLICIES = (POLICY_FIFO, POLICY_RR, POLICY_NONE)
+
+# Real-time priority (1-99); modest, so kernel threads still win
+DEFAULT_PRIORITY = 10
+
+# With exact wake-ups the loop only needs a short spin before each deadline
+PRECISION_SPIN_THRESHOLD = 0.0002  # seconds
+
+TFD_TIMER_ABSTIME = 1
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+class _Itimerspec(ctypes.Structure):
+    _fields_ = [("it_interval", _Timespec), ("it_value", _Timespec)]
+
+
+def _load_timerfd():
+    """libc's timerfd_create/timerfd_settime, or None off Linux"""
+    if not sys.platform.startswith("linux") or not hasattr(os, "eventfd"):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.timerfd_create, libc.timerfd_settime
+    except (OSError, AttributeError):
+        return None
+
+
+class TimerfdWakeup:
+    """threading.Event stand-in that can also sleep until an absolute deadline
+
+    Deadlines are CLOCK_MONOTONIC times (time.monotonic). Waits block in
+    select() on a timerfd armed with TFD_TIMER_ABSTIME plus an eventfd that
+    set() writes to, so stopping the engine still cuts a sleep short.
+    """
+
+    def __init__(self, timerfd=None):
+        create, self._settime = timerfd or _load_timerfd()
+        self._timer_fd = create(time.CLOCK_MONOTONIC, os.O_CLOEXEC)
+        if self._timer_fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._event_fd = os.eventfd(0, os.EFD_CLOEXEC | os.EFD_NONBLOCK)
+        self._spec = _Itimerspec()
+
+    def set(self):
+        os.eventfd_write(self._event_fd, 1)
+
+    def clear(self):
+        try:
+            os.eventfd_read(self._event_fd)
+        except BlockingIOError:
+            pass
+
+    def is_set(self):
+        return bool(select.select([self._event_fd], [], [], 0)[0])
+
+    def wait(self, timeout=None):
+        """Like Event.wait: True if set() was called, False on timeout"""
+        if timeout is not None:
+            timeout = max(timeout, 0)
+        return bool(select.select([self._event_fd], [], [], timeout)[0])
+
+    def wait_until(self, deadline):
+        """Sleep until time.monotonic() reaches deadline; True if set() cut it short"""
+        value = self._spec.it_value
+        deadline = max(deadline, 1e-9)  # an all-zero value would disarm the timer
+        value.tv_sec = int(deadline)
+        value.tv_nsec = int((deadline - value.tv_sec) * 1e9)
+        if self._settime(self._timer_fd, TFD_TIMER_ABSTIME, ctypes.byref(self._spec), None) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        ready = select.select([self._event_fd, self._timer_fd], [], [])[0]
+        if self._event_fd in ready:
+            return True
+        os.read(self._timer_fd, 8)
+        return False
+
+    def close(self):
+        if self._timer_fd >= 0:
+            os.close(self._timer_fd)
+            os.close(self._event_fd)
+            self._timer_fd = self._event_fd = -1
+
+
+class PrecisionMode:
+    """Real-time options for the click engine's worker thread
+
+    Pass engine_options() to ClickEngine. What was actually applied, and why
+    anything wasn't, ends up in `report` once the worker has started.
+    """
+
+    def __init__(self, cpu=None, policy=POLICY_FIFO, priority=DEFAULT_PRIORITY,
+                 spin_threshold=PRECISION_SPIN_THRESHOLD):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        if not 1 <= priority <= 99:
+            raise ValueError(f"Real-time priority must be 1-99, got {priority}")
+        self.cpu = cpu
+        self.policy = policy
+        self.priority = priority
+        self.spin_threshold = spin_threshold
+        self.report = {}
+
+    def engine_options(self):
+        """Keyword arguments for ClickEngine"""
+        options = {"clock": time.monotonic, "on_thread_start": self.setup_thread}
+        timerfd = _load_timerfd()
+        if timerfd is None:
+            self.report["sleep"] = "event (no timerfd)"
+            return options
+        try:
+            options["wakeup"] = TimerfdWakeup(timerfd)
+        except OSError as e:
+            self.report["sleep"] = f"event ({e.strerror})"
+            return options
+        # Only an exact wake-up makes the shorter spin safe
+        options["spin_threshold"] = self.spin_threshold
+        self.report["sleep"] = "timerfd"
+        return options
+
+    def setup_thread(self):
+        """Pin and prioritise the calling thread, skipping whatever isn't permitted"""
+        if self.cpu is not None:
+            if not hasattr(os, "sched_setaffinity"):
+                self.report["affinity"] = "unsupported"
+            else:
+                try:
+                    os.sched_setaffinity(0, {self.cpu})  # 0 = the calling thread on Linux
+                    self.report["affinity"] = f"CPU {self.cpu}"
+                except OSError as e:
+                    self.report["affinity"] = f"denied ({e.strerror})"
+
+        if self.policy != POLICY_NONE:
+            if not hasattr(os, "sched_setscheduler"):
+                self.report["scheduler"] = "unsupported"
+            else:
+                policy = os.SCHED_FIFO if self.policy == POLICY_FIFO else os.SCHED_RR
+                name = "SCHED_FIFO" if self.policy == POLICY_FIFO else "SCHED_RR"
+                try:
+                    os.sched_setscheduler(0, policy, os.sched_param(self.priority))
+                    self.report["scheduler"] = f"{name} {self.priority}"
+                except OSError as e:
+                    self.report["scheduler"] = f"denied ({e.strerror})"
+
+    def describe(self):
+        """One-line summary of the report"""
+        if not self.report:
+            return "not started"
+        return ", ".join(self.report[key] for key in ("sleep", "scheduler", "affinity") if key in self.report)
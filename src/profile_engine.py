@@ -0,0 +1,242 @@
+"""
+Profile engine - Several named click profiles running at once on one thread
+Each active profile keeps its own deadline schedule, jitter, pattern and
+stats; a single worker keeps their next deadlines in a heap and sleeps to
+whichever is earliest, so adding profiles adds no threads.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+from click_engine import ClickEngine
+from scheduler import DEFAULT_SPIN_THRESHOLD, DeadlineScheduler
+from stats import ClickStats
+
+
+class _Profile:
+    """Per-profile state, owned by the worker between start and stop"""
+
+    __slots__ = ("name", "config", "scheduler", "next_jitter", "next_point", "stats", "click_count",
+                 "requested_at", "active")
+
+    def __init__(self, name, config, scheduler, next_jitter, next_point, stats, requested_at):
+        self.name = name
+        self.config = config
+        self.scheduler = scheduler
+        self.next_jitter = next_jitter
+        self.next_point = next_point
+        self.stats = stats
+        self.click_count = 0
+        self.requested_at = requested_at
+        self.active = True  # cleared on stop; the heap drops entries for inactive profiles lazily
+
+
+class ProfileEngine:
+    """Clicks for any number of named profiles at once from one worker thread
+
+    Every profile is a ClickConfig with its own rate, button, position or
+    pattern, jitter, click limit and start delay; macros, burst mode, screen
+    triggers, smooth moves and rate control stay with ClickEngine. The worker
+    pops the earliest deadline off a heap, sleeps to it on the same
+    absolute-deadline wait the single engine uses, clicks, and pushes that
+    profile's next deadline, so timing doesn't degrade as profiles are added.
+    The mouse and clock arguments match ClickEngine's; on_click and on_stop
+    are called with the profile name.
+    """
+
+    def __init__(self, mouse, on_click=None, on_stop=None, clock=time.perf_counter, sleep=None,
+                 spin_threshold=DEFAULT_SPIN_THRESHOLD, wakeup=None):
+        self.mouse = mouse
+        self.on_click = on_click  # called on the worker thread after every click
+        self.on_stop = on_stop  # called on the worker thread when a profile hits its limit
+        self.clock = clock
+        self._wakeup = wakeup or threading.Event()  # set to cut short the worker's sleep
+        self.sleep = sleep or self._wakeup.wait
+        self._sleep_until = None if sleep else getattr(self._wakeup, "wait_until", None)
+        self.spin_threshold = spin_threshold
+
+        # State; the heap holds (deadline, order, profile) for the active profiles
+        self._profiles = {}  # name -> _Profile, active ones only
+        self.stats = {}  # name -> ClickStats of the profile's latest session
+        self._heap = []
+        self._order = itertools.count()  # keeps same-deadline entries in scheduling order
+        self._closed = False
+        self._serving_inline = False  # run() is serving on its caller's thread
+        self._state = threading.Condition()
+        self.click_thread = None
+
+    @property
+    def is_running(self):
+        return bool(self._profiles)
+
+    def active(self):
+        """Names of the profiles currently clicking"""
+        return list(self._profiles)
+
+    def is_active(self, name):
+        return name in self._profiles
+
+    def click_count(self, name):
+        """Clicks in the profile's latest session"""
+        stats = self.stats.get(name)
+        return stats.clicks if stats is not None else 0
+
+    def start(self, name, config, requested_at=None):
+        """Start clicking for a profile, restarting it if it is already active
+
+        While run() is serving, the profile joins it instead of the worker
+        thread. Raises ValueError for a config that only ClickEngine can run.
+        """
+        with self._state:
+            self._add(name, config, requested_at)
+            if self.click_thread is None and not self._serving_inline:
+                self.click_thread = threading.Thread(target=self._serve, args=(True,), daemon=True)
+                self.click_thread.start()
+
+    def run(self, profiles):
+        """Run a dict of name -> config on the calling thread until every profile has stopped"""
+        with self._state:
+            for name, config in profiles.items():
+                self._add(name, config, None)
+            self._serving_inline = True
+        try:
+            self._serve(False)
+        finally:
+            self._serving_inline = False
+
+    def toggle(self, name, config, requested_at=None):
+        """Start a profile if it is stopped, otherwise stop it"""
+        with self._state:
+            if name in self._profiles:
+                self._remove(name, requested_at)
+            else:
+                self.start(name, config, requested_at)
+
+    def stop(self, name, requested_at=None):
+        """Stop one profile; the others carry on"""
+        with self._state:
+            self._remove(name, requested_at)
+
+    def stop_all(self, requested_at=None):
+        with self._state:
+            for name in list(self._profiles):
+                self._remove(name, requested_at)
+
+    def close(self):
+        """Stop every profile and let the worker thread exit"""
+        with self._state:
+            self.stop_all()
+            self._closed = True
+            self._wakeup.set()
+            self._state.notify_all()
+        if self.click_thread is not None:
+            self.click_thread.join()
+        if hasattr(self._wakeup, "close"):
+            self._wakeup.close()
+
+    def _add(self, name, config, requested_at):
+        if self._closed:
+            raise RuntimeError("Engine is closed")
+        if config.macro is not None or config.burst_size:
+            raise ValueError(f"Profile {name!r} uses a macro or burst mode, which can't share the clicking thread")
+        if config.trigger or config.smooth_move or config.rate_control:
+            raise ValueError(f"Profile {name!r} uses a screen trigger, smooth moves or rate control, "
+                             "which only the main clicker supports")
+        now = self.clock()
+        if name in self._profiles:
+            self._remove(name, now)
+        scheduler = DeadlineScheduler(config.interval, overrun_policy=config.overrun_policy, clock=self.clock)
+        scheduler.start(now + config.start_delay)
+        points = ClickEngine.make_points(config)
+        stats = self.stats[name] = ClickStats()
+        stats.reset(config.cps)
+        profile = _Profile(name, config, scheduler, ClickEngine.make_jitter(config).next,
+                           points.next if points else None, stats,
+                           now if requested_at is None else requested_at)
+        self._profiles[name] = profile
+        self._push(profile, now)
+        self._wakeup.set()  # the new deadline may be earlier than the one being slept to
+        self._state.notify_all()
+
+    def _remove(self, name, requested_at):
+        profile = self._profiles.pop(name, None)
+        if profile is not None:
+            profile.active = False
+            profile.stats.stop_latency = 0.0 if requested_at is None else self.clock() - requested_at
+            self._wakeup.set()
+
+    def _push(self, profile, now):
+        deadline = profile.scheduler.target(profile.next_jitter() * profile.config.interval, now)
+        heapq.heappush(self._heap, (deadline, next(self._order), profile))
+
+    def _serve(self, block):
+        """Fire profiles' clicks in deadline order; returns when closed, or when idle unless blocking"""
+        clock = self.clock
+        heap = self._heap
+        state = self._state
+        # Only the scheduler's absolute-deadline wait is used, not its interval grid
+        wait_until = DeadlineScheduler(1.0, spin_threshold=self.spin_threshold, clock=clock, sleep=self.sleep,
+                                       sleep_until=self._sleep_until).wait_until
+        while True:
+            with state:
+                while True:
+                    while heap and not heap[0][2].active:
+                        heapq.heappop(heap)
+                    if heap or self._closed or not block:
+                        break
+                    state.wait()
+                if self._closed or not heap:
+                    return
+                entry = heap[0]
+                self._wakeup.clear()
+            # Cut short by the wakeup whenever a profile starts or stops
+            wait_until(entry[0])
+            now = clock()
+            if now < entry[0]:
+                continue
+            with state:
+                if not heap or heap[0] is not entry:
+                    continue  # an earlier deadline arrived meanwhile; serve that first
+                heapq.heappop(heap)
+                if not entry[2].active:
+                    continue
+            self._fire(entry[2], now - entry[0])
+
+    def _fire(self, profile, lateness):
+        clock = self.clock
+        config = profile.config
+        stats = profile.stats
+        mouse = self.mouse
+        profile.scheduler.advance()
+
+        # Move to the next pattern point, or the fixed position if enabled
+        if profile.next_point is not None:
+            mouse.position = profile.next_point()
+        elif config.position is not None:
+            mouse.position = config.position
+
+        started = clock()
+        mouse.click(config.mouse_button, config.clicks_per_tick)
+        finished = clock()
+        stats.record_click(started, finished, lateness)
+        stats.overruns = profile.scheduler.overruns
+        stats.skipped = profile.scheduler.skipped
+        if not profile.click_count:
+            stats.start_latency = started - profile.requested_at - config.start_delay
+        profile.click_count += 1
+        if self.on_click:
+            self.on_click(profile.name)
+
+        with self._state:
+            if not profile.active:
+                return  # stopped from outside while clicking
+            if config.click_limit and profile.click_count >= config.click_limit:
+                self._remove(profile.name, None)
+                limited = True
+            else:
+                self._push(profile, finished)
+                limited = False
+        if limited and self.on_stop:
+            self.on_stop(profile.name)
@@ -0,0 +1,78 @@
+"""
+Rate control - Closed-loop correction of the click interval
+Deadlines keep the clicking loop from drifting, but the clicks the
+scheduler skips after an overrun are lost for good, so when mouse.click()
+sometimes stalls the long-run rate falls short of the target. The
+controller measures the achieved rate over a sliding window of clicks and
+shortens or lengthens the scheduled interval to make up the difference.
+"""
+
+from collections import deque
+
+# Clicks the achieved rate is measured over
+DEFAULT_WINDOW = 20
+
+# Gains on the relative rate error, per click
+DEFAULT_KP = 0.3
+DEFAULT_KI = 0.05
+
+# Most the rate is sped up or slowed down, as a fraction of the target
+DEFAULT_MAX_CORRECTION = 0.5
+
+# Largest error counted, so a window stretched by a long stall reads as half the rate, not less
+MAX_ERROR = 1.0
+
+
+class RateController:
+    """PI controller that picks the interval to schedule after each click
+
+    `error` is the relative shortfall of the achieved rate over the window:
+    positive while clicking too slowly, between -1 and MAX_ERROR. `correction` is the
+    fraction the rate is sped up by (negative to slow it down), the sum of
+    the proportional and integral terms, clamped to max_correction. The
+    integral doesn't accumulate while the output is clamped in the
+    direction the error pushes it, so a rate the machine can't reach
+    doesn't wind it up. All are exposed for
+    instrumentation and update on the click thread.
+    """
+
+    def __init__(self, interval, window=DEFAULT_WINDOW, kp=DEFAULT_KP, ki=DEFAULT_KI,
+                 max_correction=DEFAULT_MAX_CORRECTION):
+        if interval <= 0:
+            raise ValueError(f"Interval must be positive, got {interval}")
+        if window < 2:
+            raise ValueError(f"Rate window must be at least 2 clicks, got {window}")
+        if not 0 < max_correction < 1:
+            raise ValueError(f"Max correction must be between 0 and 1, got {max_correction}")
+        self.target = interval
+        self.kp = kp
+        self.ki = ki
+        self.max_correction = max_correction
+        self._times = deque(maxlen=window)
+        self.error = 0.0
+        self.integral = 0.0
+        self.correction = 0.0
+        self.interval = interval  # what to schedule next
+
+    def update(self, clicked_at):
+        """Take the time of a click and return the interval to schedule next"""
+        times = self._times
+        times.append(clicked_at)
+        if len(times) < 2:
+            return self.interval
+        measured = (times[-1] - times[0]) / (len(times) - 1)
+        # Every interval sits in window - 1 windows at weight 1 / (window - 1),
+        # so the running sum of the error counts the clicks behind schedule
+        error = min(measured / self.target - 1, MAX_ERROR)
+        limit = self.max_correction
+        integral = self.integral + error
+        correction = self.kp * error + self.ki * integral
+        if abs(correction) > limit and (correction > 0) == (error > 0):
+            # Saturated, and integrating would only push further into it
+            integral = self.integral
+            correction = self.kp * error + self.ki * integral
+        self.error = error
+        self.integral = integral
+        self.correction = min(max(correction, -limit), limit)
+        self.interval = self.target / (1 + self.correction)
+        return self.interval
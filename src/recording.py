@@ -0,0 +1,249 @@
+"""
+Recording - Append-only binary log of mouse and keyboard input, and timed replay
+The recorder's listener callbacks only queue a tuple; a writer thread packs
+and appends fixed-size records. Replay memory-maps the log and streams it
+record by record, so a recording of any length plays back in constant memory.
+"""
+
+import mmap
+import queue
+import struct
+import threading
+import time
+
+from mouse_backends import button_name
+from scheduler import DEFAULT_SPIN_THRESHOLD, DeadlineScheduler
+
+# File layout: an 8-byte header, then fixed-size little-endian records of
+# (microseconds since the previous record, event type, x, y, code)
+HEADER = b"MLREC\x01\x00\x00"
+RECORD = struct.Struct("<IIiiI")
+
+# Event types
+EV_WAIT = 0  # nothing happens; pads out gaps too long for one delta
+EV_MOVE = 1
+EV_BUTTON_DOWN = 2  # code: button number
+EV_BUTTON_UP = 3
+EV_KEY_DOWN = 4  # code: virtual key code
+EV_KEY_UP = 5
+EV_CHAR_DOWN = 6  # code: character, for keys without a virtual key code
+EV_CHAR_UP = 7
+
+BUTTON_CODES = {"left": 1, "middle": 2, "right": 3}
+BUTTON_NAMES = {code: name for name, code in BUTTON_CODES.items()}
+
+MAX_DELTA = 0xFFFFFFFF  # microseconds, about 71 minutes
+MICROS = 1_000_000
+
+
+def encode_key(key):
+    """(is_char, code) for a pynput key, or None for a key that can't be recorded"""
+    value = getattr(key, "value", key)  # Key members wrap a KeyCode
+    vk = getattr(value, "vk", None)
+    if vk is not None:
+        return False, vk
+    char = getattr(value, "char", None)
+    if char:
+        return True, ord(char)
+    return None
+
+
+def decode_key(is_char, code):
+    """Key for the replay keyboard: the character, or the virtual key code"""
+    return chr(code) if is_char else code
+
+
+class InputRecorder:
+    """Writes input events to a recording file without blocking the input hooks
+
+    The on_* methods match pynput's listener callbacks. Keys in `ignore`
+    (such as the hotkeys) are left out, so replaying doesn't trigger them.
+    """
+
+    def __init__(self, path, ignore=(), clock=time.perf_counter, encode_key=encode_key):
+        self.path = path
+        self.ignore = frozenset(ignore)
+        self.clock = clock
+        self.encode_key = encode_key
+        self.events = 0
+        self._queue = queue.SimpleQueue()
+        self._file = open(path, "wb")
+        self._file.write(HEADER)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    # === Listener callbacks ===
+
+    def on_move(self, x, y, *args):
+        self._queue.put((self.clock(), EV_MOVE, x, y, 0))
+
+    def on_click(self, x, y, button, pressed, *args):
+        code = BUTTON_CODES.get(button_name(button))
+        if code is not None:
+            self._queue.put((self.clock(), EV_BUTTON_DOWN if pressed else EV_BUTTON_UP, x, y, code))
+
+    def on_press(self, key, *args):
+        self._key(key, EV_KEY_DOWN, EV_CHAR_DOWN)
+
+    def on_release(self, key, *args):
+        self._key(key, EV_KEY_UP, EV_CHAR_UP)
+
+    def _key(self, key, kind, char_kind):
+        if key in self.ignore:
+            return
+        encoded = self.encode_key(key)
+        if encoded is not None:
+            is_char, code = encoded
+            self._queue.put((self.clock(), char_kind if is_char else kind, 0, 0, code))
+
+    # === Writer thread ===
+
+    def _write_loop(self):
+        pack = RECORD.pack
+        last = None
+        while True:
+            batch = [self._queue.get()]
+            # Drain whatever else arrived meanwhile into the same write
+            try:
+                while True:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            records = []
+            for event in batch:
+                if event is None:
+                    self._file.write(b"".join(records))
+                    return
+                at, kind, x, y, code = event
+                delta = 0 if last is None else round((at - last) * MICROS)
+                last = at
+                while delta > MAX_DELTA:
+                    records.append(pack(MAX_DELTA, EV_WAIT, 0, 0, 0))
+                    delta -= MAX_DELTA
+                records.append(pack(delta, kind, int(x), int(y), code))
+                self.events += 1
+            self._file.write(b"".join(records))
+            self._file.flush()
+
+    def close(self):
+        """Write out every queued event and close the file"""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+            self._file.close()
+
+
+def read_events(path):
+    """Stream (delta_us, type, x, y, code) records from a recording file
+
+    The file is memory-mapped and unpacked lazily; a partly written last
+    record is ignored. Raises ValueError if it isn't a recording.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(HEADER)) != HEADER:
+            raise ValueError(f"{path} is not a Manual Labor recording")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _stream(mapped)
+
+
+def _stream(mapped):
+    unpack_from = RECORD.unpack_from
+    size = RECORD.size
+    end = len(mapped) - size
+    try:
+        for offset in range(len(HEADER), end + 1, size):
+            yield unpack_from(mapped, offset)
+    finally:
+        mapped.close()
+
+
+class Replayer:
+    """Plays a recording back through a mouse backend and a keyboard
+
+    Each event fires at its offset from the start divided by `speed`, on
+    absolute deadlines, so timing errors never add up over a long recording.
+    Key events need a keyboard with press(key) and release(key); without one
+    they are skipped. decode_key turns a recorded key into one the keyboard takes.
+    """
+
+    def __init__(self, path, mouse, keyboard=None, speed=1.0, decode_key=decode_key,
+                 clock=time.perf_counter, sleep=None, spin_threshold=DEFAULT_SPIN_THRESHOLD):
+        if speed <= 0:
+            raise ValueError(f"Replay speed must be positive, got {speed}")
+        self.path = path
+        self.mouse = mouse
+        self.keyboard = keyboard
+        self.speed = speed
+        self.decode_key = decode_key
+        self.clock = clock
+        self._stop = threading.Event()
+        self.sleep = sleep or self._stop.wait
+        self.spin_threshold = spin_threshold
+        self.events = 0
+        self.thread = None
+
+    @property
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        """Replay on a background thread"""
+        self._stop.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout=None):
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def run(self):
+        """Replay the whole recording on the calling thread, unless stopped
+
+        Buttons and keys still held when it ends, stopped or not, are released.
+        """
+        events = read_events(self.path)
+        mouse = self.mouse
+        keyboard = self.keyboard
+        decode = self.decode_key
+        stopped = self._stop.is_set
+        # Only the scheduler's absolute-deadline wait is used, not its interval grid
+        wait_until = DeadlineScheduler(1.0, spin_threshold=self.spin_threshold, clock=self.clock,
+                                       sleep=self.sleep).wait_until
+        scale = 1 / (MICROS * self.speed)
+        elapsed = 0  # whole microseconds, so the offsets stay exact
+        buttons = set()  # held down
+        keys = {}  # decoded key by (kind, code) of its press, held down
+        start = self.clock()
+        try:
+            for delta, kind, x, y, code in events:
+                elapsed += delta
+                wait_until(start + elapsed * scale)
+                if stopped():
+                    break
+                if kind == EV_MOVE:
+                    mouse.position = (x, y)
+                elif kind == EV_BUTTON_DOWN:
+                    mouse.press(BUTTON_NAMES[code])
+                    buttons.add(code)
+                elif kind == EV_BUTTON_UP:
+                    mouse.release(BUTTON_NAMES[code])
+                    buttons.discard(code)
+                elif keyboard is not None and kind != EV_WAIT:
+                    key = decode(kind >= EV_CHAR_DOWN, code)
+                    if kind in (EV_KEY_DOWN, EV_CHAR_DOWN):
+                        keyboard.press(key)
+                        keys[kind, code] = key
+                    else:
+                        keyboard.release(key)
+                        keys.pop((kind - 1, code), None)
+                self.events += 1
+        finally:
+            for code in buttons:
+                mouse.release(BUTTON_NAMES[code])
+            for key in keys.values():
+                keyboard.release(key)
+            events.close()
@@ -0,0 +1,146 @@
+"""
+Scheduler - Drift-free deadline timing for the clicking loop
+Clicks fire at absolute monotonic deadlines, so the time spent clicking
+never adds to the interval between clicks.
+"""
+
+import time
+
+# What to do after falling a whole interval or more behind schedule
+OVERRUN_SKIP = "skip"  # drop the missed clicks and realign to the grid
+OVERRUN_CATCH_UP = "catch_up"  # fire the missed clicks back-to-back
+OVERRUN_POLICIES = (OVERRUN_SKIP, OVERRUN_CATCH_UP)
+
+# Sleep until this close to a deadline, then spin the rest of the way
+DEFAULT_SPIN_THRESHOLD = 0.001  # seconds
+
+# Most missed clicks catch-up mode replays before it gives up and realigns
+DEFAULT_MAX_CATCH_UP = 5
+
+
+class DeadlineScheduler:
+    """Waits for absolute deadlines spaced one interval apart"""
+
+    def __init__(self, interval, overrun_policy=OVERRUN_SKIP,
+                 spin_threshold=DEFAULT_SPIN_THRESHOLD, max_catch_up=DEFAULT_MAX_CATCH_UP,
+                 clock=time.perf_counter, sleep=time.sleep, sleep_until=None):
+        if interval <= 0:
+            raise ValueError(f"Interval must be positive, got {interval}")
+        if overrun_policy not in OVERRUN_POLICIES:
+            raise ValueError(f"Unknown overrun policy: {overrun_policy}")
+        self.interval = interval
+        self.overrun_policy = overrun_policy
+        self.spin_threshold = spin_threshold
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self.sleep = sleep
+        self.sleep_until = sleep_until  # absolute-deadline sleep on the same clock, if available
+
+        # Un-jittered deadline of the next click, kept as anchor + ticks * interval
+        # so hours of additions don't accumulate floating-point error
+        self.next_deadline = None
+        self.started_at = None
+        self._anchor = None
+        self._ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+
+    def start(self, now=None):
+        """Anchor the schedule so the first deadline is right now"""
+        self.next_deadline = self.clock() if now is None else now
+        self.started_at = self.next_deadline
+        self._anchor = self.next_deadline
+        self._ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+
+    def set_interval(self, interval):
+        """Change the spacing of all deadlines after the next one"""
+        if interval <= 0:
+            raise ValueError(f"Interval must be positive, got {interval}")
+        if interval != self.interval and self.next_deadline is not None:
+            self._anchor = self.next_deadline
+            self._ticks = 0
+        self.interval = interval
+
+    def wait(self, jitter=0.0):
+        """Wait for the next deadline shifted by jitter seconds, then advance the schedule
+
+        Jitter only moves the deadline it is applied to, so it never accumulates.
+        Returns how late the wake-up was in seconds (negative if the sleep was
+        interrupted).
+        """
+        if self.next_deadline is None:
+            self.start()
+
+        now = self.clock()
+        target = self.target(jitter, now)
+        if now < target:
+            self._wait_until(target)
+            now = self.clock()
+
+        self._advance(1)
+        return now - target
+
+    def target(self, jitter=0.0, now=None):
+        """Time the next deadline falls due, shifted by jitter, without waiting for it
+
+        The overrun policy is applied first if `now` is a whole interval or
+        more past the deadline. Call advance() once the deadline is used, to
+        run the schedule without this scheduler doing the sleeping.
+        """
+        now = self.clock() if now is None else now
+        behind = now - self.next_deadline
+        if behind >= self.interval:
+            self._handle_overrun(behind)
+        # Jitter can't pull a deadline to before the schedule started
+        return max(self.next_deadline + jitter, self.started_at)
+
+    def advance(self):
+        """Move on to the deadline after the next one"""
+        self._advance(1)
+
+    def wait_until(self, target):
+        """Wait for an absolute deadline on the scheduler's clock, outside the grid
+
+        Returns how late the wake-up was in seconds (negative if the sleep was
+        interrupted).
+        """
+        now = self.clock()
+        if now < target:
+            self._wait_until(target)
+            now = self.clock()
+        return now - target
+
+    def _advance(self, ticks):
+        self._ticks += ticks
+        self.next_deadline = self._anchor + self._ticks * self.interval
+
+    def _handle_overrun(self, behind):
+        """Apply the overrun policy after missing one or more whole intervals"""
+        self.overruns += 1
+        missed = int(behind / self.interval)
+        if self.overrun_policy == OVERRUN_CATCH_UP:
+            # Keep the backlog, but never more than max_catch_up clicks of it
+            missed -= self.max_catch_up
+            if missed <= 0:
+                return
+        self._advance(missed)
+        self.skipped += missed
+
+    def _wait_until(self, target):
+        """Coarse sleep to just short of the target, then spin to hit it exactly
+
+        A sleep function that returns True (like Event.wait) was interrupted,
+        and the wait is abandoned instead of spinning out the rest.
+        """
+        remaining = target - self.clock()
+        if remaining > self.spin_threshold:
+            if self.sleep_until is not None:
+                interrupted = self.sleep_until(target - self.spin_threshold)
+            else:
+                interrupted = self.sleep(remaining - self.spin_threshold)
+            if interrupted is True:
+                return
+        while self.clock() < target:
+            pass
@@ -0,0 +1,208 @@
+"""
+Screens - Region capture from the X11 display for screen triggers
+ShmScreen has the X server write each region into a MIT-SHM segment that
+every capture of that size reuses, through libX11 and libXext by ctypes,
+as python-xlib has no MIT-SHM support. XlibScreen copies regions over the
+X socket with python-xlib instead, where shared memory isn't available.
+"""
+
+import ctypes
+import ctypes.util
+import time
+
+from triggers import BYTES_PER_PIXEL, Frame, check_region
+
+try:
+    from Xlib import X
+    from Xlib.display import Display
+except ImportError:  # python-xlib is optional
+    Display = None
+
+# Xlib and System V shared memory constants
+Z_PIXMAP = 2
+ALL_PLANES = 0xFFFFFFFF
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+
+
+class _XImage(ctypes.Structure):
+    # The leading fields of Xlib's XImage, up to the ones read here
+    _fields_ = [("width", ctypes.c_int), ("height", ctypes.c_int), ("xoffset", ctypes.c_int),
+                ("format", ctypes.c_int), ("data", ctypes.c_void_p), ("byte_order", ctypes.c_int),
+                ("bitmap_unit", ctypes.c_int), ("bitmap_bit_order", ctypes.c_int),
+                ("bitmap_pad", ctypes.c_int), ("depth", ctypes.c_int), ("bytes_per_line", ctypes.c_int),
+                ("bits_per_pixel", ctypes.c_int)]
+
+
+class _ShmSegmentInfo(ctypes.Structure):
+    _fields_ = [("shmseg", ctypes.c_ulong), ("shmid", ctypes.c_int), ("shmaddr", ctypes.c_void_p),
+                ("readOnly", ctypes.c_int)]
+
+
+def _load_x11():
+    """(libX11, libXext, libc) with the signatures used here, or None where they can't be loaded"""
+    x11_name, xext_name = ctypes.util.find_library("X11"), ctypes.util.find_library("Xext")
+    if x11_name is None or xext_name is None:
+        return None
+    try:
+        x11, xext = ctypes.CDLL(x11_name), ctypes.CDLL(xext_name)
+        libc = ctypes.CDLL(None, use_errno=True)
+    except OSError:
+        return None
+    x11.XOpenDisplay.restype = ctypes.c_void_p
+    x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+    x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+    for function in (x11.XDefaultDepth, x11.XDisplayWidth, x11.XDisplayHeight):
+        function.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XRootWindow.restype = ctypes.c_ulong
+    x11.XRootWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XDefaultVisual.restype = ctypes.c_void_p
+    x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XFree.argtypes = [ctypes.c_void_p]
+    xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+    xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+    xext.XShmCreateImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                                     ctypes.c_void_p, ctypes.POINTER(_ShmSegmentInfo), ctypes.c_uint,
+                                     ctypes.c_uint]
+    xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_ShmSegmentInfo)]
+    xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_ShmSegmentInfo)]
+    xext.XShmGetImage.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage), ctypes.c_int,
+                                  ctypes.c_int, ctypes.c_ulong]
+    libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+    libc.shmat.restype = ctypes.c_void_p
+    libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+    libc.shmdt.argtypes = [ctypes.c_void_p]
+    libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+    return x11, xext, libc
+
+
+class ShmScreen:
+    """Captures regions of the X11 root window through MIT-SHM
+
+    Each region size gets one shared-memory image, attached to the X
+    server once; every capture of that size has the server write straight
+    into it, and the frame returned is a view of that memory, valid until
+    the next capture of the same size. Use from one thread at a time.
+    """
+
+    def __init__(self, display=None, libraries=None):
+        loaded = libraries or _load_x11()
+        if loaded is None:
+            raise RuntimeError("MIT-SHM capture needs libX11 and libXext")
+        self._x11, self._xext, self._libc = loaded
+        self.display = self._x11.XOpenDisplay(display.encode() if display else None)
+        if not self.display:
+            raise RuntimeError("Can't open the X display")
+        if not self._xext.XShmQueryExtension(self.display):
+            self._x11.XCloseDisplay(self.display)
+            raise RuntimeError("X server has no MIT-SHM extension")
+        screen = self._x11.XDefaultScreen(self.display)
+        self._root = self._x11.XRootWindow(self.display, screen)
+        self._visual = self._x11.XDefaultVisual(self.display, screen)
+        self._depth = self._x11.XDefaultDepth(self.display, screen)
+        self.width = self._x11.XDisplayWidth(self.display, screen)
+        self.height = self._x11.XDisplayHeight(self.display, screen)
+        self._images = {}  # (width, height) -> (XImage pointer, segment info, memoryview)
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    def _image(self, width, height):
+        image = self._images.get((width, height))
+        if image is not None:
+            return image
+        info = _ShmSegmentInfo()
+        ximage = self._xext.XShmCreateImage(self.display, self._visual, self._depth, Z_PIXMAP, None,
+                                            ctypes.byref(info), width, height)
+        if not ximage:
+            raise RuntimeError("Can't create a shared-memory image")
+        if ximage.contents.bits_per_pixel != BYTES_PER_PIXEL * 8:
+            self._x11.XFree(ximage)
+            raise RuntimeError(f"Screen capture needs 32 bits per pixel, not {ximage.contents.bits_per_pixel}")
+        size = ximage.contents.bytes_per_line * height
+        info.shmid = self._libc.shmget(IPC_PRIVATE, size, IPC_CREAT | 0o600)
+        if info.shmid < 0:
+            self._x11.XFree(ximage)
+            raise RuntimeError(f"Can't allocate shared memory: {ctypes.get_errno()}")
+        address = self._libc.shmat(info.shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            self._libc.shmctl(info.shmid, IPC_RMID, None)
+            self._x11.XFree(ximage)
+            raise RuntimeError(f"Can't attach shared memory: {ctypes.get_errno()}")
+        info.shmaddr = ximage.contents.data = address
+        self._xext.XShmAttach(self.display, ctypes.byref(info))
+        self._x11.XSync(self.display, False)
+        # Marked for removal now, so the segment goes away with us however the process ends
+        self._libc.shmctl(info.shmid, IPC_RMID, None)
+        view = memoryview((ctypes.c_char * size).from_address(address)).cast("B")
+        image = self._images[width, height] = (ximage, info, view)
+        return image
+
+    def capture(self, left, top, width, height):
+        check_region(self.size, left, top, width, height)
+        ximage, _, view = self._image(width, height)
+        captured_at = time.perf_counter()
+        if not self._xext.XShmGetImage(self.display, self._root, ximage, left, top, ALL_PLANES):
+            raise RuntimeError("MIT-SHM capture failed")
+        return Frame(width, height, view, ximage.contents.bytes_per_line, captured_at)
+
+    def close(self):
+        if not self.display:
+            return
+        for ximage, info, view in self._images.values():
+            view.release()
+            self._xext.XShmDetach(self.display, ctypes.byref(info))
+            ximage.contents.data = None  # the segment isn't Xlib's to free
+            self._x11.XFree(ximage)
+        self._x11.XSync(self.display, False)
+        for _, info, _ in self._images.values():
+            self._libc.shmdt(info.shmaddr)
+        self._images.clear()
+        self._x11.XCloseDisplay(self.display)
+        self.display = None
+
+
+class XlibScreen:
+    """Captures regions through python-xlib's GetImage; each capture is a copy over the X socket"""
+
+    def __init__(self, display=None):
+        if Display is None:
+            raise RuntimeError("Xlib capture needs python-xlib")
+        try:
+            self.display = Display(display)
+        except Exception as e:  # python-xlib raises its own errors for a missing or refused display
+            raise RuntimeError(f"Can't open the X display: {e}") from e
+        screen = self.display.screen()
+        self._root = screen.root
+        self.width = screen.width_in_pixels
+        self.height = screen.height_in_pixels
+        if screen.root_depth not in (24, 32):
+            self.display.close()
+            raise RuntimeError(f"Screen capture needs 24-bit colour, not {screen.root_depth}")
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    def capture(self, left, top, width, height):
+        check_region(self.size, left, top, width, height)
+        captured_at = time.perf_counter()
+        image = self._root.get_image(left, top, width, height, X.ZPixmap, ALL_PLANES)
+        return Frame(width, height, image.data, len(image.data) // height, captured_at)
+
+    def close(self):
+        self.display.close()
+
+
+def open_screen():
+    """The first screen capture that works here, or None if the screen can't be read"""
+    for screen in (ShmScreen, XlibScreen):
+        try:
+            return screen()
+        except RuntimeError:
+            continue
+    return None
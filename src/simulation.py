@@ -0,0 +1,169 @@
+"""
+Simulation - Drive the real click engine on virtual time
+Hotkey presses, config changes and click limits from an hours-long session
+replay deterministically, with no real sleeping or clicking. Nothing is
+skipped: every click still runs the engine's loop, at several microseconds
+each, so replay time grows with the click count. Three hours at 10 CPS
+replay in about a second, an hour at 50 CPS in one and a half.
+"""
+
+import heapq
+import itertools
+
+from click_engine import ClickEngine
+from triggers import MemoryScreen
+
+
+class VirtualClock:
+    """Clock that only moves when slept on, firing scheduled events as it passes them"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+        self._events = []
+        self._order = itertools.count()  # keeps same-time events in scheduling order
+
+    def __call__(self):
+        return self.now
+
+    def call_at(self, when, action, *args):
+        """Run action(*args) once the clock reaches `when`"""
+        heapq.heappush(self._events, (when, next(self._order), action, args))
+
+    def next_event_time(self):
+        return self._events[0][0] if self._events else None
+
+    def fire_next(self):
+        """Jump to the next scheduled event and run it"""
+        when, _, action, args = heapq.heappop(self._events)
+        if when > self.now:
+            self.now = when
+        action(*args)
+
+    def sleep(self, seconds):
+        """Advance by `seconds`, running any events that fall inside"""
+        target = self.now + seconds if seconds > 0 else self.now
+        events = self._events
+        while events and events[0][0] <= target:
+            self.fire_next()
+        self.now = target
+
+
+class SimulatedMouse:
+    """Mouse stand-in that counts clicks on a virtual clock
+
+    Each click can be made to cost virtual time, to model a slow backend.
+    """
+
+    def __init__(self, clock, click_cost=0.0, record=False):
+        self.clock = clock
+        self.click_cost = click_cost
+        self.position = (0, 0)
+        self.clicks = 0
+        self.click_times = [] if record else None
+        self.first_click = None
+        self.last_click = None
+
+    def click(self, button, count=1):
+        now = self.clock.now
+        if self.first_click is None:
+            self.first_click = now
+        self.last_click = now
+        self.clicks += count
+        if self.click_times is not None:
+            self.click_times.append(now)
+        if self.click_cost:
+            self.clock.sleep(self.click_cost)
+
+
+class Simulation:
+    """Scripted session for the click engine, replayed on a virtual clock
+
+    Schedule events with start/stop/toggle/hold/update, then call run().
+    """
+
+    def __init__(self, config=None, click_cost=0.0, record_clicks=False, screen_size=None):
+        self.clock = VirtualClock()
+        self.mouse = SimulatedMouse(self.clock, click_cost, record_clicks)
+        # For triggers: an in-memory screen to paint with at(), captured on virtual time
+        self.screen = MemoryScreen(*screen_size, clock=self.clock) if screen_size else None
+        # No spinning: the virtual sleep always lands exactly on the deadline
+        self.engine = ClickEngine(self.mouse, config, clock=self.clock, sleep=self.clock.sleep,
+                                  spin_threshold=0, screen=self.screen)
+        self.log = []  # (time, event, click count) for every replayed event
+        self.sessions = []  # (start, end, clicks) for every clicking session
+        self._start_pending = False
+        self._ended = False
+
+    # === Event scheduling ===
+
+    def at(self, when, action, *args):
+        """Run an arbitrary action at a virtual time"""
+        self.clock.call_at(when, action, *args)
+        return self
+
+    def start(self, when):
+        return self.at(when, self._start)
+
+    def stop(self, when):
+        return self.at(when, self._stop)
+
+    def toggle(self, when):
+        """Hotkey press in toggle mode"""
+        return self.at(when, self._toggle)
+
+    def hold(self, when, duration):
+        """Hotkey held down in hold mode"""
+        self.at(when, self._start)
+        return self.at(when + duration, self._stop)
+
+    def update(self, when, **changes):
+        """Config change published mid-run"""
+        return self.at(when, self._update, changes)
+
+    # === Event handlers ===
+
+    def _record(self, event):
+        self.log.append((self.clock.now, event, self.engine.click_count))
+
+    def _start(self):
+        self._record("start")
+        if not self._ended and not self.engine.is_running:
+            # The session itself runs from run(), not inside this event
+            self._start_pending = True
+
+    def _stop(self):
+        self._record("stop")
+        self._start_pending = False
+        self.engine.stop()
+
+    def _toggle(self):
+        if self.engine.is_running or self._start_pending:
+            self._stop()
+        else:
+            self._start()
+
+    def _update(self, changes):
+        self._record("update")
+        self.engine.update(**changes)
+
+    def _end(self):
+        self._ended = True
+        self._stop()
+
+    # === Replay ===
+
+    def run(self, until):
+        """Replay every event up to `until` seconds of virtual time"""
+        self.at(until, self._end)
+        clock = self.clock
+        while True:
+            if self._start_pending:
+                self._start_pending = False
+                started = clock.now
+                self.engine.run()
+                self.sessions.append((started, clock.now, self.engine.click_count))
+                continue
+            if self._ended or clock.next_event_time() is None:
+                break
+            clock.fire_next()
+        return self
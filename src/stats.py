@@ -0,0 +1,194 @@
+"""
+Stats - Fixed-memory timing histograms and per-session click statistics
+Records how well the clicking loop actually hits the requested rate.
+"""
+
+import json
+import time
+from array import array
+
+# Histogram values are whole microseconds
+MICROS = 1_000_000
+
+# Largest value a histogram tracks exactly; bigger values land in the top bucket
+DEFAULT_MAX_SECONDS = 60
+
+# Sub-buckets per power of two, as bits; 7 bits keeps every bucket within ~1.6%
+DEFAULT_PRECISION_BITS = 7
+
+# Weight of the newest interval in the smoothed CPS
+EWMA_ALPHA = 0.1
+
+
+class Histogram:
+    """HDR-style log-linear histogram with a fixed number of buckets
+
+    Values below 2**precision_bits get a bucket each; above that every power
+    of two is split into the same number of buckets, so the relative error is
+    constant however large the value.
+    """
+
+    def __init__(self, max_value=DEFAULT_MAX_SECONDS * MICROS, precision_bits=DEFAULT_PRECISION_BITS):
+        self.precision_bits = precision_bits
+        self.sub_count = 1 << precision_bits
+        self.half_count = self.sub_count >> 1
+        self.max_value = max_value
+        self.bucket_count = self._index(max_value) + 1
+        self.reset()
+
+    def reset(self):
+        self.counts = array("Q", bytes(8 * self.bucket_count))
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def _index(self, value):
+        if value < self.sub_count:
+            return value
+        shift = value.bit_length() - self.precision_bits
+        return shift * self.half_count + (value >> shift)
+
+    def _value_at(self, index):
+        """Midpoint of the range of values that land in a bucket"""
+        if index < self.sub_count:
+            return index
+        shift = index // self.half_count - 1
+        low = (index - shift * self.half_count) << shift
+        return low + ((1 << shift) >> 1)
+
+    def record(self, value):
+        """Record a non-negative integer value"""
+        # Called several times per click, so _index is inlined and min/max avoided
+        value = int(value)
+        if value < 0:
+            value = 0
+        elif value > self.max_value:
+            value = self.max_value
+        if value < self.sub_count:
+            self.counts[value] += 1
+        else:
+            shift = value.bit_length() - self.precision_bits
+            self.counts[shift * self.half_count + (value >> shift)] += 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        """Value at the given percentile (0-100), or 0 if nothing was recorded"""
+        if not self.total:
+            return 0
+        wanted = max(1, percent / 100 * self.total)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                seen += count
+                if seen >= wanted:
+                    return min(self._value_at(index), self.max)
+        return self.max
+
+    def mean(self):
+        return self.sum / self.total if self.total else 0
+
+    def summary(self, scale=1):
+        """Percentile summary, with every value divided by scale"""
+        return {
+            "count": self.total,
+            "mean": self.mean() / scale,
+            "p50": self.percentile(50) / scale,
+            "p90": self.percentile(90) / scale,
+            "p99": self.percentile(99) / scale,
+            "max": self.max / scale,
+        }
+
+
+class ClickStats:
+    """Per-session timing statistics filled in by the clicking loop"""
+
+    def __init__(self):
+        self.intervals = Histogram()  # time between consecutive clicks
+        self.interval_errors = Histogram()  # |actual - scheduled interval|
+        self.click_latency = Histogram()  # time spent inside mouse.click()
+        self.trigger_latency = Histogram()  # screen capture to click, for triggered clicks
+        self.reset()
+
+    def reset(self, target_cps=0):
+        """Start a new session"""
+        self.intervals.reset()
+        self.interval_errors.reset()
+        self.click_latency.reset()
+        self.trigger_latency.reset()
+        self.target_cps = target_cps
+        self.started_at = time.time()
+        self.clicks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.start_latency = None  # start request to first click, minus the start delay
+        self.stop_latency = None  # stop request to the loop exiting
+        self.ewma_interval = 0.0
+        self.rate_error = None  # rate controller terms, while one is running
+        self.rate_correction = None
+        self._last_click = None
+        self._last_lateness = 0.0
+
+    def record_click(self, started, finished, lateness):
+        """Record one click that began at `started`, `lateness` seconds after its deadline"""
+        self.clicks += 1
+        self.click_latency.record((finished - started) * MICROS)
+        if self._last_click is not None:
+            interval = started - self._last_click
+            self.intervals.record(interval * MICROS)
+            # Scheduled interval is the gap between deadlines, so the error is
+            # just the change in lateness
+            self.interval_errors.record(abs(lateness - self._last_lateness) * MICROS)
+            if self.ewma_interval:
+                self.ewma_interval += EWMA_ALPHA * (interval - self.ewma_interval)
+            else:
+                self.ewma_interval = interval
+        self._last_click = started
+        self._last_lateness = lateness
+
+    def record_trigger(self, latency):
+        """Record the time from capturing the frame that met a trigger to its click"""
+        self.trigger_latency.record(latency * MICROS)
+
+    @property
+    def measured_cps(self):
+        """Smoothed clicks per second"""
+        return 1 / self.ewma_interval if self.ewma_interval else 0.0
+
+    def record_burst(self, count, started, finished):
+        """Record `count` clicks fired back to back in one call"""
+        self.clicks += count
+        self.click_latency.record((finished - started) / count * MICROS)
+        self._last_click = started
+
+    def error_percentiles(self):
+        """Interval error (p50, p99, max) in microseconds"""
+        errors = self.interval_errors
+        return errors.percentile(50), errors.percentile(99), errors.max
+
+    def to_dict(self):
+        """Session summary with times in milliseconds"""
+        ms = MICROS / 1000
+        return {
+            "started_at": self.started_at,
+            "clicks": self.clicks,
+            "target_cps": self.target_cps,
+            "measured_cps": self.measured_cps,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "start_latency_ms": None if self.start_latency is None else self.start_latency * 1000,
+            "stop_latency_ms": None if self.stop_latency is None else self.stop_latency * 1000,
+            "interval_ms": self.intervals.summary(ms),
+            "interval_error_ms": self.interval_errors.summary(ms),
+            "click_latency_ms": self.click_latency.summary(ms),
+            "trigger_latency_ms": self.trigger_latency.summary(ms),
+            "rate_error": self.rate_error,
+            "rate_correction": self.rate_correction,
+        }
+
+    def export_json(self, path):
+        """Write the session summary to a JSON file"""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
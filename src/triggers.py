@@ -0,0 +1,319 @@
+"""
+Triggers - Click only while a region of the screen meets a condition
+A trigger watches one rectangle for a colour, a template image or any
+change. Only that rectangle is captured (see screens.py for the X11
+display), and it is compared in place, vectorized with NumPy when it is
+installed, so a poll costs little more than the capture itself.
+"""
+
+import time
+
+from optional import numpy
+
+# Available triggers
+TRIGGER_OFF = ""
+TRIGGER_PIXEL = "pixel"  # any pixel in the region within tolerance of a colour
+TRIGGER_TEMPLATE = "template"  # the region within tolerance of a saved image, on average
+TRIGGER_CHANGE = "change"  # any pixel in the region changed since the last poll
+TRIGGERS = (TRIGGER_OFF, TRIGGER_PIXEL, TRIGGER_TEMPLATE, TRIGGER_CHANGE)
+
+# Per-channel difference (0-255) still counted as a match
+DEFAULT_TOLERANCE = 16
+
+# Region captures per second while waiting for the condition
+DEFAULT_POLL_RATE = 200
+
+# Side of the square a template is captured from, around the pointer
+DEFAULT_TEMPLATE_SIZE = 32
+
+# Frames are 32 bits per pixel, blue, green, red and a padding byte, as X11 stores 24-bit colour
+BYTES_PER_PIXEL = 4
+
+# Regions with fewer pixels are compared in plain Python, which beats NumPy's per-call overhead there
+NUMPY_MIN_PIXELS = 64
+
+# A pixel whose four per-channel checks all passed, read from a bool array as one uint32
+ALL_CHANNELS = 0x01010101
+
+
+class Frame:
+    """Captured pixels: `height` rows of BGRX, `stride` bytes apart
+
+    `data` may be a view of a buffer the next capture overwrites; copy()
+    keeps a frame. `captured_at` is the screen's clock just before capture.
+    """
+
+    __slots__ = ("width", "height", "data", "stride", "captured_at")
+
+    def __init__(self, width, height, data, stride=None, captured_at=0.0):
+        self.width = width
+        self.height = height
+        self.data = data
+        self.stride = width * BYTES_PER_PIXEL if stride is None else stride
+        self.captured_at = captured_at
+
+    def rows(self):
+        """Copies of each row's pixel bytes, without any padding past the last pixel"""
+        data, stride, length = self.data, self.stride, self.width * BYTES_PER_PIXEL
+        return [bytes(data[row * stride:row * stride + length]) for row in range(self.height)]
+
+    def pixel(self, x, y):
+        """(r, g, b) at x, y within the frame"""
+        offset = y * self.stride + x * BYTES_PER_PIXEL
+        b, g, r = self.data[offset:offset + 3]
+        return r, g, b
+
+    def array(self):
+        """(height, width * 4) NumPy view of the BGRX rows, without copying them
+
+        Rows rather than pixels, so NumPy loops along whole rows.
+        """
+        np = numpy()
+        return np.ndarray((self.height, self.width * BYTES_PER_PIXEL), np.uint8, buffer=self.data,
+                          strides=(self.stride, 1))
+
+    def copy(self):
+        """Frame holding its own packed copy of the pixels"""
+        return Frame(self.width, self.height, b"".join(self.rows()), captured_at=self.captured_at)
+
+
+def watch_region(rect, position, size=(1, 1)):
+    """(left, top, width, height) a trigger captures
+
+    A rect (left, top, right, bottom, inclusive) is watched whole, unless a
+    template's size is given, which is then placed at its top-left corner.
+    Without a rect, a size-sized area is centred on the position.
+    """
+    if rect is not None:
+        left, top, right, bottom = rect
+        if size == (1, 1):
+            return left, top, right - left + 1, bottom - top + 1
+        return (left, top) + tuple(size)
+    x, y = position
+    width, height = size
+    return x - width // 2, y - height // 2, width, height
+
+
+def solid_frame(width, height, color):
+    """Frame of one (r, g, b) colour"""
+    r, g, b = color
+    return Frame(width, height, bytes((b, g, r, 0)) * (width * height))
+
+
+def load_template(path):
+    """Read a binary PPM (P6) image as a frame; raises ValueError for anything else"""
+    with open(path, "rb") as f:
+        data = f.read()
+    fields = []
+    offset = 0
+    # Header: magic, width, height, maxval, separated by whitespace and # comments
+    while len(fields) < 4:
+        while offset < len(data) and data[offset:offset + 1].isspace():
+            offset += 1
+        if data[offset:offset + 1] == b"#":
+            offset = data.find(b"\n", offset) + 1 or len(data)
+            continue
+        end = offset
+        while end < len(data) and not data[end:end + 1].isspace():
+            end += 1
+        if end == offset:
+            raise ValueError(f"{path}: truncated PPM header")
+        fields.append(data[offset:end])
+        offset = end
+    try:
+        width, height, maxval = (int(value) for value in fields[1:])
+    except ValueError:
+        raise ValueError(f"{path}: bad PPM header") from None
+    if fields[0] != b"P6" or maxval != 255 or width < 1 or height < 1:
+        raise ValueError(f"{path}: templates must be 8-bit binary PPM (P6) images")
+    rgb = data[offset + 1:offset + 1 + width * height * 3]
+    if len(rgb) != width * height * 3:
+        raise ValueError(f"{path}: truncated PPM image")
+    pixels = bytearray(width * height * BYTES_PER_PIXEL)
+    pixels[0::4], pixels[1::4], pixels[2::4] = rgb[2::3], rgb[1::3], rgb[0::3]
+    return Frame(width, height, bytes(pixels))
+
+
+def save_template(frame, path):
+    """Write a frame as a binary PPM (P6) image"""
+    packed = b"".join(frame.rows())
+    rgb = bytearray(frame.width * frame.height * 3)
+    rgb[0::3], rgb[1::3], rgb[2::3] = packed[2::4], packed[1::4], packed[0::4]
+    with open(path, "wb") as f:
+        f.write(b"P6\n%d %d\n255\n" % (frame.width, frame.height))
+        f.write(rgb)
+
+
+# === Conditions ===
+
+def _abs_diff(a, b):
+    """|a - b| of two uint8 arrays, without leaving uint8"""
+    np = numpy()
+    return np.maximum(a, b) - np.minimum(a, b)
+
+
+def _vectorize(use_numpy, frame):
+    return use_numpy and frame.width * frame.height >= NUMPY_MIN_PIXELS
+
+
+class _RowPattern:
+    """Per-channel BGRX values repeated across a row, rebuilt only when the width changes"""
+
+    def __init__(self, bgrx):
+        np = numpy()
+        self.bgrx = np.array(bgrx, np.uint8)
+        self.row = self.bgrx
+
+    def __call__(self, width):
+        if len(self.row) != width * BYTES_PER_PIXEL:
+            self.row = numpy().tile(self.bgrx, width)
+        return self.row
+
+
+class PixelCondition:
+    """Any pixel of the frame within `tolerance` of `color` on every channel"""
+
+    def __init__(self, color, tolerance=DEFAULT_TOLERANCE, use_numpy=True):
+        r, g, b = color
+        self.bgr = (b, g, r)
+        self.tolerance = tolerance
+        self.use_numpy = use_numpy and numpy() is not None
+        if self.use_numpy:
+            # Per-channel bounds; any padding byte is inside them
+            self._low = _RowPattern([max(c - tolerance, 0) for c in self.bgr] + [0])
+            self._high = _RowPattern([min(c + tolerance, 255) for c in self.bgr] + [255])
+
+    def matches(self, frame):
+        if _vectorize(self.use_numpy, frame):
+            rows = frame.array()
+            inside = (rows >= self._low(frame.width)) & (rows <= self._high(frame.width))
+            return bool((inside.view(numpy().uint32) == ALL_CHANNELS).any())
+        (b, g, r), tolerance = self.bgr, self.tolerance
+        for row in frame.rows():
+            for i in range(0, len(row), BYTES_PER_PIXEL):
+                if abs(row[i] - b) <= tolerance and abs(row[i + 1] - g) <= tolerance \
+                        and abs(row[i + 2] - r) <= tolerance:
+                    return True
+        return False
+
+
+class TemplateCondition:
+    """The frame's mean per-channel difference from a same-sized template within `tolerance`"""
+
+    def __init__(self, template, tolerance=DEFAULT_TOLERANCE, use_numpy=True):
+        self.template = template.copy()
+        self.tolerance = tolerance
+        self.use_numpy = use_numpy and numpy() is not None
+        self._limit = tolerance * template.width * template.height * 3
+        if self.use_numpy:
+            self._template = self.template.array().copy()
+        self._channels = [row[i] for row in self.template.rows() for i in range(len(row))
+                          if i % BYTES_PER_PIXEL != 3]
+
+    @property
+    def size(self):
+        return self.template.width, self.template.height
+
+    def matches(self, frame):
+        if (frame.width, frame.height) != self.size:
+            raise ValueError(f"Captured {frame.width}x{frame.height}, but the template is "
+                             f"{self.template.width}x{self.template.height}")
+        if _vectorize(self.use_numpy, frame):
+            np = numpy()
+            diff = _abs_diff(frame.array(), self._template)
+            return int(diff.sum(dtype=np.uint64)) - int(diff[:, 3::4].sum(dtype=np.uint64)) <= self._limit
+        channels = [row[i] for row in frame.rows() for i in range(len(row)) if i % BYTES_PER_PIXEL != 3]
+        return sum(abs(a - b) for a, b in zip(channels, self._channels)) <= self._limit
+
+
+class ChangeCondition:
+    """Any pixel of the frame more than `tolerance` away from the last frame seen, on any channel
+
+    The first frame only sets the baseline, and every frame becomes the
+    next one's, so a change matches once rather than for as long as it lasts.
+    """
+
+    def __init__(self, tolerance=DEFAULT_TOLERANCE, use_numpy=True):
+        self.tolerance = tolerance
+        self.use_numpy = use_numpy and numpy() is not None
+        if self.use_numpy:
+            # Differences in the padding byte never count
+            self._threshold = _RowPattern([tolerance] * 3 + [255])
+        self._last = None
+
+    def matches(self, frame):
+        if _vectorize(self.use_numpy, frame):
+            np = numpy()
+            current = frame.array().copy()  # the capture buffer is reused
+            last, self._last = self._last, current
+            if not isinstance(last, np.ndarray) or last.shape != current.shape or np.array_equal(current, last):
+                return False
+            return bool((_abs_diff(current, last) > self._threshold(frame.width)).any())
+        current = frame.rows()
+        last, self._last = self._last, current
+        if not isinstance(last, list) or len(last) != len(current) or current == last:
+            return False
+        tolerance = self.tolerance
+        for row, before in zip(current, last):
+            if row != before and any(abs(a - b) > tolerance for i, (a, b) in enumerate(zip(row, before))
+                                     if i % BYTES_PER_PIXEL != 3):
+                return True
+        return False
+
+
+def make_condition(trigger, color=None, tolerance=DEFAULT_TOLERANCE, template=None, use_numpy=True):
+    """Condition object for a trigger name"""
+    if trigger == TRIGGER_PIXEL:
+        return PixelCondition(color, tolerance, use_numpy)
+    if trigger == TRIGGER_TEMPLATE:
+        return TemplateCondition(template, tolerance, use_numpy)
+    if trigger == TRIGGER_CHANGE:
+        return ChangeCondition(tolerance, use_numpy)
+    raise ValueError(f"Unknown trigger: {trigger!r}")
+
+
+# === Screens ===
+
+class MemoryScreen:
+    """Screen held in memory, for tests and benchmarks; captures are views, not copies"""
+
+    def __init__(self, width, height, color=(0, 0, 0), clock=time.perf_counter):
+        self.width = width
+        self.height = height
+        self.clock = clock
+        self.stride = width * BYTES_PER_PIXEL
+        self.buffer = bytearray(solid_frame(width, height, color).data)
+        self._view = memoryview(self.buffer)
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    def fill(self, left, top, width, height, color):
+        """Paint a rectangle one (r, g, b) colour"""
+        self.paste(solid_frame(width, height, color), left, top)
+
+    def paste(self, frame, left, top):
+        """Paint a frame with its top-left corner at left, top"""
+        check_region(self.size, left, top, frame.width, frame.height)
+        for row, pixels in enumerate(frame.rows()):
+            offset = (top + row) * self.stride + left * BYTES_PER_PIXEL
+            self.buffer[offset:offset + len(pixels)] = pixels
+
+    def capture(self, left, top, width, height):
+        captured_at = self.clock()
+        check_region(self.size, left, top, width, height)
+        start = top * self.stride + left * BYTES_PER_PIXEL
+        return Frame(width, height, self._view[start:], self.stride, captured_at)
+
+    def close(self):
+        pass
+
+
+def check_region(size, left, top, width, height):
+    """Raise ValueError unless the region lies within a screen of size (width, height)"""
+    screen_width, screen_height = size
+    if width < 1 or height < 1 or left < 0 or top < 0 or left + width > screen_width \
+            or top + height > screen_height:
+        raise ValueError(f"Region {width}x{height} at {left},{top} is outside the "
+                         f"{screen_width}x{screen_height} screen")
@@ -0,0 +1,125 @@
+"""
+Smoke tests for the benchmark scripts - Keep them runnable on a headless box
+"""
+
+import importlib.util
+import os
+
+import pytest
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+
+def load_benchmark(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BENCH_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def bench():
+    return load_benchmark("bench_click_loop")
+
+
+class TestClickLoopBenchmark:
+    """Test the click loop benchmark"""
+
+    def test_case_matrix(self, bench):
+        """Test the matrix covers every combination"""
+        assert len(list(bench.case_matrix())) == 32
+        assert len(list(bench.case_matrix(quick=True))) == 16
+
+    def test_run_case(self, bench):
+        """Test one case runs and reports every metric"""
+        case = {"cps": 200, "random_variation": 0, "double_click": True, "use_fixed_position": True}
+        result = bench.run_case(case, duration=0.2, memory_duration=0.05)
+        assert result["clicks"] > 10
+        assert result["achieved_cps"] == pytest.approx(200, rel=0.05)
+        for metric in ("interval_error_p99_ms", "cpu_us_per_click", "peak_memory_kb"):
+            assert result[metric] >= 0
+
+    def test_gui_load(self, bench):
+        """Test interval error under GUI load is measured for both engine modes"""
+        load = bench.measure_gui_load(duration=0.2)
+        for mode in ("thread", "process"):
+            assert load[mode]["clicks"] > 10
+            assert 0 <= load[mode]["p50_ms"] <= load[mode]["max_ms"]
+
+    def test_precision(self, bench):
+        """Test interval error under CPU load is measured with and without precision mode"""
+        results = bench.measure_precision(duration=0.2)
+        for mode in ("normal", "precision"):
+            assert results[mode]["clicks"] > 10
+        assert results["precision"]["applied"]
+
+    def test_burst(self, bench):
+        """Test burst throughput is measured"""
+        burst = bench.measure_burst(size=1000)
+        assert burst["clicks"] == 1000
+        assert burst["clicks_per_s"] > 0
+
+    def test_backends(self, bench):
+        """Test every operation is timed for each backend asked for"""
+        results = bench.measure_backends(calls=100)
+        for name in ("null", "recording"):
+            assert set(results[name]) == {"move_us", "press_release_us", "click_us", "double_click_us"}
+            assert results[name]["click_us"] > 0
+
+    def test_profiles(self, bench):
+        """Test scheduling overhead is measured for each number of profiles"""
+        results = bench.measure_profiles(counts=(1, 3), duration=0.2)
+        assert [r["profiles"] for r in results] == [1, 3]
+        for r in results:
+            assert r["clicks"] >= r["profiles"] * 10
+            assert r["cpu_us_per_click"] > 0
+
+    def test_control_api(self, bench):
+        """Test control API round trips are timed for reads and writes"""
+        results = bench.measure_control_api(requests=20)
+        if "error" in results:
+            pytest.skip(results["error"])
+        for cmd in ("status", "set"):
+            assert 0 < results[cmd]["p50_ms"] <= results[cmd]["max_ms"]
+
+    def test_cli_startup(self, bench):
+        """Test the CLI is timed from spawn to its first click"""
+        results = bench.measure_cli_startup(runs=1)
+        summary = results["spawn_to_first_click_ms"]
+        assert summary["p50_ms"] >= results["in_process_ms"]["p50_ms"] > 0
+
+    def test_triggers(self, bench):
+        """Test trigger polls are timed for every case and reactions to a change are measured"""
+        results = bench.measure_triggers(polls=20, duration=0.2)
+        assert set(results["poll_us"]) == {"pixel_1px", "pixel_64px", "template_32px", "change_64px"}
+        assert all(costs["python_us"] > 0 for costs in results["poll_us"].values())
+        assert results["reactions"] > 0
+        assert 0 <= results["change_to_click"]["p50_ms"] <= results["change_to_click"]["max_ms"]
+
+    def test_control_latency(self, bench):
+        """Test start and stop latency are measured over several cycles"""
+        latency = bench.measure_control_latency(cycles=5)
+        assert latency["cycles"] == 5
+        for name in ("start", "stop"):
+            assert 0 <= latency[name]["p50_ms"] <= latency[name]["max_ms"]
+
+    def test_fake_mouse_counts_double_clicks(self, bench):
+        """Test the fake mouse counts every click it is asked for"""
+        mouse = bench.FakeMouse()
+        mouse.click("left")
+        mouse.click("left", 2)
+        assert mouse.clicks == 3
+
+    def test_compare_flags_regressions(self, bench):
+        """Test a slower, less accurate run is reported against the baseline"""
+        case = {"cps": 50, "random_variation": 0, "double_click": False, "use_fixed_position": False}
+        baseline = {"results": [dict(case, rate_error_pct=0.1, cpu_us_per_click=10.0)]}
+        current = {"results": [dict(case, rate_error_pct=2.0, cpu_us_per_click=20.0)]}
+        metrics = [metric for _, metric, _ in bench.compare(current, baseline)]
+        assert metrics == ["rate_error_pct", "cpu_us_per_click"]
+
+    def test_compare_ignores_new_cases(self, bench):
+        """Test cases missing from the baseline are skipped"""
+        case = {"cps": 50, "random_variation": 0, "double_click": False, "use_fixed_position": False}
+        current = {"results": [dict(case, rate_error_pct=2.0, cpu_us_per_click=20.0)]}
+        assert bench.compare(current, {"results": []}) == []
@@ -0,0 +1,128 @@
+"""
+Unit tests for the CLI - Argument parsing, headless runs and the startup profile
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from cli import ImportTimer, StartupProfile, build_parser, parse_point, run
+
+CLI_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "cli.py")
+
+
+def run_cli(*argv):
+    out, err = io.StringIO(), io.StringIO()
+    status = run(build_parser().parse_args(["run", "--backend", "null", *argv]), out, err)
+    return status, out.getvalue(), err.getvalue()
+
+
+class TestArguments:
+    """Test the command line is parsed into click settings"""
+
+    def test_parse_point(self):
+        """Test positions are read as x,y"""
+        assert parse_point("100,200") == (100, 200)
+        assert parse_point("-5,0") == (-5, 0)
+        for text in ("100", "1,2,3", "a,b"):
+            with pytest.raises(argparse.ArgumentTypeError):
+                parse_point(text)
+
+    def test_defaults(self):
+        """Test run defaults to the pynput backend and no limit"""
+        args = build_parser().parse_args(["run"])
+        assert (args.backend, args.limit, args.button, args.at) == ("pynput", 0, "left", None)
+
+    def test_no_command_means_gui(self):
+        """Test no arguments leave the command unset, which opens the GUI"""
+        assert build_parser().parse_args([]).command is None
+
+    def test_unknown_backend(self, capsys):
+        """Test an unknown backend is a usage error, before anything runs"""
+        with pytest.raises(SystemExit) as exit_info:
+            build_parser().parse_args(["run", "--backend", "carrier-pigeon"])
+        assert exit_info.value.code == 2
+        assert "carrier-pigeon" in capsys.readouterr().err
+
+
+class TestRun:
+    """Test headless runs against the null backend"""
+
+    def test_limit(self):
+        """Test a run stops at its click limit and reports the clicks"""
+        status, out, _ = run_cli("--cps", "500", "--limit", "5", "--at", "10,20")
+        assert status == 0
+        assert out.startswith("5 clicks")
+        assert "first click" in out
+
+    def test_json(self):
+        """Test --json prints the session stats with the time to the first click"""
+        _, out, _ = run_cli("--burst", "20", "--json")
+        summary = json.loads(out)
+        assert summary["clicks"] == 20
+        assert summary["first_click_ms"] > 0
+        assert summary["first_click_at"] > 0
+
+    def test_duration(self):
+        """Test --duration stops an unlimited run"""
+        status, out, _ = run_cli("--cps", "100", "--duration", "0.1")
+        assert status == 0
+        assert int(out.split()[0]) > 0
+
+    def test_invalid_settings(self):
+        """Test settings the engine refuses are reported, not raised"""
+        status, _, err = run_cli("--cps", "0")
+        assert status == 2
+        assert err.startswith("manual-labor:")
+
+    def test_profile_startup(self):
+        """Test --profile-startup reports each phase on stderr"""
+        _, _, err = run_cli("--limit", "1", "--profile-startup")
+        assert "engine imports" in err
+        assert "null backend" in err
+        assert "engine setup to first click" in err
+
+    def test_no_gui_imports(self):
+        """Test a headless run never imports tkinter, an unused backend's library or NumPy for features that are off"""
+        script = ("import sys, cli; cli.main(['run', '--backend', 'null', '--limit', '1']); "
+                  "print(sorted(m for m in ('tkinter', 'pynput', 'Xlib', 'manual_labor', 'numpy', 'ctypes')"
+                  " if m in sys.modules))")
+        output = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(CLI_PATH),
+                                capture_output=True, text=True, check=True).stdout
+        assert output.splitlines()[-1] == "[]"
+
+
+class TestStartupProfile:
+    """Test import timing and the phase report"""
+
+    def test_import_timer(self):
+        """Test new imports are recorded with their nesting, and the hook is removed after"""
+        import builtins
+        original = builtins.__import__
+        sys.modules.pop("colorsys", None)
+        with ImportTimer() as timer:
+            import colorsys  # noqa: F401
+        assert builtins.__import__ is original
+        assert ("colorsys", 0) in [(name, depth) for _, depth, name in timer.records]
+
+    def test_already_imported_not_recorded(self):
+        """Test modules that are already loaded cost nothing and aren't listed"""
+        with ImportTimer() as timer:
+            import json  # noqa: F401
+        assert timer.records == []
+
+    def test_report(self):
+        """Test phases are listed with a total"""
+        profile = StartupProfile(enabled=True)
+        with profile.phase("first"):
+            pass
+        out = io.StringIO()
+        profile.report(out)
+        lines = out.getvalue().splitlines()
+        assert lines[1].endswith("first")
+        assert lines[-1].endswith("total since the CLI module loaded")
@@ -0,0 +1,138 @@
+"""
+Unit tests for click config snapshots - Validation, derived values and settings round-trips
+"""
+
+import dataclasses
+import json
+
+import pytest
+
+from click_config import ClickConfig
+from scheduler import OVERRUN_CATCH_UP
+
+
+class TestValidation:
+    """Test settings are checked when the snapshot is built"""
+
+    @pytest.mark.parametrize("changes", [
+        {"cps": 0},
+        {"cps": -5},
+        {"random_variation": -1},
+        {"random_variation": 100},
+        {"click_limit": -1},
+        {"start_delay": -2},
+        {"burst_size": -1},
+        {"overrun_policy": "panic"},
+        {"rate_window": 1},
+        {"trigger": "smoke"},
+        {"trigger": "change"},  # nothing to watch
+        {"trigger": "pixel", "use_fixed_position": True},  # no colour
+        {"trigger": "template", "use_fixed_position": True},  # no image
+        {"trigger_color": (256, 0, 0)},
+        {"trigger_rect": (10, 10, 5, 20)},
+        {"trigger_tolerance": 300},
+        {"trigger_poll_rate": 0},
+        {"fixed_x": "abc"},
+    ])
+    def test_invalid_values_rejected(self, changes):
+        """Test invalid settings raise ValueError"""
+        with pytest.raises(ValueError):
+            ClickConfig(**changes)
+
+    def test_values_normalised(self):
+        """Test parsed values are stored with their proper types"""
+        config = ClickConfig(cps="20", fixed_x="150", fixed_y=300.0, click_limit="7")
+        assert config.cps == 20.0
+        assert config.fixed_x == 150
+        assert config.fixed_y == 300
+        assert config.click_limit == 7
+
+
+class TestSnapshot:
+    """Test snapshots are immutable and precompute what the loop needs"""
+
+    def test_frozen(self):
+        """Test a snapshot can't be modified"""
+        config = ClickConfig()
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.cps = 20
+
+    def test_slotted(self):
+        """Test a snapshot has no instance dict"""
+        assert not hasattr(ClickConfig(), "__dict__")
+
+    def test_derived_values(self):
+        """Test interval, variation, clicks and position are precomputed"""
+        config = ClickConfig(cps=50, random_variation=30, double_click=True,
+                             use_fixed_position=True, fixed_x=10, fixed_y=20)
+        assert config.interval == pytest.approx(0.02)
+        assert config.jitter_spread == pytest.approx(0.3)
+        assert config.clicks_per_tick == 2
+        assert config.position == (10, 20)
+
+    def test_no_position_when_disabled(self):
+        """Test position is None when fixed position is off"""
+        assert ClickConfig(fixed_x=10, fixed_y=20).position is None
+
+    def test_replace_recomputes(self):
+        """Test replace builds a new snapshot with fresh derived values"""
+        config = ClickConfig(cps=10)
+        faster = config.replace(cps=100)
+        assert config.interval == pytest.approx(0.1)
+        assert faster.interval == pytest.approx(0.01)
+
+
+class TestSettingsRoundTrip:
+    """Test conversion to and from the settings file format"""
+
+    def test_round_trip(self):
+        """Test a config survives JSON serialisation"""
+        config = ClickConfig(cps=25, click_limit=100, overrun_policy=OVERRUN_CATCH_UP)
+        loaded = ClickConfig.from_settings(json.loads(json.dumps(config.to_settings())))
+        assert loaded == config
+
+    def test_settings_exclude_derived_values(self):
+        """Test derived values and the button and macro objects are not saved"""
+        settings = ClickConfig().to_settings()
+        assert "interval" not in settings
+        assert "mouse_button" not in settings
+        assert "macro" not in settings
+
+    def test_macro_name_ignored(self):
+        """Test a macro name in the settings doesn't end up as the macro"""
+        assert ClickConfig.from_settings({"macro": "farm"}).macro is None
+
+    def test_unknown_keys_ignored(self):
+        """Test GUI-only keys in the settings file are ignored"""
+        config = ClickConfig.from_settings({"cps": 30, "dark_mode": True, "hotkey": "F7"})
+        assert config.cps == 30
+
+    def test_overrides(self):
+        """Test overrides are applied on top of the settings"""
+        config = ClickConfig.from_settings({"cps": 30}, mouse_button="left")
+        assert config.mouse_button == "left"
+
+    def test_bad_types_raise_value_error(self):
+        """Test unconvertible values raise ValueError"""
+        with pytest.raises(ValueError):
+            ClickConfig.from_settings({"cps": None})
+
+
+class TestJitterSettings:
+    """Test the jitter part of the config"""
+
+    def test_unknown_distribution_rejected(self):
+        """Test an unknown distribution is refused"""
+        with pytest.raises(ValueError):
+            ClickConfig(jitter_distribution="cauchy")
+
+    def test_empirical_needs_file(self):
+        """Test empirical jitter needs a timings file"""
+        with pytest.raises(ValueError):
+            ClickConfig(jitter_distribution="empirical")
+
+    def test_jitter_key_tracks_spread(self):
+        """Test changing the variation changes the jitter key"""
+        config = ClickConfig(random_variation=10)
+        assert config.jitter_key() != config.replace(random_variation=20).jitter_key()
+        assert config.jitter_key() == config.replace(cps=50).jitter_key()
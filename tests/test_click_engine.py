@@ -0,0 +1,380 @@
+"""
+Unit tests for the click engine - Runs the real clicking loop against a fake mouse
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import click_engine
+from click_config import ClickConfig
+from click_engine import ClickEngine
+from simulation import Simulation
+
+
+class FakeMouse:
+    """In-memory stand-in for pynput.mouse.Controller"""
+
+    def __init__(self):
+        self.position = (0, 0)
+        self.clicks = []
+        self.calls = 0
+
+    def click(self, button, count=1):
+        self.calls += 1
+        for _ in range(count):
+            self.clicks.append((button, self.position))
+
+
+def run_to_limit(engine, timeout=5):
+    engine.start()
+    engine.join(timeout)
+    assert not engine.is_running
+
+
+def make_engine(mouse, **settings):
+    settings.setdefault("mouse_button", "left")
+    return ClickEngine(mouse, ClickConfig(**settings))
+
+
+class TestEngineSettings:
+    """Test engine config publishing"""
+
+    def test_defaults(self):
+        """Test a new engine starts from the default config"""
+        engine = ClickEngine(FakeMouse())
+        assert engine.config == ClickConfig()
+
+    def test_update_swaps_snapshot(self):
+        """Test update publishes a new snapshot instead of mutating the old one"""
+        engine = make_engine(FakeMouse())
+        old = engine.config
+        engine.update(click_limit=5, mouse_button="right")
+        assert engine.config is not old
+        assert old.click_limit == 0
+        assert engine.config.click_limit == 5
+        assert engine.config.mouse_button == "right"
+
+    def test_invalid_update_keeps_config(self):
+        """Test an invalid update raises and leaves the config untouched"""
+        engine = make_engine(FakeMouse())
+        old = engine.config
+        with pytest.raises(ValueError):
+            engine.update(cps=0)
+        assert engine.config is old
+
+    def test_unknown_setting_rejected(self):
+        """Test update refuses settings the engine does not know"""
+        engine = make_engine(FakeMouse())
+        with pytest.raises(TypeError):
+            engine.update(dark_mode=True)
+
+    def test_no_tkinter_import(self):
+        """Test the engine can be imported without tkinter"""
+        code = "import sys, click_engine; sys.exit('tkinter' in sys.modules)"
+        src_dir = os.path.dirname(click_engine.__file__)
+        result = subprocess.run([sys.executable, "-c", code], cwd=src_dir)
+        assert result.returncode == 0
+
+
+class TestClickingLoop:
+    """Test the real clicking loop"""
+
+    def test_click_limit_stops_engine(self):
+        """Test the loop stops itself at the click limit"""
+        stopped = []
+        mouse = FakeMouse()
+        engine = make_engine(mouse, cps=500, random_variation=0, click_limit=20)
+        engine.on_stop = lambda: stopped.append(True)
+        run_to_limit(engine)
+        assert engine.click_count == 20
+        assert len(mouse.clicks) == 20
+        assert stopped == [True]
+
+    def test_double_click_counts_once(self):
+        """Test double click mode clicks twice per count"""
+        mouse = FakeMouse()
+        engine = make_engine(mouse, cps=500, click_limit=10, double_click=True)
+        run_to_limit(engine)
+        assert engine.click_count == 10
+        assert len(mouse.clicks) == 20
+        assert mouse.calls == 10
+
+    def test_button_passed_through(self):
+        """Test the configured button reaches the mouse"""
+        mouse = FakeMouse()
+        engine = make_engine(mouse, mouse_button="middle", cps=500, click_limit=3)
+        run_to_limit(engine)
+        assert {button for button, _ in mouse.clicks} == {"middle"}
+
+    def test_fixed_position(self):
+        """Test fixed position mode moves before clicking"""
+        mouse = FakeMouse()
+        engine = make_engine(mouse, cps=500, click_limit=3,
+                             use_fixed_position=True, fixed_x=100, fixed_y=200)
+        run_to_limit(engine)
+        assert {pos for _, pos in mouse.clicks} == {(100, 200)}
+
+    def test_on_click_called_per_click(self):
+        """Test the click callback fires once per click"""
+        calls = []
+        engine = make_engine(FakeMouse(), cps=500, click_limit=7)
+        engine.on_click = lambda: calls.append(True)
+        run_to_limit(engine)
+        assert len(calls) == 7
+
+    def test_stop(self):
+        """Test stop ends an unlimited session"""
+        mouse = FakeMouse()
+        engine = make_engine(mouse, cps=200)
+        engine.start()
+        engine.stop()
+        assert engine.join(1)
+        assert not engine.is_running
+
+    def test_restart_resets_counter(self):
+        """Test starting again resets the click counter"""
+        engine = make_engine(FakeMouse(), cps=500, click_limit=5)
+        run_to_limit(engine)
+        engine.update(click_limit=3)
+        run_to_limit(engine)
+        assert engine.click_count == 3
+
+    def test_config_change_mid_session(self):
+        """Test a config published while running is picked up by the loop"""
+        mouse = FakeMouse()
+        engine = make_engine(mouse, cps=500)
+        engine.start()
+        while engine.click_count < 5:
+            pass
+        engine.update(mouse_button="right", click_limit=15)
+        engine.join(5)
+        assert engine.click_count == 15
+        assert mouse.clicks[-1][0] == "right"
+
+
+class TestEngineJitter:
+    """Test how the engine builds its jitter source"""
+
+    def test_seeded_sessions_repeat(self):
+        """Test a seeded config gives every session the same offsets"""
+        config = ClickConfig(jitter_seed=7, random_variation=20)
+        assert ClickEngine.make_jitter(config).take(50) == ClickEngine.make_jitter(config).take(50)
+
+    def test_missing_recording_fails_on_publish(self, tmp_path):
+        """Test a missing timings file is reported by update, not the loop"""
+        engine = make_engine(FakeMouse())
+        with pytest.raises(OSError):
+            engine.update(jitter_distribution="empirical", jitter_timings_file=str(tmp_path / "missing.json"))
+        assert engine.config.jitter_distribution == "uniform"
+
+    def test_empirical_session(self, tmp_path):
+        """Test a session runs with recorded timings"""
+        path = tmp_path / "timings.json"
+        path.write_text("[0.1, 0.12, 0.09, 0.11]")
+        engine = make_engine(FakeMouse(), cps=500, click_limit=5,
+                             jitter_distribution="empirical", jitter_timings_file=str(path))
+        run_to_limit(engine)
+        assert engine.click_count == 5
+
+
+class TestEngineStats:
+    """Test the stats the engine records while clicking"""
+
+    def test_stats_recorded(self):
+        """Test every click lands in the stats"""
+        # On virtual time, so the measured rate doesn't depend on how busy the machine is
+        sim = Simulation(ClickConfig(cps=200, random_variation=0, click_limit=40)).start(0).run(1)
+        stats = sim.engine.stats
+        assert stats.clicks == 40
+        assert stats.intervals.total == 39
+        assert stats.target_cps == 200
+        assert stats.measured_cps == pytest.approx(200, rel=0.05)
+
+    def test_stats_reset_per_session(self):
+        """Test each session starts with fresh stats"""
+        engine = make_engine(FakeMouse(), cps=500, click_limit=10)
+        run_to_limit(engine)
+        engine.update(click_limit=4)
+        run_to_limit(engine)
+        assert engine.stats.clicks == 4
+
+
+class TestPersistentWorker:
+    """Test the long-lived worker thread and session generations"""
+
+    def test_one_worker_for_all_sessions(self):
+        """Test starting again reuses the same worker thread"""
+        engine = make_engine(FakeMouse(), cps=500, click_limit=3)
+        run_to_limit(engine)
+        worker = engine.click_thread
+        run_to_limit(engine)
+        assert engine.click_thread is worker
+        assert worker.is_alive()
+
+    def test_stop_interrupts_sleep(self):
+        """Test stop wakes a loop that is sleeping towards a distant deadline"""
+        engine = make_engine(FakeMouse(), cps=0.5, random_variation=0)
+        engine.start()
+        while engine.click_count < 1:
+            pass
+        started = time.perf_counter()
+        engine.stop()
+        assert engine.join(1)
+        assert time.perf_counter() - started < 0.1
+
+    def test_rapid_restart_runs_one_loop(self):
+        """Test hammering stop/start never leaves two loops clicking"""
+        mouse = FakeMouse()
+        engine = make_engine(mouse, cps=100, random_variation=0)
+        for _ in range(50):
+            engine.start()
+            engine.stop()
+        engine.start()
+        time.sleep(0.5)
+        engine.stop()
+        engine.join(1)
+        # One loop at 100 CPS; two would show up as ~100 clicks
+        assert engine.click_count <= 52
+
+    def test_stale_generation_cannot_stop_new_session(self):
+        """Test ending an old generation leaves the current session alone"""
+        engine = make_engine(FakeMouse(), cps=100)
+        engine.start()
+        old = engine.generation
+        engine.stop()
+        engine.start()
+        engine._end_session(old)
+        assert engine.is_running
+        engine.stop()
+
+    def test_start_latency_recorded(self):
+        """Test the time from start() to the first click is measured"""
+        engine = make_engine(FakeMouse(), cps=500, click_limit=2)
+        run_to_limit(engine)
+        assert 0 <= engine.stats.start_latency < 0.05
+
+    def test_start_latency_excludes_start_delay(self):
+        """Test the start delay isn't counted as latency"""
+        engine = make_engine(FakeMouse(), cps=500, click_limit=1, start_delay=0.1)
+        run_to_limit(engine)
+        assert 0 <= engine.stats.start_latency < 0.05
+
+    def test_failed_session_leaves_worker_usable(self):
+        """Test a backend error ends the session and the next start still clicks"""
+        class FailingMouse(FakeMouse):
+            fail = True
+
+            def click(self, button, count=1):
+                if self.fail:
+                    self.fail = False
+                    raise OSError("device went away")
+                super().click(button, count)
+
+        mouse = FailingMouse()
+        engine = make_engine(mouse, cps=500, click_limit=5)
+        engine.start()
+        assert engine.join(5)
+        assert not engine.is_running
+        assert isinstance(engine.error, OSError)
+        run_to_limit(engine)
+        assert len(mouse.clicks) == 5
+        assert engine.error is None
+        engine.close()
+
+    def test_close(self):
+        """Test close stops the session and ends the worker"""
+        engine = make_engine(FakeMouse(), cps=100)
+        engine.start()
+        engine.close()
+        assert not engine.is_running
+        assert not engine.click_thread.is_alive()
+        with pytest.raises(RuntimeError):
+            engine.start()
+
+
+class TestControlLatency:
+    """Test start and stop reach the loop within a few milliseconds"""
+
+    def test_stop_latency_recorded(self):
+        """Test a stop from another thread ends the loop within 5 ms"""
+        engine = make_engine(FakeMouse(), cps=2, random_variation=0)
+        engine.start()
+        while engine.click_count < 1:
+            time.sleep(0.001)
+        engine.stop()
+        engine.join(1)
+        assert 0 <= engine.stats.stop_latency < 0.005
+
+    def test_start_from_listener_timestamp(self):
+        """Test latency is measured from the caller's input timestamp"""
+        engine = make_engine(FakeMouse(), cps=500, click_limit=1)
+        pressed = engine.clock()
+        engine.start(requested_at=pressed)
+        engine.join(1)
+        assert 0 <= engine.stats.start_latency < 0.005
+
+    def test_no_clicks_after_stop_returns(self):
+        """Test no new click starts once stop() has returned"""
+        mouse = FakeMouse()
+        engine = make_engine(mouse, cps=1000, random_variation=0)
+        engine.start()
+        while engine.click_count < 20:
+            time.sleep(0.001)
+        engine.stop()
+        engine.join(1)
+        clicks = len(mouse.clicks)
+        time.sleep(0.05)
+        assert len(mouse.clicks) == clicks
+
+    def test_limit_stop_has_no_stop_latency(self):
+        """Test a session that ends at its limit records no stop latency"""
+        engine = make_engine(FakeMouse(), cps=500, click_limit=3)
+        run_to_limit(engine)
+        assert engine.stats.stop_latency is None
+
+
+class TestBurstMode:
+    """Test bursts of clicks fired back to back"""
+
+    def test_burst_ignores_cps(self):
+        """Test a burst fires every click at once, in few calls, then stops"""
+        mouse = FakeMouse()
+        engine = make_engine(mouse, cps=1, burst_size=1000)
+        started = time.perf_counter()
+        run_to_limit(engine)
+        assert time.perf_counter() - started < 1
+        assert engine.click_count == 1000
+        assert len(mouse.clicks) == 1000
+        assert mouse.calls == -(-1000 // click_engine.BURST_CHUNK)
+        assert engine.stats.clicks == 1000
+        assert engine.stats.stop_latency is None
+
+    def test_double_click_burst(self):
+        """Test a burst of double clicks sends two clicks per count"""
+        mouse = FakeMouse()
+        engine = make_engine(mouse, burst_size=10, double_click=True, use_fixed_position=True,
+                             fixed_x=5, fixed_y=6)
+        run_to_limit(engine)
+        assert engine.click_count == 10
+        assert mouse.clicks == [("left", (5, 6))] * 20
+
+    def test_stop_mid_burst(self):
+        """Test a stop takes effect between chunks"""
+        class SlowMouse(FakeMouse):
+            def click(self, button, count=1):
+                super().click(button, count)
+                time.sleep(0.01)
+
+        mouse = SlowMouse()
+        engine = make_engine(mouse, burst_size=100 * click_engine.BURST_CHUNK)
+        engine.start()
+        while mouse.calls < 2:
+            time.sleep(0.001)
+        engine.stop()
+        assert engine.join(1)
+        assert engine.click_count < 100 * click_engine.BURST_CHUNK
+        assert engine.stats.stop_latency is not None
@@ -0,0 +1,135 @@
+"""
+Unit tests for click sounds - Samples, the ring buffer and the mixer's pacing, against a null sink
+"""
+
+import time
+
+import pytest
+
+from click_config import ClickConfig
+from click_engine import ClickEngine
+from click_sound import ClickSoundMixer, NullSink, RingBuffer, Sample, load_sample, synth_click
+from mouse_backends import NullMouse
+
+
+class TestSamples:
+    """Test the click sample is built and loaded into memory"""
+
+    def test_synth_click(self):
+        """Test the built-in click is a short 16-bit mono sample that fades out"""
+        sample = synth_click(rate=8000, seconds=0.01)
+        assert (sample.rate, sample.channels) == (8000, 1)
+        assert len(sample.data) == 160
+        assert sample.data != bytes(160)
+        assert sample.data[-8:] != sample.data[:8]
+
+    def test_wav_round_trip(self, tmp_path):
+        """Test a sample saved as WAV loads back unchanged"""
+        sample = Sample(bytes(range(40)), rate=22050, channels=2)
+        path = tmp_path / "click.wav"
+        path.write_bytes(sample.to_wav())
+        loaded = load_sample(str(path))
+        assert (loaded.data, loaded.rate, loaded.channels) == (sample.data, 22050, 2)
+
+    def test_not_a_wav_rejected(self, tmp_path):
+        """Test a file that isn't 16-bit WAV raises ValueError"""
+        path = tmp_path / "click.wav"
+        path.write_bytes(b"not audio")
+        with pytest.raises(ValueError):
+            load_sample(str(path))
+
+
+class TestRingBuffer:
+    """Test the FIFO between the audio thread and the sound card"""
+
+    def test_wraps_around(self):
+        """Test data comes out in order across the end of the buffer"""
+        ring = RingBuffer(8)
+        assert ring.write(b"abcdef") == 6
+        assert ring.read(4) == b"abcd"
+        assert ring.write(b"ghijk") == 5
+        assert len(ring) == 7
+        assert ring.read(7) == b"efghijk"
+
+    def test_overflow_cut_short(self):
+        """Test a write that doesn't fit keeps what does"""
+        ring = RingBuffer(4)
+        assert ring.write(b"abcdef") == 4
+        assert ring.read(4) == b"abcd"
+
+    def test_underrun_padded_with_silence(self):
+        """Test a read past the data is filled with zeros"""
+        ring = RingBuffer(8)
+        ring.write(b"ab")
+        assert ring.read(5) == b"ab\0\0\0"
+        assert ring.read(2) == b"\0\0"
+
+
+class TestMixer:
+    """Test clicks are collapsed into paced sounds off the click thread"""
+
+    def wait_for(self, condition, timeout=1.0):
+        end = time.perf_counter() + timeout
+        while not condition() and time.perf_counter() < end:
+            time.sleep(0.001)
+        return condition()
+
+    def test_single_click_plays(self):
+        """Test one trigger plays one sound"""
+        sink = NullSink()
+        mixer = ClickSoundMixer(sink)
+        mixer.trigger()
+        assert self.wait_for(lambda: sink.played == 1)
+        mixer.close()
+        assert sink.played == 1
+
+    def test_burst_collapses(self):
+        """Test thousands of clicks at once make only a sound or two"""
+        sink = NullSink()
+        mixer = ClickSoundMixer(sink, max_rate=10)
+        for _ in range(10_000):
+            mixer.trigger()
+        assert self.wait_for(lambda: sink.played >= 1)
+        time.sleep(0.15)
+        mixer.close()
+        assert 1 <= sink.played <= 2
+
+    def test_rate_capped(self):
+        """Test a steady stream of clicks plays no more than max_rate sounds a second"""
+        sink = NullSink()
+        mixer = ClickSoundMixer(sink, max_rate=20)
+        end = time.perf_counter() + 0.5
+        while time.perf_counter() < end:
+            mixer.trigger()
+            time.sleep(0.001)
+        mixer.close()
+        assert 3 <= sink.played <= 11
+
+    def test_disabled_is_silent(self):
+        """Test triggers are ignored while sound is turned off"""
+        sink = NullSink()
+        mixer = ClickSoundMixer(sink)
+        mixer.enabled = False
+        mixer.trigger()
+        time.sleep(0.05)
+        mixer.close()
+        assert sink.played == 0
+
+    def test_invalid_rate_rejected(self):
+        """Test a zero sound rate raises ValueError"""
+        with pytest.raises(ValueError):
+            ClickSoundMixer(NullSink(), max_rate=0)
+
+    def test_engine_triggers_from_click_thread(self):
+        """Test the engine's on_click hook drives the mixer without any GUI"""
+        sink = NullSink()
+        mixer = ClickSoundMixer(sink)
+        engine = ClickEngine(NullMouse(), ClickConfig(cps=500, click_limit=200, random_variation=0),
+                             on_click=mixer.trigger)
+        engine.start()
+        engine.join(2)
+        engine.close()
+        time.sleep(0.1)
+        mixer.close()
+        assert engine.click_count == 200
+        assert 1 <= sink.played <= 10
@@ -0,0 +1,178 @@
+"""
+Unit tests for the control server - The JSON-lines protocol over a real Unix socket
+"""
+
+import json
+import os
+import socket
+import stat
+
+import pytest
+
+from click_config import ClickConfig
+from click_engine import ClickEngine
+from control_server import ControlClient, ControlServer
+from mouse_backends import NullMouse
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def engine():
+    engine = ClickEngine(NullMouse(), ClickConfig(cps=200, random_variation=0))
+    yield engine
+    engine.close()
+
+
+@pytest.fixture
+def server(engine, tmp_path):
+    profiles = {"slow": ClickConfig(cps=2)}
+    server = ControlServer(engine, str(tmp_path / "control.sock"), load_profile=profiles.__getitem__)
+    server.start()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def client(server):
+    client = ControlClient(server.path)
+    yield client
+    client.close()
+
+
+class TestCommands:
+    """Test each command reaches the engine"""
+
+    def test_start_and_stop(self, engine, client):
+        """Test start and stop drive the engine and report its state"""
+        assert client.request("start")["running"]
+        assert engine.is_running
+        reply = client.request("stop")
+        assert not reply["running"]
+        assert not engine.is_running
+        assert client.request("toggle")["running"]
+        assert not client.request("toggle")["running"]
+
+    def test_set(self, engine, client):
+        """Test set publishes new settings and returns the config"""
+        reply = client.request("set", cps=50, random_variation=10, fixed_x=5, fixed_y=6, use_fixed_position=True)
+        assert reply["config"]["cps"] == 50
+        assert engine.config.position == (5, 6)
+        assert engine.config.random_variation == 10
+
+    @pytest.mark.parametrize("args", [{"cps": -1}, {"speed": 3}, {}, {"mouse_button": "left"}])
+    def test_set_invalid(self, engine, client, args):
+        """Test bad settings are refused and leave the config alone"""
+        with pytest.raises(ValueError):
+            client.request("set", **args)
+        assert engine.config.cps == 200
+
+    def test_profile(self, engine, client):
+        """Test a named profile replaces the config"""
+        client.request("profile", name="slow")
+        assert engine.config.cps == 2
+        with pytest.raises(ValueError, match="Unknown profile"):
+            client.request("profile", name="missing")
+
+    def test_engine_failures_replied(self, engine, tmp_path):
+        """Test a config the engine can't load, or a closed engine, gets an error reply, not a dropped connection"""
+        missing = ClickConfig(jitter_distribution="empirical", jitter_timings_file=str(tmp_path / "missing.json"))
+        server = ControlServer(engine, str(tmp_path / "control.sock"), load_profile={"broken": missing}.__getitem__)
+        server.start()
+        client = ControlClient(server.path)
+        try:
+            with pytest.raises(ValueError, match="missing.json"):
+                client.request("profile", name="broken")
+            engine.close()
+            with pytest.raises(ValueError, match="closed"):
+                client.request("start")
+            assert client.request("status")["running"] is False
+        finally:
+            client.close()
+            server.close()
+
+    def test_unknown_command(self, client):
+        """Test an unknown command gets an error reply and the connection stays usable"""
+        with pytest.raises(ValueError, match="Unknown command"):
+            client.request("explode")
+        assert client.request("status")["clicks"] == 0
+
+    def test_malformed_line(self, server):
+        """Test a line that isn't JSON gets an error reply"""
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.connect(server.path)
+            sock.sendall(b"not json\n")
+            reply = json.loads(sock.makefile("rb").readline())
+        assert reply["ok"] is False
+
+
+class TestStats:
+    """Test stats replies and the subscription stream"""
+
+    def test_subscribe(self, client):
+        """Test a subscriber receives stats events until it unsubscribes"""
+        client.request("start")
+        client.request("subscribe", interval=0.02)
+        events = [client.next_event() for _ in range(3)]
+        assert all(event["event"] == "stats" and event["running"] for event in events)
+        assert events[-1]["clicks"] >= events[0]["clicks"]
+        client.request("unsubscribe")
+        assert client.request("stats")["clicks"] > 0
+
+    def test_many_clients(self, server, engine):
+        """Test several clients are served at once, each getting its own replies"""
+        clients = [ControlClient(server.path) for _ in range(10)]
+        try:
+            for i, c in enumerate(clients):
+                c.request("subscribe", interval=0.05)
+                c.request("set", cps=10 + i)
+            assert engine.config.cps == 19
+            assert all(c.next_event()["event"] == "stats" for c in clients)
+            assert server.clients == 10
+        finally:
+            for c in clients:
+                c.close()
+
+
+class TestServer:
+    """Test the socket's lifecycle"""
+
+    def test_socket_private_and_removed(self, engine, tmp_path, monkeypatch):
+        """Test the socket is owner-only while open and gone after close, without touching the process umask"""
+        monkeypatch.setattr(os, "umask", None)
+        path = str(tmp_path / "control.sock")
+        server = ControlServer(engine, path)
+        server.start()
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        server.close()
+        assert not os.path.exists(path)
+        assert os.listdir(tmp_path) == []
+
+    def test_stale_socket_replaced(self, engine, tmp_path):
+        """Test a socket left by a dead process doesn't stop the server starting"""
+        path = str(tmp_path / "control.sock")
+        stale = socket.socket(socket.AF_UNIX)
+        stale.bind(path)
+        stale.close()
+        server = ControlServer(engine, path)
+        server.start()
+        client = ControlClient(path)
+        assert client.request("status")["running"] is False
+        client.close()
+        server.close()
+
+    def test_live_socket_left_alone(self, server, engine):
+        """Test a second server refuses a path a live server listens on, and the first stays reachable"""
+        with pytest.raises(RuntimeError):
+            ControlServer(engine, server.path).start()
+        client = ControlClient(server.path)
+        assert client.request("status")["running"] is False
+        client.close()
+
+    def test_other_file_left_alone(self, engine, tmp_path):
+        """Test a regular file at the path is an error, not deleted"""
+        path = tmp_path / "control.sock"
+        path.write_text("keep me")
+        with pytest.raises(RuntimeError):
+            ControlServer(engine, str(path)).start()
+        assert path.read_text() == "keep me"
@@ -0,0 +1,107 @@
+"""
+Unit tests for the engine process - The real clicking loop in a child process
+"""
+
+import time
+from functools import partial
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+
+from click_config import ClickConfig
+from engine_process import EngineProcess
+from mouse_backends import NullMouse
+from triggers import MemoryScreen
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def engine():
+    engine = EngineProcess(NullMouse, ClickConfig(cps=200, random_variation=0, mouse_button="left"))
+    yield engine
+    engine.close()
+
+
+class TestEngineProcess:
+    """Test the child process engine through its ClickEngine-style surface"""
+
+    def test_start_and_stop(self, engine):
+        """Test state flips at once and clicks show up in shared memory"""
+        engine.start()
+        assert engine.is_running
+        wait_for(lambda: engine.click_count >= 10)
+        engine.stop()
+        assert not engine.is_running
+        assert engine.join(1)
+        count = engine.click_count
+        time.sleep(0.05)
+        assert engine.click_count == count
+
+    def test_stats_from_child(self, engine):
+        """Test the session summary and panel stats come from the child"""
+        engine.start()
+        wait_for(lambda: engine.click_count >= 20)
+        engine.stop()
+        engine.join(1)
+        stats = engine.stats.to_dict()
+        assert stats["clicks"] == engine.click_count
+        assert stats["stop_latency_ms"] is not None
+        wait_for(lambda: engine.stats.measured_cps > 0)
+        p50, p99, worst = engine.stats.error_percentiles()
+        assert 0 <= p50 <= p99 <= worst
+
+    def test_update_reaches_child(self, engine):
+        """Test config changes are validated here and applied in the child"""
+        with pytest.raises(ValueError):
+            engine.update(cps=0)
+        engine.update(click_limit=5)
+        assert engine.config.click_limit == 5
+        engine.start()
+        wait_for(lambda: not engine.is_running)
+        assert engine.click_count == 5
+
+    def test_trigger_needs_screen(self, engine):
+        """Test a trigger is refused here when the child has no screen to capture"""
+        with pytest.raises(ValueError, match="screen"):
+            engine.update(trigger="change", use_fixed_position=True)
+
+    def test_trigger_region_checked(self):
+        """Test a trigger region off the child's screen is refused here"""
+        engine = EngineProcess(NullMouse, screen_factory=partial(MemoryScreen, 20, 20), screen_size=(20, 20))
+        try:
+            with pytest.raises(ValueError, match="outside"):
+                engine.update(trigger="change", use_fixed_position=True, fixed_x=50, fixed_y=50)
+        finally:
+            engine.close()
+
+    def test_child_errors_raised(self):
+        """Test a config the child's engine refuses raises here and leaves the config alone"""
+        engine = EngineProcess(NullMouse, screen_factory=partial(MemoryScreen, 20, 20))
+        try:
+            # No screen_size, so only the child can see the region is off its screen
+            with pytest.raises(ValueError, match="outside"):
+                engine.update(trigger="change", use_fixed_position=True, fixed_x=50, fixed_y=50)
+            assert not engine.config.trigger
+            engine.update(cps=50)
+            assert engine.config.cps == 50
+            assert engine.stats.to_dict()["clicks"] == 0
+        finally:
+            engine.close()
+
+    def test_close_frees_shared_memory(self):
+        """Test closing ends the child and unlinks the shared block"""
+        engine = EngineProcess(NullMouse)
+        name = engine._shm.name
+        engine.close()
+        engine.close()
+        assert not engine.process.is_alive()
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=name)
+        with pytest.raises(RuntimeError):
+            engine.start()
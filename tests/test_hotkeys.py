@@ -0,0 +1,192 @@
+"""
+Unit tests for the hotkey dispatcher - Chord matching, auto-repeat and the dispatch thread
+"""
+
+import threading
+import time
+
+import pytest
+
+from hotkeys import (ACTION_CPS_UP, ACTION_EMERGENCY_STOP, ACTION_HOLD, ACTION_TOGGLE,
+                     HotkeyDispatcher, parse_chord)
+
+MODIFIERS = {"ctrl_l": "ctrl", "ctrl_r": "ctrl", "shift": "shift"}
+
+
+class Recorder:
+    """Collects dispatched events and lets a test wait for them"""
+
+    def __init__(self):
+        self.events = []
+        self.arrived = threading.Semaphore(0)
+
+    def __call__(self, binding, pressed, at):
+        self.events.append((binding.action, binding.key, pressed))
+        self.arrived.release()
+
+    def wait(self, count, timeout=1):
+        for _ in range(count):
+            assert self.arrived.acquire(timeout=timeout)
+        return self.events
+
+
+def make_dispatcher(*bindings):
+    dispatcher = HotkeyDispatcher(MODIFIERS)
+    recorder = Recorder()
+    for action in (ACTION_TOGGLE, ACTION_HOLD, ACTION_CPS_UP, ACTION_EMERGENCY_STOP):
+        dispatcher.on(action, recorder)
+    dispatcher.set_bindings(bindings)
+    dispatcher.start()
+    return dispatcher, recorder
+
+
+class TestParseChord:
+    """Test hotkey strings are split into modifiers and a key"""
+
+    def test_plain_key(self):
+        """Test a key without modifiers"""
+        assert parse_chord("F6") == (frozenset(), "f6")
+
+    def test_modifiers(self):
+        """Test modifiers are collected in any order"""
+        assert parse_chord("shift + ctrl+a") == (frozenset({"ctrl", "shift"}), "a")
+
+    @pytest.mark.parametrize("text", ["", "ctrl+", "hyper+a", "ctrl+shift"])
+    def test_invalid(self, text):
+        """Test malformed chords are rejected"""
+        with pytest.raises(ValueError):
+            parse_chord(text)
+
+
+class TestMatching:
+    """Test key events are matched against the binding table"""
+
+    def test_plain_binding(self):
+        """Test a bare key fires its action"""
+        dispatcher, recorder = make_dispatcher(((), "f6", ACTION_TOGGLE, None))
+        dispatcher.press("f6")
+        dispatcher.release("f6")
+        dispatcher.stop(1)
+        assert recorder.events == [(ACTION_TOGGLE, "f6", True)]
+
+    def test_chord_needs_its_modifiers(self):
+        """Test a chord only fires with exactly its modifiers held"""
+        dispatcher, recorder = make_dispatcher(
+            (("ctrl",), "up", ACTION_CPS_UP, 5),
+            ((), "up", ACTION_TOGGLE, None),
+        )
+        dispatcher.press("up")
+        dispatcher.release("up")
+        dispatcher.press("ctrl_r")
+        dispatcher.press("up")
+        dispatcher.release("up")
+        dispatcher.press("shift")
+        dispatcher.press("up")  # ctrl+shift+up isn't bound
+        dispatcher.stop(1)
+        assert recorder.events == [(ACTION_TOGGLE, "up", True), (ACTION_CPS_UP, "up", True)]
+
+    def test_modifier_release_tracked(self):
+        """Test releasing a modifier takes it out of the chord"""
+        dispatcher, recorder = make_dispatcher((("ctrl",), "a", ACTION_TOGGLE, None))
+        dispatcher.press("ctrl_l")
+        dispatcher.release("ctrl_l")
+        dispatcher.press("a")
+        dispatcher.stop(1)
+        assert recorder.events == []
+
+    def test_auto_repeat_ignored(self):
+        """Test a held key fires once, not on every repeat"""
+        dispatcher, recorder = make_dispatcher(((), "f6", ACTION_TOGGLE, None))
+        for _ in range(5):
+            dispatcher.press("f6")
+        dispatcher.release("f6")
+        dispatcher.press("f6")
+        dispatcher.stop(1)
+        assert len(recorder.events) == 2
+
+    def test_hold_fires_on_release(self):
+        """Test hold bindings fire on release, even after the modifier is let go"""
+        dispatcher, recorder = make_dispatcher((("shift",), "f7", ACTION_HOLD, None))
+        dispatcher.press("shift")
+        dispatcher.press("f7")
+        dispatcher.release("shift")
+        dispatcher.release("f7")
+        dispatcher.stop(1)
+        assert recorder.events == [(ACTION_HOLD, "f7", True), (ACTION_HOLD, "f7", False)]
+
+    def test_rebinding(self):
+        """Test binding a chord again replaces its action"""
+        dispatcher, recorder = make_dispatcher(((), "f6", ACTION_TOGGLE, None))
+        binding = dispatcher.bind((), "f6", ACTION_EMERGENCY_STOP)
+        assert dispatcher.bindings == [binding]
+        dispatcher.press("f6")
+        dispatcher.stop(1)
+        assert recorder.events == [(ACTION_EMERGENCY_STOP, "f6", True)]
+
+    def test_unknown_action(self):
+        """Test binding an unknown action is rejected"""
+        dispatcher = HotkeyDispatcher()
+        with pytest.raises(ValueError):
+            dispatcher.bind((), "f6", "explode")
+        with pytest.raises(ValueError):
+            dispatcher.on("explode", print)
+
+
+class TestDispatchThread:
+    """Test handlers run off the listener thread"""
+
+    def test_handlers_run_on_dispatch_thread(self):
+        """Test the handler runs on the dispatcher's own thread"""
+        dispatcher = HotkeyDispatcher()
+        threads = []
+        done = threading.Event()
+        dispatcher.on(ACTION_TOGGLE, lambda *event: (threads.append(threading.current_thread()),
+                                                     done.set()))
+        dispatcher.bind((), "f6", ACTION_TOGGLE)
+        dispatcher.start()
+        dispatcher.press("f6")
+        assert done.wait(1)
+        dispatcher.stop(1)
+        assert threads and threads[0] is not threading.current_thread()
+
+    def test_slow_handler_does_not_block_listener(self):
+        """Test a slow handler doesn't hold up the key callbacks"""
+        dispatcher = HotkeyDispatcher()
+        release = threading.Event()
+        dispatcher.on(ACTION_TOGGLE, lambda *event: release.wait(1))
+        for i in range(1000):
+            dispatcher.bind((), f"k{i}", ACTION_TOGGLE)
+        dispatcher.start()
+        started = time.perf_counter()
+        for i in range(100):
+            dispatcher.press(f"k{i}")
+            dispatcher.release(f"k{i}")
+        elapsed = time.perf_counter() - started
+        release.set()
+        dispatcher.stop(1)
+        assert elapsed < 0.05
+
+    def test_failing_handler_keeps_dispatching(self, caplog):
+        """Test a handler exception is logged and doesn't stop later events"""
+        dispatcher, recorder = make_dispatcher(((), "f6", ACTION_TOGGLE, None),
+                                               ((), "f7", ACTION_HOLD, None))
+        dispatcher.on(ACTION_TOGGLE, lambda *event: 1 / 0)
+        dispatcher.press("f6")
+        dispatcher.press("f7")
+        assert recorder.wait(1) == [(ACTION_HOLD, "f7", True)]
+        dispatcher.stop(1)
+        assert "Hotkey handler for toggle failed" in caplog.text
+        assert "ZeroDivisionError" in caplog.text
+
+    def test_event_timestamp(self):
+        """Test events carry the clock() time the key arrived"""
+        times = iter([1.5, 2.5])
+        dispatcher = HotkeyDispatcher(clock=lambda: next(times))
+        stamps = []
+        dispatcher.on(ACTION_HOLD, lambda binding, pressed, at: stamps.append(at))
+        dispatcher.bind((), "f6", ACTION_HOLD)
+        dispatcher.start()
+        dispatcher.press("f6")
+        dispatcher.release("f6")
+        dispatcher.stop(1)
+        assert stamps == [1.5, 2.5]
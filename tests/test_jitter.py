@@ -0,0 +1,143 @@
+"""
+Unit tests for jitter sources - Distributions, block refills, seeding and recorded timings
+"""
+
+import json
+import statistics
+
+import pytest
+
+from jitter import (DISTRIBUTIONS, EMPIRICAL, GAUSSIAN, LOGNORMAL, UNIFORM,
+                    JitterSource, build_inverse_cdf, load_timings)
+from optional import numpy
+
+# Recorded human-ish intervals, skewed towards slow clicks
+TIMINGS = [0.09, 0.1, 0.1, 0.1, 0.11, 0.11, 0.12, 0.13, 0.15, 0.18]
+
+BACKENDS = [
+    pytest.param(False, id="python"),
+    pytest.param(True, id="numpy", marks=pytest.mark.skipif(numpy() is None, reason="NumPy not installed")),
+]
+
+
+def make_source(distribution, use_numpy, **kwargs):
+    timings = TIMINGS if distribution == EMPIRICAL else None
+    return JitterSource(distribution, timings=timings, use_numpy=use_numpy, **kwargs)
+
+
+class TestDistributions:
+    """Test every distribution on every backend"""
+
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    @pytest.mark.parametrize("distribution", DISTRIBUTIONS)
+    def test_samples_within_spread(self, distribution, use_numpy):
+        """Test samples never leave ±spread"""
+        source = make_source(distribution, use_numpy, spread=0.2, seed=1)
+        samples = source.take(5000)
+        assert all(-0.2 <= s <= 0.2 for s in samples)
+        assert all(isinstance(s, float) for s in samples)
+
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    @pytest.mark.parametrize("distribution", DISTRIBUTIONS)
+    def test_zero_spread_is_silent(self, distribution, use_numpy):
+        """Test 0% variation produces exact deadlines"""
+        source = make_source(distribution, use_numpy, spread=0.0)
+        assert source.take(100) == [0.0] * 100
+
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    def test_uniform_centred(self, use_numpy):
+        """Test uniform samples average out to zero"""
+        samples = make_source(UNIFORM, use_numpy, spread=0.3, seed=2).take(20000)
+        assert abs(statistics.fmean(samples)) < 0.01
+
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    def test_gaussian_concentrated(self, use_numpy):
+        """Test gaussian samples cluster around zero (±1 sigma holds ~68%)"""
+        samples = make_source(GAUSSIAN, use_numpy, spread=0.2, seed=3).take(20000)
+        inside = sum(1 for s in samples if abs(s) <= 0.1) / len(samples)
+        assert 0.64 < inside < 0.72
+
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    def test_lognormal_right_skewed(self, use_numpy):
+        """Test lognormal has a median of zero and a longer slow tail"""
+        samples = make_source(LOGNORMAL, use_numpy, spread=0.5, seed=4).take(20000)
+        assert abs(statistics.median(samples)) < 0.01
+        assert statistics.fmean(samples) > 0
+
+    def test_unknown_distribution(self):
+        """Test unknown distributions are refused"""
+        with pytest.raises(ValueError):
+            JitterSource("cauchy")
+
+    def test_empirical_needs_timings(self):
+        """Test empirical mode refuses to run without a recording"""
+        with pytest.raises(ValueError):
+            JitterSource(EMPIRICAL)
+
+
+class TestBlocks:
+    """Test block generation and seeding"""
+
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    @pytest.mark.parametrize("distribution", DISTRIBUTIONS)
+    def test_seed_reproducible(self, distribution, use_numpy):
+        """Test the same seed replays the same offsets"""
+        a = make_source(distribution, use_numpy, seed=42, block_size=64).take(500)
+        b = make_source(distribution, use_numpy, seed=42, block_size=64).take(500)
+        assert a == b
+
+    def test_different_seeds_differ(self):
+        """Test different seeds give different offsets"""
+        a = JitterSource(seed=1, use_numpy=False).take(10)
+        b = JitterSource(seed=2, use_numpy=False).take(10)
+        assert a != b
+
+    def test_refills_in_blocks(self):
+        """Test samples are generated a whole block at a time"""
+        source = JitterSource(block_size=8, use_numpy=False)
+        fills = []
+        fill = source._fill
+        source._fill = lambda n: fills.append(n) or fill(n)
+        source.take(20)
+        # The first block was generated by the constructor
+        assert fills == [8, 8]
+
+    def test_invalid_block_size(self):
+        """Test a zero block size is refused"""
+        with pytest.raises(ValueError):
+            JitterSource(block_size=0)
+
+
+class TestEmpirical:
+    """Test the inverse-CDF table built from recorded timings"""
+
+    def test_table_sorted_and_centred(self):
+        """Test the table is monotonic and relative to the mean"""
+        table = build_inverse_cdf(TIMINGS, size=100)
+        assert table == sorted(table)
+        mean = statistics.fmean(TIMINGS)
+        assert table[0] == pytest.approx(0.09 / mean - 1, abs=0.01)
+        assert table[-1] == pytest.approx(0.18 / mean - 1, abs=0.02)
+
+    def test_samples_follow_recording(self):
+        """Test the sampled median matches the recording's median"""
+        samples = JitterSource(EMPIRICAL, spread=0.9, timings=TIMINGS, seed=5, use_numpy=False).take(20000)
+        mean = statistics.fmean(TIMINGS)
+        assert statistics.median(samples) == pytest.approx(statistics.median(TIMINGS) / mean - 1, abs=0.02)
+
+    def test_needs_two_timings(self):
+        """Test a single recorded interval is refused"""
+        with pytest.raises(ValueError):
+            build_inverse_cdf([0.1])
+
+    def test_load_json(self, tmp_path):
+        """Test loading timings from a JSON list"""
+        path = tmp_path / "timings.json"
+        path.write_text(json.dumps(TIMINGS))
+        assert load_timings(path) == TIMINGS
+
+    def test_load_text(self, tmp_path):
+        """Test loading timings from a one-per-line file"""
+        path = tmp_path / "timings.txt"
+        path.write_text("\n".join(str(t) for t in TIMINGS) + "\n")
+        assert load_timings(path) == TIMINGS
@@ -0,0 +1,141 @@
+"""
+Unit tests for macros - Compiling step lists and running them through the engine
+"""
+
+import pickle
+
+import pytest
+
+from click_config import ClickConfig
+from click_engine import ClickEngine
+from macros import OP_CLICK, OP_KEY, OP_MOVE, compile_macro, compile_macros
+from mouse_backends import RecordingMouse
+from simulation import Simulation
+
+
+class FakeKeyboard:
+    """Stand-in for pynput's keyboard Controller"""
+
+    def __init__(self):
+        self.taps = []
+
+    def tap(self, key):
+        self.taps.append(key)
+
+
+def steps(*steps, repeat=1):
+    return {"steps": list(steps), "repeat": repeat}
+
+
+class TestCompile:
+    """Test step lists compile to flat arrays with absolute offsets"""
+
+    def test_waits_become_offsets(self):
+        """Test waits move the following steps and add no opcodes"""
+        macro = compile_macro("m", steps({"op": "move", "x": 1, "y": 2}, {"op": "wait", "seconds": 0.25},
+                                         {"op": "click", "button": "right", "count": 2},
+                                         {"op": "wait", "seconds": 0.5}))
+        assert list(macro.ops) == [OP_MOVE, OP_CLICK]
+        assert list(macro.offsets) == [0, 0.25]
+        assert macro.objects[macro.arg_a[0]] == (1, 2)
+        assert macro.objects[macro.arg_a[1]] == "right"
+        assert macro.arg_b[1] == 2
+        assert macro.duration == 0.75
+
+    def test_loops_unrolled(self):
+        """Test nested loops are unrolled with the time running on"""
+        macro = compile_macro("m", steps({"op": "loop", "times": 3, "steps": [
+            {"op": "click"}, {"op": "loop", "times": 2, "steps": [{"op": "wait", "seconds": 0.1}]}]}))
+        assert len(macro) == 3
+        assert list(macro.offsets) == pytest.approx([0, 0.2, 0.4])
+
+    def test_constants_shared(self):
+        """Test repeated buttons and positions are stored once"""
+        macro = compile_macro("m", steps({"op": "loop", "times": 100, "steps": [
+            {"op": "move", "x": 5, "y": 5}, {"op": "click"}]}))
+        assert len(macro) == 200
+        assert len(macro.objects) == 2
+
+    def test_keys_resolved(self):
+        """Test key names go through the resolver"""
+        macro = compile_macro("m", steps({"op": "key", "key": "a"}), resolve_key=str.upper)
+        assert list(macro.ops) == [OP_KEY]
+        assert macro.objects == ("A",)
+        assert macro.needs_keyboard
+
+    @pytest.mark.parametrize("macro", [
+        steps(),
+        steps({"op": "wait", "seconds": 1}),
+        steps({"op": "jump"}),
+        steps({"op": "click", "button": "thumb"}),
+        steps({"op": "click", "count": 0}),
+        steps({"op": "wait", "seconds": -1}),
+        steps({"op": "move", "x": 1}),
+        steps({"op": "click"}, repeat=0),
+        {"steps": "click"},
+        ["click"],
+    ])
+    def test_invalid_rejected(self, macro):
+        """Test broken macros raise ValueError"""
+        with pytest.raises(ValueError):
+            compile_macro("m", macro)
+
+    def test_compile_all_skips_broken(self):
+        """Test one broken macro doesn't take the others down"""
+        compiled = compile_macros({"good": steps({"op": "click"}), "bad": steps({"op": "jump"})})
+        assert list(compiled) == ["good"]
+
+    def test_picklable(self):
+        """Test a compiled macro survives the trip to the engine process"""
+        macro = compile_macro("m", steps({"op": "click"}, {"op": "wait", "seconds": 0.1}, repeat=3))
+        copy = pickle.loads(pickle.dumps(macro))
+        assert list(copy.ops) == list(macro.ops)
+        assert copy.duration == macro.duration and copy.repeat == 3
+
+
+class TestEngine:
+    """Test the engine runs macros in place of clicking"""
+
+    def test_runs_every_step(self):
+        """Test each step reaches the mouse or keyboard in order"""
+        mouse, keyboard = RecordingMouse(), FakeKeyboard()
+        macro = compile_macro("m", steps({"op": "move", "x": 3, "y": 4}, {"op": "press", "button": "left"},
+                                         {"op": "release", "button": "left"}, {"op": "key", "key": "q"},
+                                         {"op": "click", "count": 2}))
+        engine = ClickEngine(mouse, ClickConfig(macro=macro), keyboard=keyboard)
+        engine.run()
+        assert mouse.calls == [("move", 3, 4), ("press", "left", 1), ("release", "left", 1),
+                               ("click", "left", 2)]
+        assert keyboard.taps == ["q"]
+        assert engine.click_count == 2
+        assert not engine.is_running
+
+    def test_key_steps_need_keyboard(self):
+        """Test a macro that presses keys is refused without a keyboard"""
+        engine = ClickEngine(RecordingMouse())
+        with pytest.raises(ValueError):
+            engine.update(macro=compile_macro("m", steps({"op": "key", "key": "a"})))
+        assert engine.config.macro is None
+
+    def test_repeats_on_schedule(self):
+        """Test repetitions are spaced by the macro's duration on virtual time"""
+        macro = compile_macro("m", steps({"op": "click"}, {"op": "wait", "seconds": 0.1},
+                                         {"op": "click"}, {"op": "wait", "seconds": 0.4}, repeat=3))
+        sim = Simulation(ClickConfig(macro=macro), record_clicks=True).start(1).run(10)
+        assert sim.mouse.click_times == pytest.approx([1, 1.1, 1.5, 1.6, 2, 2.1])
+        assert sim.sessions[0][2] == 6
+
+    def test_long_macro_has_no_drift(self):
+        """Test the 10,000th step of a long macro fires at its compiled offset"""
+        macro = compile_macro("m", steps({"op": "loop", "times": 10_000, "steps": [
+            {"op": "click"}, {"op": "wait", "seconds": 0.003}]}))
+        sim = Simulation(ClickConfig(macro=macro), click_cost=0.001, record_clicks=True).start(0).run(60)
+        assert len(sim.mouse.click_times) == 10_000
+        assert sim.mouse.click_times[-1] == pytest.approx(macro.offsets[-1], abs=1e-9)
+
+    def test_stop_interrupts(self):
+        """Test stopping mid-macro fires no further steps"""
+        macro = compile_macro("m", steps({"op": "click"}, {"op": "wait", "seconds": 1}, repeat=0))
+        sim = Simulation(ClickConfig(macro=macro), record_clicks=True).start(0).stop(3.5).run(10)
+        assert sim.mouse.click_times == [0, 1, 2, 3]
+        assert sim.sessions[0][2] == 4
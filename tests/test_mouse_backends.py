@@ -0,0 +1,171 @@
+"""
+Tests for the mouse backends - The shared protocol, uinput event encoding, and
+XTest clicks counted by a real X client (run under Xvfb)
+"""
+
+import os
+import struct
+import time
+
+import pytest
+
+import mouse_backends
+from click_config import ClickConfig
+from click_engine import ClickEngine
+from mouse_backends import (EV_KEY, EV_SYN, NULL, RECORDING, NullMouse, RecordingMouse, UinputMouse,
+                            XTestMouse, backend_factory, button_name, pack_events)
+
+needs_x = pytest.mark.skipif(mouse_backends.Display is None or not os.environ.get("DISPLAY"),
+                             reason="needs python-xlib and an X server, e.g. xvfb-run")
+
+
+class Button:
+    """Stand-in for a pynput Button value"""
+
+    def __init__(self, name):
+        self.name = name
+
+
+class TestButtonNames:
+    """Test buttons are accepted as pynput values or names"""
+
+    def test_names(self):
+        """Test both forms give the same name"""
+        assert button_name(Button("right")) == "right"
+        assert button_name("middle") == "middle"
+
+
+class TestNullAndRecordingMice:
+    """Test the backends that click nothing"""
+
+    def test_null_counts_clicks(self):
+        """Test the null mouse counts clicks and remembers moves"""
+        mouse = NullMouse()
+        mouse.click("left", 2)
+        mouse.press("left")
+        mouse.release("left")
+        mouse.move(3, 4)
+        assert mouse.clicks == 2
+        assert mouse.position == (3, 4)
+
+    def test_recording_keeps_calls(self):
+        """Test every call is recorded in order, with button names"""
+        mouse = RecordingMouse()
+        mouse.position = (10, 20)
+        mouse.press(Button("right"))
+        mouse.release("right")
+        mouse.click("left", 2)
+        assert mouse.calls == [("move", 10, 20), ("press", "right", 1), ("release", "right", 1),
+                               ("click", "left", 2)]
+        assert mouse.position == (10, 20)
+        assert mouse.clicks == 2
+
+    def test_engine_burst_through_recording(self):
+        """Test the engine drives a backend through position and click"""
+        mouse = RecordingMouse()
+        engine = ClickEngine(mouse, ClickConfig(burst_size=3, use_fixed_position=True, fixed_x=5, fixed_y=6,
+                                                mouse_button="left"))
+        engine.run()
+        assert mouse.calls == [("move", 5, 6), ("click", "left", 3)]
+
+
+class TestBackendFactory:
+    """Test backends are looked up by their setting name"""
+
+    def test_names(self):
+        """Test a factory opens the named backend"""
+        assert isinstance(backend_factory(NULL)(), NullMouse)
+        assert isinstance(backend_factory(RECORDING)(), RecordingMouse)
+
+    def test_options_bound(self):
+        """Test options are passed on when the factory is called"""
+        factory = backend_factory("uinput", path="/nonexistent/uinput")
+        with pytest.raises(RuntimeError):
+            factory()
+
+    def test_unknown(self):
+        """Test an unknown name is rejected"""
+        with pytest.raises(ValueError):
+            backend_factory("telepathy")
+
+
+class TestUinputEvents:
+    """Test uinput events are laid out as struct input_event"""
+
+    def test_pack_events(self):
+        """Test each event is a zero timeval, then type, code and value"""
+        data = pack_events([(EV_KEY, 0x110, 1), (EV_SYN, 0, 0)])
+        size = struct.calcsize("@llHHi")
+        assert len(data) == 2 * size
+        assert struct.unpack("@llHHi", data[:size]) == (0, 0, EV_KEY, 0x110, 1)
+
+    def test_open_failure(self):
+        """Test a device that can't be opened is reported as unavailable"""
+        with pytest.raises(RuntimeError):
+            UinputMouse(path="/nonexistent/uinput")
+
+
+def test_xtest_display_error(monkeypatch):
+    """Test a display that can't be opened is reported as unavailable, whatever python-xlib raises"""
+    class DisplayError(Exception):
+        pass
+
+    def refuse(name):
+        raise DisplayError(name)
+
+    monkeypatch.setattr(mouse_backends, "Display", refuse)
+    with pytest.raises(RuntimeError):
+        XTestMouse(":99")
+
+
+@needs_x
+class TestXTestMouse:
+    """Test XTest clicks arrive at a window as real button events"""
+
+    @pytest.fixture
+    def window(self):
+        """A mapped window on its own connection, listening for button presses"""
+        from Xlib import X
+        from Xlib.display import Display
+
+        display = Display()
+        screen = display.screen()
+        window = screen.root.create_window(0, 0, 200, 200, 0, screen.root_depth,
+                                           event_mask=X.ButtonPressMask | X.ButtonReleaseMask)
+        window.map()
+        display.sync()
+        time.sleep(0.1)
+        yield display
+        window.destroy()
+        display.close()
+
+    def count_presses(self, display, expected, timeout=5):
+        from Xlib import X
+
+        presses = 0
+        deadline = time.monotonic() + timeout
+        while presses < expected and time.monotonic() < deadline:
+            while display.pending_events():
+                if display.next_event().type == X.ButtonPress:
+                    presses += 1
+            time.sleep(0.01)
+        return presses
+
+    def test_position(self, window):
+        """Test moving the pointer through XTest"""
+        mouse = XTestMouse()
+        mouse.position = (50, 60)
+        mouse.display.sync()
+        assert mouse.position == (50, 60)
+        mouse.close()
+
+    def test_burst_counted_by_receiver(self, window):
+        """Test every click of a double-click burst reaches the window"""
+        mouse = XTestMouse()
+        engine = ClickEngine(mouse, ClickConfig(burst_size=500, double_click=True, use_fixed_position=True,
+                                                fixed_x=100, fixed_y=100, mouse_button="left"))
+        engine.start()
+        assert engine.join(5)
+        assert self.count_presses(window, 1000) == 1000
+        engine.close()
+        mouse.close()
@@ -0,0 +1,170 @@
+"""
+Unit tests for smooth moves - Path generation, the path cache and the engine gliding between targets
+"""
+
+import pytest
+
+import paths
+from click_config import ClickConfig
+from optional import numpy
+from paths import PathCache, minimum_jerk_profile
+from simulation import Simulation, SimulatedMouse
+
+
+class TrackingMouse(SimulatedMouse):
+    """Simulated mouse that notes the virtual time of every move"""
+
+    def __init__(self, clock):
+        self.moves = []
+        super().__init__(clock, record=True)
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        self._position = value
+        self.moves.append((self.clock.now, value))
+
+
+def simulate(**settings):
+    sim = Simulation(ClickConfig(**settings))
+    sim.mouse = sim.engine.mouse = TrackingMouse(sim.clock)
+    return sim
+
+
+class TestPaths:
+    """Test the generated paths"""
+
+    def test_profile_ends_on_target(self):
+        """Test the minimum-jerk profile rises steadily to exactly 1"""
+        profile = minimum_jerk_profile(12)
+        assert profile[-1] == 1
+        assert profile == sorted(profile)
+        assert 0 < profile[0] < profile[4] < profile[5] == 0.5 < profile[6]
+
+    @pytest.mark.parametrize("shape", ["minimum_jerk", "bezier"])
+    @pytest.mark.parametrize("use_numpy", [False, True])
+    def test_path_ends_on_target(self, shape, use_numpy):
+        """Test a path has one point per sample and finishes on the target"""
+        if use_numpy and numpy() is None:
+            pytest.skip("NumPy not installed")
+        cache = PathCache(shape, duration=0.1, rate=100, seed=1, use_numpy=use_numpy)
+        path = cache.path((0, 0), (300, -40))
+        assert path.typecode == "i"
+        assert len(path) == 20
+        assert (path[-2], path[-1]) == (300, -40)
+
+    def test_minimum_jerk_is_straight(self):
+        """Test a minimum-jerk path stays on the line between its ends"""
+        path = PathCache(duration=0.1, rate=100).path((0, 5), (100, 5))
+        assert list(path[1::2]) == [5] * 10
+        assert list(path[0::2]) == sorted(path[0::2])
+
+    def test_bezier_bends_and_is_seeded(self):
+        """Test Bezier paths leave the straight line and a seed replays the same curves"""
+        make = lambda: PathCache("bezier", seed=4, use_numpy=False).path((0, 0), (1000, 0))
+        path = make()
+        assert any(y != 0 for y in path[1::2])
+        assert max(abs(y) for y in path[1::2]) <= 1000 * paths.MAX_BEND
+        assert path == make()
+
+    def test_numpy_matches_python(self):
+        """Test the vectorized and pure-Python generators agree"""
+        if numpy() is None:
+            pytest.skip("NumPy not installed")
+        pairs = [((0, 0), (640, 480)), ((10, 900), (5, 3))]
+        for shape in ("minimum_jerk", "bezier"):
+            fast = PathCache(shape, seed=2).generate(pairs)
+            slow = PathCache(shape, seed=2, use_numpy=False).generate(pairs)
+            assert [list(path) for path in fast] == [list(path) for path in slow]
+
+    @pytest.mark.parametrize("kwargs", [{"shape": ""}, {"shape": "zigzag"}, {"duration": 0}, {"rate": -1}])
+    def test_invalid_rejected(self, kwargs):
+        """Test broken path settings raise ValueError"""
+        with pytest.raises(ValueError):
+            PathCache(**kwargs)
+
+
+class TestPathCache:
+    """Test paths are cached per (from, to) pair"""
+
+    def test_repeat_is_a_hit(self):
+        """Test asking for the same pair again reuses the path"""
+        cache = PathCache()
+        first = cache.path((0, 0), (10, 10))
+        assert cache.path((0, 0), (10, 10)) is first
+        cache.path((10, 10), (0, 0))
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_least_recently_used_evicted(self):
+        """Test the cache drops the pair used longest ago"""
+        cache = PathCache(cache_size=2)
+        cache.path((0, 0), (1, 1))
+        cache.path((0, 0), (2, 2))
+        cache.path((0, 0), (1, 1))
+        cache.path((0, 0), (3, 3))
+        assert len(cache) == 2
+        cache.path((0, 0), (1, 1))
+        cache.path((0, 0), (2, 2))
+        assert (cache.hits, cache.misses) == (2, 4)
+
+    def test_prefetch_fills_in_one_batch(self, monkeypatch):
+        """Test prefetching generates every missing pair in a single call"""
+        cache = PathCache()
+        cache.path((0, 0), (1, 1))
+        batches = []
+        generate = cache.generate
+        monkeypatch.setattr(cache, "generate", lambda pairs: batches.append(pairs) or generate(pairs))
+        cache.prefetch([((0, 0), (1, 1)), ((1, 1), (2, 2)), ((2, 2), (0, 0)), ((1, 1), (2, 2))])
+        assert batches == [[((1, 1), (2, 2)), ((2, 2), (0, 0))]]
+        cache.path((2, 2), (0, 0))
+        assert cache.misses == 1
+
+
+class TestConfig:
+    """Test the smooth move settings in the config snapshot"""
+
+    @pytest.mark.parametrize("changes", [{"smooth_move": "zigzag"}, {"move_duration": 0}, {"move_rate": -5}])
+    def test_invalid_rejected(self, changes):
+        """Test moves that can't be generated are refused"""
+        with pytest.raises(ValueError):
+            ClickConfig(**changes)
+
+    def test_settings_round_trip(self):
+        """Test smooth moves survive the settings file"""
+        config = ClickConfig(smooth_move="bezier", move_duration="0.2", move_rate=60)
+        assert config.move_duration == 0.2
+        assert ClickConfig.from_settings(config.to_settings()) == config
+
+
+class TestEngine:
+    """Test the clicking loop glides between targets without moving its clicks"""
+
+    def test_click_times_unchanged(self):
+        """Test smooth moves leave every click on its deadline"""
+        settings = dict(cps=10, random_variation=0, pattern="points", pattern_points=((0, 0), (500, 300)))
+        plain = simulate(**settings).start(0).run(2)
+        smooth = simulate(smooth_move="bezier", **settings).start(0).run(2)
+        assert smooth.mouse.click_times == plain.mouse.click_times
+        assert len(smooth.mouse.moves) > len(plain.mouse.moves)
+
+    def test_moves_lead_up_to_each_click(self):
+        """Test the path runs in the move window before the click and ends on the target"""
+        sim = simulate(cps=5, random_variation=0, smooth_move="minimum_jerk", move_duration=0.1, move_rate=50,
+                       pattern="points", pattern_points=((0, 0), (100, 0))).start(0).run(0.5)
+        # First click at 0 has no time to glide; the second at 0.2 glides from 0.1
+        moves = [(round(at, 6), position) for at, position in sim.mouse.moves if 0 < at <= 0.2]
+        assert [at for at, _ in moves] == [0.12, 0.14, 0.16, 0.18, 0.2]
+        assert moves[-1][1] == (100, 0)
+        assert [x for _, (x, _) in moves] == sorted(x for _, (x, _) in moves)
+
+    def test_short_interval_squeezes_path(self):
+        """Test a move longer than the interval is fitted into the time left"""
+        sim = simulate(cps=20, random_variation=0, smooth_move="minimum_jerk", move_duration=0.5,
+                       pattern="points", pattern_points=((0, 0), (100, 0))).start(0).run(0.3)
+        clicks = sim.mouse.click_times
+        assert clicks == pytest.approx([0, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3][:len(clicks)])
+        between = [at for at, _ in sim.mouse.moves if 0.05 < at < 0.1]
+        assert len(between) > 1
@@ -0,0 +1,103 @@
+"""
+Unit tests for click patterns - Precomputed points and the engine moving through them
+"""
+
+import pytest
+
+from click_config import ClickConfig
+from click_engine import ClickEngine
+from mouse_backends import RecordingMouse
+from optional import numpy
+from patterns import PointSource, grid_points
+
+
+class TestPointSource:
+    """Test each pattern produces the right positions"""
+
+    def test_points_round_robin(self):
+        """Test a point list is cycled in order"""
+        source = PointSource("points", [(1, 2), (3, 4), (5, 6)])
+        assert source.take(7) == [(1, 2), (3, 4), (5, 6), (1, 2), (3, 4), (5, 6), (1, 2)]
+
+    def test_grid_cell_centres(self):
+        """Test a grid visits each cell centre row by row"""
+        assert grid_points((0, 0, 200, 100), 2, 2) == [(50, 25), (150, 25), (50, 75), (150, 75)]
+        source = PointSource("grid", rect=(0, 0, 300, 300), rows=3, cols=3)
+        assert source.take(10)[9] == (50, 50)
+
+    def test_coords_are_compact(self):
+        """Test positions are held as one flat int array"""
+        source = PointSource("grid", rect=(0, 0, 100, 100), rows=10, cols=10)
+        assert source.coords.typecode == "i"
+        assert len(source.coords) == 200
+
+    @pytest.mark.parametrize("use_numpy", [False, True])
+    def test_region_within_rect(self, use_numpy):
+        """Test random points stay inside the rectangle across refills"""
+        if use_numpy and numpy() is None:
+            pytest.skip("NumPy not installed")
+        source = PointSource("region", rect=(10, 20, 15, 22), seed=3, block_size=16, use_numpy=use_numpy)
+        points = source.take(100)
+        assert all(10 <= x <= 15 and 20 <= y <= 22 for x, y in points)
+        assert len(set(points)) > 1
+
+    def test_region_seeded(self):
+        """Test a seed replays the same points"""
+        make = lambda: PointSource("region", rect=(0, 0, 1000, 1000), seed=9, use_numpy=False)
+        assert make().take(20) == make().take(20)
+
+    @pytest.mark.parametrize("kwargs", [
+        {"pattern": "spiral"},
+        {"pattern": ""},
+        {"pattern": "points"},
+        {"pattern": "grid"},
+        {"pattern": "grid", "rect": (0, 0, 10, 10), "rows": 0},
+    ])
+    def test_invalid_rejected(self, kwargs):
+        """Test broken pattern settings raise ValueError"""
+        with pytest.raises(ValueError):
+            PointSource(**kwargs)
+
+
+class TestConfig:
+    """Test the pattern settings in the config snapshot"""
+
+    def test_points_span_default_rect(self):
+        """Test captured points give the grid its rectangle when none is set"""
+        config = ClickConfig(pattern="grid", pattern_points=[[100, 50], [0, 10]])
+        assert config.pattern_points == ((100, 50), (0, 10))
+        assert config.pattern_bounds == (0, 10, 100, 50)
+        assert config.replace(pattern_rect=[1, 2, 3, 4]).pattern_bounds == (1, 2, 3, 4)
+
+    @pytest.mark.parametrize("changes", [
+        {"pattern": "spiral"},
+        {"pattern": "points"},
+        {"pattern": "region"},
+        {"pattern_rect": (10, 0, 0, 10)},
+        {"grid_rows": 0},
+    ])
+    def test_invalid_rejected(self, changes):
+        """Test patterns that can't produce points are refused"""
+        with pytest.raises(ValueError):
+            ClickConfig(**changes)
+
+    def test_settings_round_trip(self):
+        """Test patterns survive the JSON settings file"""
+        config = ClickConfig(pattern="points", pattern_points=((1, 2), (3, 4)), pattern_rect=(0, 0, 5, 5))
+        settings = config.to_settings()
+        assert ClickConfig.from_settings({k: list(v) if isinstance(v, tuple) else v
+                                          for k, v in settings.items()}) == config
+
+
+class TestEngine:
+    """Test the clicking loop moves through the pattern"""
+
+    def test_clicks_follow_pattern(self):
+        """Test each click lands on the next point, ahead of the fixed position"""
+        mouse = RecordingMouse()
+        engine = ClickEngine(mouse, ClickConfig(cps=500, random_variation=0, click_limit=4, use_fixed_position=True,
+                                                pattern="points", pattern_points=((1, 1), (2, 2), (3, 3)),
+                                                mouse_button="left"))
+        engine.run()
+        moves = [call[1:] for call in mouse.calls if call[0] == "move"]
+        assert moves == [(1, 1), (2, 2), (3, 3), (1, 1)]
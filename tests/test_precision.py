@@ -0,0 +1,102 @@
+"""
+Unit tests for precision mode - Absolute-deadline wake-ups and graceful fallbacks
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+import precision
+from click_config import ClickConfig
+from click_engine import ClickEngine
+from mouse_backends import NullMouse
+from precision import POLICY_NONE, PrecisionMode, TimerfdWakeup
+
+needs_timerfd = pytest.mark.skipif(precision._load_timerfd() is None, reason="timerfd needs Linux")
+
+
+@needs_timerfd
+class TestTimerfdWakeup:
+    """Test the timerfd wake-up behaves like an Event with absolute sleeps"""
+
+    def test_wait_until_deadline(self):
+        """Test the sleep ends at the deadline, not before"""
+        wakeup = TimerfdWakeup()
+        deadline = time.monotonic() + 0.01
+        assert wakeup.wait_until(deadline) is False
+        assert time.monotonic() >= deadline
+        wakeup.close()
+
+    def test_past_deadline_returns_at_once(self):
+        """Test a deadline already passed doesn't block"""
+        wakeup = TimerfdWakeup()
+        started = time.monotonic()
+        assert wakeup.wait_until(started - 1) is False
+        assert time.monotonic() - started < 0.05
+        wakeup.close()
+
+    def test_set_interrupts(self):
+        """Test set() from another thread cuts the sleep short"""
+        wakeup = TimerfdWakeup()
+        threading.Timer(0.01, wakeup.set).start()
+        started = time.monotonic()
+        assert wakeup.wait_until(started + 5) is True
+        assert time.monotonic() - started < 1
+        assert wakeup.is_set()
+        wakeup.clear()
+        assert not wakeup.is_set()
+        assert wakeup.wait(0.001) is False
+        wakeup.close()
+        wakeup.close()
+
+
+class TestPrecisionMode:
+    """Test precision mode setup and its fallbacks"""
+
+    def test_invalid_options(self):
+        """Test unknown policies and out-of-range priorities are rejected"""
+        with pytest.raises(ValueError):
+            PrecisionMode(policy="deadline")
+        with pytest.raises(ValueError):
+            PrecisionMode(priority=0)
+
+    def test_denied_steps_are_reported(self, monkeypatch):
+        """Test missing privileges are recorded instead of raised"""
+        def deny(*args):
+            raise PermissionError(1, "Operation not permitted")
+
+        monkeypatch.setattr(os, "sched_setaffinity", deny, raising=False)
+        monkeypatch.setattr(os, "sched_setscheduler", deny, raising=False)
+        mode = PrecisionMode(cpu=0)
+        mode.setup_thread()
+        assert mode.report["affinity"] == "denied (Operation not permitted)"
+        assert mode.report["scheduler"] == "denied (Operation not permitted)"
+
+    def test_no_timerfd_falls_back(self, monkeypatch):
+        """Test the engine keeps its event sleep when timerfd is missing"""
+        monkeypatch.setattr(precision, "_load_timerfd", lambda: None)
+        mode = PrecisionMode()
+        options = mode.engine_options()
+        assert "wakeup" not in options
+        assert mode.report["sleep"] == "event (no timerfd)"
+
+    def test_nothing_to_describe_before_start(self):
+        """Test the summary before the worker has started"""
+        assert PrecisionMode().describe() == "not started"
+
+    @needs_timerfd
+    def test_engine_runs_in_precision_mode(self):
+        """Test the engine keeps its rate and stops promptly on timerfd sleeps"""
+        mode = PrecisionMode(policy=POLICY_NONE)
+        engine = ClickEngine(NullMouse(), ClickConfig(cps=200, random_variation=0, mouse_button="left"),
+                             **mode.engine_options())
+        engine.start()
+        time.sleep(0.25)
+        engine.stop()
+        assert engine.join(1)
+        assert 40 <= engine.click_count <= 60
+        assert engine.stats.stop_latency < 0.005
+        assert mode.describe() == "timerfd"
+        engine.close()
@@ -0,0 +1,135 @@
+"""
+Unit tests for the profile engine - Several profiles clicking at once on one thread
+"""
+
+import threading
+import time
+
+import pytest
+
+from click_config import ClickConfig
+from macros import compile_macro
+from mouse_backends import RecordingMouse
+from profile_engine import ProfileEngine
+from simulation import VirtualClock
+
+
+class TimedMouse:
+    """Mouse stand-in that notes (virtual time, button, position) for every click"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.position = (0, 0)
+        self.clicks = []
+
+    def click(self, button, count=1):
+        self.clicks.append((self.clock.now, button, self.position))
+
+
+def make_engine():
+    clock = VirtualClock()
+    mouse = TimedMouse(clock)
+    engine = ProfileEngine(mouse, clock=clock, sleep=clock.sleep, spin_threshold=0)
+    return engine, mouse, clock
+
+
+def config(**settings):
+    return ClickConfig(**dict({"random_variation": 0}, **settings))
+
+
+class TestScheduling:
+    """Test profiles keep their own schedules on the shared thread"""
+
+    def test_profiles_interleave_on_their_own_rates(self):
+        """Test each profile clicks on its own grid with its own button and position"""
+        engine, mouse, _ = make_engine()
+        engine.run({
+            "fast": config(cps=10, click_limit=10, mouse_button="left", use_fixed_position=True, fixed_x=1, fixed_y=1),
+            "slow": config(cps=4, click_limit=4, mouse_button="right", use_fixed_position=True, fixed_x=2, fixed_y=2),
+        })
+        fast = [at for at, button, position in mouse.clicks if button == "left" and position == (1, 1)]
+        slow = [at for at, button, position in mouse.clicks if button == "right" and position == (2, 2)]
+        assert fast == pytest.approx([i * 0.1 for i in range(10)])
+        assert slow == pytest.approx([i * 0.25 for i in range(4)])
+        assert [at for at, _, _ in mouse.clicks] == sorted(at for at, _, _ in mouse.clicks)
+
+    def test_ten_profiles_stay_on_time(self):
+        """Test ten profiles at once all click exactly on their deadlines"""
+        engine, mouse, _ = make_engine()
+        engine.run({f"p{i}": config(cps=10 + i, click_limit=20, mouse_button=i) for i in range(10)})
+        for i in range(10):
+            times = [at for at, button, _ in mouse.clicks if button == i]
+            assert times == pytest.approx([n / (10 + i) for n in range(20)])
+            stats = engine.stats[f"p{i}"]
+            assert stats.clicks == 20
+            assert stats.interval_errors.max == 0
+
+    def test_start_delay_per_profile(self):
+        """Test a profile's start delay only holds back that profile"""
+        engine, mouse, _ = make_engine()
+        engine.run({"now": config(cps=10, click_limit=2, mouse_button="a"),
+                    "later": config(cps=10, click_limit=2, start_delay=1, mouse_button="b")})
+        assert [(round(at, 6), button) for at, button, _ in mouse.clicks] == [
+            (0, "a"), (0.1, "a"), (1, "b"), (1.1, "b")]
+
+    def test_stop_one_profile(self):
+        """Test stopping one profile leaves the others clicking"""
+        engine, mouse, clock = make_engine()
+        clock.call_at(0.55, engine.stop, "a")
+        clock.call_at(1.05, engine.stop, "b")
+        engine.run({"a": config(cps=10, mouse_button="a"), "b": config(cps=10, mouse_button="b")})
+        assert sum(button == "a" for _, button, _ in mouse.clicks) == 6
+        assert sum(button == "b" for _, button, _ in mouse.clicks) == 11
+        assert not engine.is_running
+
+    def test_restart_replaces_session(self):
+        """Test starting an active profile again restarts its schedule and stats"""
+        engine, mouse, clock = make_engine()
+        clock.call_at(0.35, engine.start, "a", config(cps=2, click_limit=1, mouse_button="b"))
+        engine.run({"a": config(cps=10, mouse_button="a")})
+        # A virtual sleep can't be cut short, so the new session's first click waits for the old deadline
+        assert [(round(at, 6), button) for at, button, _ in mouse.clicks][-2:] == [(0.3, "a"), (0.4, "b")]
+        assert engine.click_count("a") == 1
+        assert engine.click_thread is None
+
+    def test_on_click_and_on_stop_name_the_profile(self):
+        """Test callbacks are told which profile clicked or hit its limit"""
+        clicked, stopped = [], []
+        clock = VirtualClock()
+        engine = ProfileEngine(TimedMouse(clock), on_click=clicked.append, on_stop=stopped.append,
+                               clock=clock, sleep=clock.sleep, spin_threshold=0)
+        engine.run({"a": config(cps=10, click_limit=2), "b": config(cps=10, click_limit=1)})
+        assert sorted(clicked) == ["a", "a", "b"]
+        assert sorted(stopped) == ["a", "b"]
+
+    def test_single_engine_features_refused(self):
+        """Test configs only the single engine can run are rejected rather than half run"""
+        engine, _, _ = make_engine()
+        macro = compile_macro("m", {"steps": [{"op": "click"}]})
+        for settings in ({"burst_size": 10}, {"macro": macro}, {"smooth_move": "bezier"}, {"rate_control": True},
+                         {"trigger": "change", "use_fixed_position": True}):
+            with pytest.raises(ValueError):
+                engine.run({"x": ClickConfig(**settings)})
+
+
+class TestWorkerThread:
+    """Test the profile engine on its worker thread with the real clock"""
+
+    def test_start_toggle_and_close(self):
+        """Test profiles started from another thread click until toggled off"""
+        mouse = RecordingMouse()
+        engine = ProfileEngine(mouse)
+        engine.start("a", config(cps=200, mouse_button="left"))
+        engine.toggle("b", config(cps=200, mouse_button="right"))
+        assert engine.active() == ["a", "b"]
+        threads = threading.active_count()
+        time.sleep(0.1)
+        engine.toggle("b", None)
+        assert engine.active() == ["a"]
+        assert engine.click_count("a") > 5 and engine.click_count("b") > 5
+        assert threading.active_count() == threads
+        engine.close()
+        assert not engine.is_running
+        assert not engine.click_thread.is_alive()
+        with pytest.raises(RuntimeError):
+            engine.start("a", config())
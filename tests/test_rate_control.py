@@ -0,0 +1,137 @@
+"""
+Unit tests for rate control - The PI controller, and whole sessions on virtual time against a stalling mouse
+"""
+
+import random
+
+import pytest
+
+from click_config import ClickConfig
+from rate_control import MAX_ERROR, RateController
+from simulation import Simulation, SimulatedMouse
+
+
+class StallingMouse(SimulatedMouse):
+    """Simulated mouse whose clicks take a random few milliseconds, and now and then stall for longer"""
+
+    def __init__(self, clock, stall=0.035, stall_chance=0.05, seed=1):
+        super().__init__(clock)
+        self.stall = stall
+        self.stall_chance = stall_chance
+        self.rng = random.Random(seed)
+
+    def click(self, button, count=1):
+        super().click(button, count)
+        if self.rng.random() < self.stall_chance:
+            self.clock.sleep(self.stall)
+        else:
+            self.clock.sleep(self.rng.uniform(0, 0.004))
+
+
+def stalling_session(seconds=60, **settings):
+    sim = Simulation(ClickConfig(cps=100, random_variation=0, **settings))
+    sim.mouse = sim.engine.mouse = StallingMouse(sim.clock)
+    return sim.start(0).run(seconds)
+
+
+class TestController:
+    """Test the controller's response to the achieved rate"""
+
+    def feed(self, controller, intervals):
+        now = 0.0
+        controller.update(now)
+        for interval in intervals:
+            now += interval
+            controller.update(now)
+
+    def test_on_target_left_alone(self):
+        """Test clicks on schedule leave the interval as it is"""
+        controller = RateController(0.01)
+        self.feed(controller, [0.01] * 100)
+        assert controller.error == pytest.approx(0, abs=1e-9)
+        assert controller.interval == pytest.approx(0.01)
+
+    def test_too_slow_sped_up(self):
+        """Test a rate below target shortens the interval, and the integral remembers the shortfall"""
+        controller = RateController(0.01)
+        self.feed(controller, [0.0125] * 10)
+        assert controller.error == pytest.approx(0.25)
+        assert controller.integral > 0
+        assert 0 < controller.correction <= controller.max_correction
+        assert controller.interval < 0.01
+
+    def test_too_fast_slowed_down(self):
+        """Test a rate above target lengthens the interval"""
+        controller = RateController(0.01)
+        self.feed(controller, [0.008] * 10)
+        assert controller.error < 0
+        assert controller.interval > 0.01
+
+    def test_correction_clamped(self):
+        """Test an unreachable rate saturates the correction without winding up the integral"""
+        controller = RateController(0.01, max_correction=0.5)
+        self.feed(controller, [0.1] * 1000)
+        assert controller.correction == 0.5
+        assert controller.interval == pytest.approx(0.01 / 1.5)
+        assert controller.ki * controller.integral <= 0.5
+
+    def test_error_clamped(self):
+        """Test a window stretched by a long stall counts as at most MAX_ERROR behind"""
+        controller = RateController(0.01)
+        self.feed(controller, [0.01] * 18 + [1.0])
+        assert controller.error == MAX_ERROR
+
+    def test_integral_held_while_saturated(self):
+        """Test the integral stops growing once the correction saturates, and unwinds once the rate recovers"""
+        def integral(intervals):
+            controller = RateController(0.01, max_correction=0.5)
+            self.feed(controller, intervals)
+            return controller.integral
+
+        held = integral([0.05] * 100)
+        assert integral([0.05] * 300) == held
+        assert integral([0.05] * 100 + [0.001] * 30) < held
+
+    @pytest.mark.parametrize("args", [{"interval": 0}, {"window": 1}, {"max_correction": 1}])
+    def test_invalid_rejected(self, args):
+        """Test bad settings raise ValueError"""
+        args.setdefault("interval", 0.01)
+        with pytest.raises(ValueError):
+            RateController(**args)
+
+
+class TestSessions:
+    """Test long-run rate against a backend with variable, sometimes stalling, click latency"""
+
+    @pytest.mark.parametrize("policy", ["skip", "catch_up"])
+    def test_long_run_rate_on_target(self, policy):
+        """Test the controller makes up the clicks lost to stalls"""
+        sim = stalling_session(rate_control=True, overrun_policy=policy)
+        assert sim.engine.click_count == pytest.approx(6000, rel=0.002)
+
+    def test_skips_lose_clicks_without_control(self):
+        """Test the same stalls cost clicks when the interval isn't corrected"""
+        sim = stalling_session(overrun_policy="skip")
+        assert sim.engine.click_count < 6000 * 0.95
+        assert sim.engine.stats.rate_error is None
+
+    def test_terms_exposed_in_stats(self):
+        """Test the controller's error and correction reach the session stats"""
+        sim = stalling_session(seconds=5, rate_control=True)
+        stats = sim.engine.stats.to_dict()
+        assert isinstance(stats["rate_error"], float)
+        assert -0.5 <= stats["rate_correction"] <= 0.5
+
+    def test_unreachable_rate(self):
+        """Test a backend slower than the interval keeps clicking at its own pace"""
+        sim = Simulation(ClickConfig(cps=100, random_variation=0, rate_control=True), click_cost=0.015)
+        sim.start(0).run(10)
+        assert sim.mouse.clicks == pytest.approx(667, abs=2)
+        assert sim.engine.stats.rate_correction == 0.5
+
+    def test_retargets_on_cps_change(self):
+        """Test a new CPS mid-run gets a fresh controller aimed at it"""
+        sim = Simulation(ClickConfig(cps=100, random_variation=0, rate_control=True))
+        sim.mouse = sim.engine.mouse = StallingMouse(sim.clock)
+        sim.update(30, cps=50).start(0).run(60)
+        assert sim.engine.click_count == pytest.approx(4500, rel=0.005)
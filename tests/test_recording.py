@@ -0,0 +1,176 @@
+"""
+Unit tests for input recording - The binary log format, and replay on virtual time
+"""
+
+import os
+import tempfile
+from dataclasses import dataclass
+
+import pytest
+
+import recording
+from mouse_backends import RecordingMouse
+from recording import (EV_BUTTON_DOWN, EV_CHAR_DOWN, EV_KEY_UP, EV_MOVE, EV_WAIT, HEADER, RECORD,
+                       InputRecorder, Replayer, read_events)
+from simulation import VirtualClock
+
+
+class Button:
+    """Stand-in for a pynput Button value"""
+
+    def __init__(self, name):
+        self.name = name
+
+
+@dataclass(frozen=True)
+class KeyCode:
+    """Stand-in for a pynput KeyCode"""
+
+    vk: int = None
+    char: str = None
+
+
+class FakeKeyboard:
+    """Stand-in for pynput's keyboard Controller"""
+
+    def __init__(self):
+        self.events = []
+
+    def press(self, key):
+        self.events.append(("press", key))
+
+    def release(self, key):
+        self.events.append(("release", key))
+
+
+@pytest.fixture
+def path():
+    fd, path = tempfile.mkstemp(suffix=".mlr")
+    os.close(fd)
+    yield path
+    os.remove(path)
+
+
+def record(path, events, ignore=()):
+    """Record (time, method, args) events on a virtual clock"""
+    clock = VirtualClock()
+    recorder = InputRecorder(path, ignore=ignore, clock=clock)
+    for at, method, *args in events:
+        clock.now = at
+        getattr(recorder, method)(*args)
+    recorder.close()
+    return recorder
+
+
+class TestFormat:
+    """Test events are written as fixed-size records of time deltas"""
+
+    def test_round_trip(self, path):
+        """Test every kind of event comes back with its delta in microseconds"""
+        record(path, [(1.0, "on_move", 10, 20),
+                      (1.5, "on_click", 10, 20, Button("right"), True),
+                      (1.75, "on_release", KeyCode(vk=65)),
+                      (2.0, "on_press", KeyCode(char="q"))])
+        assert os.path.getsize(path) == len(HEADER) + 4 * RECORD.size
+        assert list(read_events(path)) == [(0, EV_MOVE, 10, 20, 0), (500_000, EV_BUTTON_DOWN, 10, 20, 3),
+                                           (250_000, EV_KEY_UP, 0, 0, 65), (250_000, EV_CHAR_DOWN, 0, 0, ord("q"))]
+
+    def test_ignored_and_unknown_input_skipped(self, path):
+        """Test ignored keys, keys with no code and extra buttons are left out"""
+        recorder = record(path, [(0, "on_press", "f6"), (0, "on_press", KeyCode()),
+                                 (0, "on_click", 0, 0, Button("x1"), True), (0, "on_move", 1, 1)],
+                          ignore={"f6"})
+        assert recorder.events == 1
+
+    def test_long_gap_padded(self, path):
+        """Test a gap too long for one delta is split with wait records"""
+        record(path, [(0, "on_move", 0, 0), (5000, "on_move", 1, 1)])
+        events = list(read_events(path))
+        assert events[1] == (recording.MAX_DELTA, EV_WAIT, 0, 0, 0)
+        assert sum(event[0] for event in events) == 5000 * 1_000_000
+
+    def test_partial_record_ignored(self, path):
+        """Test a half-written last record is dropped"""
+        record(path, [(0, "on_move", 1, 1), (1, "on_move", 2, 2)])
+        with open(path, "ab") as f:
+            f.write(b"\x01\x02\x03")
+        assert len(list(read_events(path))) == 2
+
+    def test_not_a_recording(self, path):
+        """Test other files are refused"""
+        with open(path, "wb") as f:
+            f.write(b"{}")
+        with pytest.raises(ValueError):
+            read_events(path)
+
+    def test_streams_lazily(self, path):
+        """Test reading yields one record at a time instead of loading the file"""
+        record(path, [(i * 0.001, "on_move", i, i) for i in range(1000)])
+        events = read_events(path)
+        assert next(events) == (0, EV_MOVE, 0, 0, 0)
+        events.close()
+
+
+class TestReplay:
+    """Test replay timing and dispatch on virtual time"""
+
+    def replay(self, path, speed=1.0):
+        clock = VirtualClock()
+        mouse = RecordingMouse()
+        keyboard = FakeKeyboard()
+        times = []
+        mouse.move = lambda x, y, move=mouse.move: (times.append(clock()), move(x, y))
+        replayer = Replayer(path, mouse, keyboard, speed=speed, clock=clock, sleep=clock.sleep,
+                            spin_threshold=0)
+        replayer.run()
+        return mouse, keyboard, times
+
+    def test_events_replayed_in_order(self, path):
+        """Test mouse and key events reach the backend and keyboard"""
+        record(path, [(0, "on_move", 5, 6), (0.1, "on_click", 5, 6, Button("left"), True),
+                      (0.2, "on_click", 5, 6, Button("left"), False),
+                      (0.3, "on_press", KeyCode(char="z"))])
+        mouse, keyboard, _ = self.replay(path)
+        assert mouse.calls == [("move", 5, 6), ("press", "left", 1), ("release", "left", 1)]
+        assert keyboard.events == [("press", "z"), ("release", "z")]  # still held at the end
+
+    def test_speed_multiplier(self, path):
+        """Test each event fires at its recorded offset divided by the speed"""
+        record(path, [(10 + i * 0.25, "on_move", i, i) for i in range(9)])
+        _, _, times = self.replay(path, speed=2)
+        assert times == pytest.approx([i * 0.125 for i in range(9)])
+
+    def test_long_recording_has_no_drift(self, path):
+        """Test the last of 100,000 events lands exactly on its recorded offset"""
+        record(path, [(i * 0.003, "on_move", i % 100, 0) for i in range(100_000)])
+        _, _, times = self.replay(path)
+        assert times[-1] == pytest.approx(99_999 * 0.003, abs=1e-6)
+
+    def test_stop(self, path):
+        """Test a replay on its thread stops when asked"""
+        record(path, [(0, "on_move", 0, 0), (60, "on_move", 1, 1)])
+        mouse = RecordingMouse()
+        replayer = Replayer(path, mouse)
+        replayer.start()
+        replayer.stop()
+        replayer.join(5)
+        assert not replayer.is_running
+        assert len(mouse.calls) <= 1
+
+    def test_stop_releases_held_input(self, path):
+        """Test buttons and keys held when a replay is stopped are let go"""
+        record(path, [(0.1, "on_click", 5, 6, Button("left"), True), (0.12, "on_press", KeyCode(char="z")),
+                      (0.2, "on_click", 5, 6, Button("left"), False), (0.3, "on_release", KeyCode(char="z"))])
+        clock = VirtualClock()
+        mouse = RecordingMouse()
+        keyboard = FakeKeyboard()
+        replayer = Replayer(path, mouse, keyboard, clock=clock, sleep=clock.sleep, spin_threshold=0)
+        clock.call_at(0.15, replayer.stop)
+        replayer.run()
+        assert mouse.calls == [("press", "left", 1), ("release", "left", 1)]
+        assert keyboard.events == [("press", "z"), ("release", "z")]
+
+    def test_invalid_speed(self, path):
+        """Test a non-positive speed is refused"""
+        with pytest.raises(ValueError):
+            Replayer(path, RecordingMouse(), speed=0)
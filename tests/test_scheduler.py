@@ -0,0 +1,221 @@
+"""
+Unit tests for the deadline scheduler - Timing logic driven by a fake clock
+"""
+
+import random
+import time
+
+import pytest
+
+from scheduler import DeadlineScheduler, OVERRUN_CATCH_UP, OVERRUN_SKIP
+from simulation import VirtualClock
+
+
+class FakeClock:
+    """Clock that only moves when slept on or advanced by hand"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def make_scheduler(clock, interval=0.02, **kwargs):
+    scheduler = DeadlineScheduler(interval, clock=clock, sleep=clock.sleep, spin_threshold=0, **kwargs)
+    scheduler.start()
+    return scheduler
+
+
+class TestDeadlines:
+    """Test that deadlines stay on an absolute grid"""
+
+    def test_first_deadline_is_immediate(self):
+        """Test the first wait returns straight away"""
+        clock = FakeClock()
+        scheduler = make_scheduler(clock)
+        scheduler.wait()
+        assert clock.now == 0.0
+
+    def test_click_cost_does_not_drift(self):
+        """Test time spent clicking is absorbed by the next wait"""
+        clock = FakeClock()
+        scheduler = make_scheduler(clock, interval=0.02)
+        for _ in range(1000):
+            scheduler.wait()
+            clock.advance(0.007)  # simulated click cost
+        # 1000 clicks fired at 0, 0.02, ... 19.98 plus the last click cost
+        assert clock.now == pytest.approx(999 * 0.02 + 0.007)
+
+    def test_jitter_does_not_accumulate(self):
+        """Test jitter shifts single deadlines rather than the whole schedule"""
+        clock = FakeClock()
+        scheduler = make_scheduler(clock, interval=0.1)
+        for i in range(100):
+            scheduler.wait(0.03 if i % 2 else -0.03)
+        assert scheduler.next_deadline == pytest.approx(10.0)
+
+    def test_negative_jitter_on_first_deadline(self):
+        """Test jitter can't move the first deadline to before the start"""
+        clock = FakeClock()
+        scheduler = make_scheduler(clock, interval=0.1)
+        assert scheduler.wait(-0.02) == 0.0
+
+    def test_interval_change_applies_to_following_deadline(self):
+        """Test changing the interval keeps already scheduled deadline"""
+        clock = FakeClock()
+        scheduler = make_scheduler(clock, interval=0.1)
+        scheduler.wait()
+        scheduler.set_interval(0.05)
+        scheduler.wait()
+        assert clock.now == pytest.approx(0.1)
+        scheduler.wait()
+        assert clock.now == pytest.approx(0.15)
+
+    def test_absolute_sleep_preferred(self):
+        """Test sleep_until gets the absolute target when it is given"""
+        clock = FakeClock()
+        targets = []
+
+        def sleep_until(deadline):
+            targets.append(deadline)
+            clock.now = deadline + 0.005  # the spin isn't modelled, so wake at the deadline itself
+
+        scheduler = DeadlineScheduler(0.02, clock=clock, sleep=clock.sleep, sleep_until=sleep_until,
+                                      spin_threshold=0.005)
+        scheduler.start()
+        scheduler.wait()
+        clock.advance(0.001)
+        scheduler.wait()
+        assert targets == [pytest.approx(0.015)]
+        assert clock() == pytest.approx(0.02)
+
+    def test_wait_until_off_grid(self):
+        """Test an absolute wait lands on its target and leaves the grid alone"""
+        clock = FakeClock()
+        scheduler = make_scheduler(clock)
+        assert scheduler.wait_until(0.5) == 0
+        assert clock() == 0.5
+        clock.advance(0.1)
+        assert scheduler.wait_until(0.5) == pytest.approx(0.1)
+        assert scheduler.next_deadline == 0
+
+    def test_target_without_waiting(self):
+        """Test target() reports the deadline without sleeping, and advance() moves to the next"""
+        clock = FakeClock()
+        scheduler = make_scheduler(clock)
+        assert scheduler.target(0.005) == 0.005
+        scheduler.advance()
+        assert scheduler.target() == pytest.approx(0.02)
+        assert clock() == 0
+        # Whole intervals behind: the overrun policy realigns the grid
+        assert scheduler.target(now=0.1) == pytest.approx(0.1)
+        assert scheduler.skipped == 4
+
+    def test_invalid_interval_rejected(self):
+        """Test zero or negative intervals are refused"""
+        with pytest.raises(ValueError):
+            DeadlineScheduler(0)
+        with pytest.raises(ValueError):
+            DeadlineScheduler(0.1).set_interval(-1)
+
+    def test_unknown_policy_rejected(self):
+        """Test an unknown overrun policy is refused"""
+        with pytest.raises(ValueError):
+            DeadlineScheduler(0.1, overrun_policy="panic")
+
+
+class TestOverrunPolicies:
+    """Test what happens after a click takes longer than an interval"""
+
+    def test_small_lateness_is_not_an_overrun(self):
+        """Test being late by less than one interval fires the same slot"""
+        clock = FakeClock()
+        scheduler = make_scheduler(clock, interval=0.1)
+        scheduler.wait()
+        clock.advance(0.15)
+        assert scheduler.wait() == pytest.approx(0.05)
+        assert scheduler.overruns == 0
+
+    def test_skip_drops_missed_clicks(self):
+        """Test skip mode realigns to the grid after an overrun"""
+        clock = FakeClock()
+        scheduler = make_scheduler(clock, interval=0.1, overrun_policy=OVERRUN_SKIP)
+        scheduler.wait()
+        clock.advance(0.45)
+        scheduler.wait()
+        assert scheduler.overruns == 1
+        assert scheduler.skipped == 3
+        scheduler.wait()
+        assert clock.now == pytest.approx(0.5)
+
+    def test_catch_up_fires_missed_clicks(self):
+        """Test catch-up mode fires the backlog back-to-back"""
+        clock = FakeClock()
+        scheduler = make_scheduler(clock, interval=0.1, overrun_policy=OVERRUN_CATCH_UP)
+        scheduler.wait()
+        clock.advance(0.45)
+        for _ in range(4):
+            scheduler.wait()
+        assert clock.now == pytest.approx(0.45)
+        assert scheduler.skipped == 0
+        scheduler.wait()
+        assert clock.now == pytest.approx(0.5)
+
+    def test_catch_up_backlog_is_capped(self):
+        """Test catch-up mode drops clicks beyond max_catch_up"""
+        clock = FakeClock()
+        scheduler = make_scheduler(clock, interval=0.1, overrun_policy=OVERRUN_CATCH_UP, max_catch_up=2)
+        scheduler.wait()
+        clock.advance(1.05)
+        scheduler.wait()
+        assert scheduler.skipped == 7
+
+
+class TestSustainedRate:
+    """Test the rate holds over many clicks when every sleep wakes late"""
+
+    def test_late_wakeups_do_not_drift(self):
+        """Test 200 CPS is held within 1% over 60 clicks with up to 2 ms late wake-ups"""
+        clock = VirtualClock()
+        rng = random.Random(1)
+
+        def late_sleep(seconds):
+            clock.sleep(seconds + rng.uniform(0, 0.002))
+
+        scheduler = DeadlineScheduler(1 / 200, clock=clock, sleep=late_sleep, spin_threshold=0)
+        scheduler.start()
+        for _ in range(61):
+            scheduler.wait()
+        assert clock() == pytest.approx(60 / 200, rel=0.01)
+
+
+class TestRealClock:
+    """Test the hybrid sleep/spin wait against the real clock"""
+
+    def test_sustained_rate_never_fast(self):
+        """Test 60 intervals at 200 CPS never take less than their scheduled time
+
+        How late the OS wakes the thread is up to the machine, so only the
+        lower bound holds on wall-clock time; the rate itself is tested on
+        a virtual clock in TestSustainedRate.
+        """
+        scheduler = DeadlineScheduler(1 / 200)
+        scheduler.start()
+        start = scheduler.started_at
+        for _ in range(61):
+            scheduler.wait()
+        assert time.perf_counter() - start >= 60 / 200
+
+    def test_wait_never_returns_early(self):
+        """Test the spin phase never wakes before the deadline"""
+        scheduler = DeadlineScheduler(0.005)
+        scheduler.start()
+        for _ in range(20):
+            assert scheduler.wait() >= 0
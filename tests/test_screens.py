@@ -0,0 +1,66 @@
+"""
+Unit tests for screens - MIT-SHM capture against a real X server (run under Xvfb)
+"""
+
+import ctypes
+import os
+
+import pytest
+
+from screens import ShmScreen, open_screen
+from triggers import PixelCondition
+
+RED = (255, 0, 0)
+
+
+@pytest.mark.skipif(not os.environ.get("DISPLAY"), reason="needs an X server, e.g. xvfb-run")
+class TestShmScreen:
+    """Test MIT-SHM capture against a real X server such as Xvfb"""
+
+    @pytest.fixture
+    def screen(self):
+        try:
+            screen = ShmScreen()
+        except RuntimeError as e:
+            pytest.skip(str(e))
+        yield screen
+        screen.close()
+
+    def paint_root(self, screen, color):
+        x11, display = screen._x11, screen.display
+        root = x11.XRootWindow(display, x11.XDefaultScreen(display))
+        r, g, b = color
+        x11.XSetWindowBackground.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong]
+        x11.XClearWindow.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+        x11.XSetWindowBackground(display, root, (r << 16) | (g << 8) | b)
+        x11.XClearWindow(display, root)
+        x11.XSync(display, False)
+
+    def test_capture_region(self, screen):
+        """Test a region is captured into shared memory with the root window's colour"""
+        self.paint_root(screen, (0, 128, 255))
+        frame = screen.capture(10, 20, 8, 4)
+        assert (frame.width, frame.height) == (8, 4)
+        assert frame.pixel(7, 3) == (0, 128, 255)
+        assert PixelCondition((0, 128, 255), tolerance=0).matches(frame)
+
+    def test_segment_reused(self, screen):
+        """Test captures of the same size share one segment, and see changes made in between"""
+        self.paint_root(screen, RED)
+        first = screen.capture(0, 0, 4, 4)
+        self.paint_root(screen, (0, 0, 255))
+        second = screen.capture(0, 0, 4, 4)
+        assert second.data is first.data
+        assert second.pixel(0, 0) == (0, 0, 255)
+
+    def test_outside_screen(self, screen):
+        """Test a region past the screen's edge raises ValueError before reaching the X server"""
+        with pytest.raises(ValueError):
+            screen.capture(screen.width - 1, 0, 2, 1)
+
+
+def test_open_screen_without_display(monkeypatch):
+    """Test no display means no screen, rather than an error"""
+    monkeypatch.delenv("DISPLAY", raising=False)
+    monkeypatch.delenv("WAYLAND_DISPLAY", raising=False)
+    assert open_screen() is None
@@ -0,0 +1,157 @@
+"""
+Timing tests on virtual time - Whole sessions replayed through the real engine
+"""
+
+import time
+
+import pytest
+
+from click_config import ClickConfig
+from click_engine import ClickEngine
+from simulation import Simulation, VirtualClock
+
+
+def simulate(**settings):
+    settings.setdefault("random_variation", 0)
+    return Simulation(ClickConfig(**settings), record_clicks=True)
+
+
+class TestVirtualClock:
+    """Test the virtual clock itself"""
+
+    def test_sleep_advances(self):
+        """Test sleeping moves the clock by exactly that much"""
+        clock = VirtualClock()
+        clock.sleep(1.5)
+        clock.sleep(-1)
+        assert clock() == 1.5
+
+    def test_events_fire_in_order(self):
+        """Test events fire at their time, in scheduling order on ties"""
+        clock = VirtualClock()
+        fired = []
+        clock.call_at(2.0, lambda: fired.append(("b", clock())))
+        clock.call_at(1.0, lambda: fired.append(("a", clock())))
+        clock.call_at(2.0, lambda: fired.append(("c", clock())))
+        clock.sleep(5)
+        assert fired == [("a", 1.0), ("b", 2.0), ("c", 2.0)]
+        assert clock() == 5
+
+    def test_future_events_wait(self):
+        """Test events after the sleep target stay queued"""
+        clock = VirtualClock()
+        clock.call_at(10, lambda: None)
+        clock.sleep(1)
+        assert clock.next_event_time() == 10
+
+
+class TestSessionSetup:
+    """Test the time a session spends setting up"""
+
+    def test_setup_not_taken_from_first_interval(self, monkeypatch):
+        """Test slow per-session setup delays the first click instead of shortening the interval after it"""
+        sim = simulate(cps=100, pattern="grid", grid_rows=2, grid_cols=2,
+                       pattern_rect=(0, 0, 10, 10))
+        make_points = ClickEngine.make_points
+
+        def slow_make_points(config):
+            sim.clock.sleep(0.007)
+            return make_points(config)
+
+        monkeypatch.setattr(ClickEngine, "make_points", staticmethod(slow_make_points))
+        sim.start(0).run(0.05)
+        times = sim.mouse.click_times
+        assert times[0] == pytest.approx(0.007)
+        assert times[1] - times[0] == pytest.approx(0.01)
+
+
+class TestLongSessions:
+    """Test long runs stay on schedule"""
+
+    def test_hours_replay_quickly(self):
+        """Test a three hour session replays in a few seconds of real time"""
+        started = time.perf_counter()
+        sim = Simulation(ClickConfig(cps=10, random_variation=0)).start(0).run(3 * 3600)
+        elapsed = time.perf_counter() - started
+        assert sim.engine.click_count == 108000
+        assert elapsed < 5
+
+    def test_ten_minutes_at_50_cps(self):
+        """Test a 10 minute session fires exactly 30000 clicks"""
+        sim = simulate(cps=50).start(0).run(600)
+        assert sim.engine.click_count == 30000
+        assert sim.mouse.click_times[-1] == pytest.approx(599.98)
+
+    def test_no_drift_with_jitter(self):
+        """Test jitter never moves the long-run rate"""
+        sim = simulate(cps=50, random_variation=30, jitter_seed=3).start(0).run(1200)
+        assert abs(sim.engine.click_count - 60000) <= 1
+
+    def test_slow_clicks_do_not_drift(self):
+        """Test a 5 ms click cost doesn't slow a 50 CPS session"""
+        sim = Simulation(ClickConfig(cps=50, random_variation=0), click_cost=0.005).start(0).run(600)
+        assert sim.engine.click_count == 30000
+
+    def test_deterministic_replay(self):
+        """Test a seeded session replays identically"""
+        def replay():
+            sim = simulate(cps=40, random_variation=20, jitter_seed=11)
+            sim.toggle(1).update(30, cps=80).toggle(45).toggle(50).run(100)
+            return sim.mouse.click_times, sim.log
+
+        assert replay() == replay()
+
+
+class TestEventSequences:
+    """Test hotkey presses, config changes and limits"""
+
+    def test_click_limit(self):
+        """Test the session stops itself at the limit"""
+        sim = simulate(cps=50, click_limit=1000).start(0).run(3600)
+        assert sim.engine.click_count == 1000
+        assert sim.sessions == [(0, pytest.approx(19.98), 1000)]
+
+    def test_start_delay(self):
+        """Test the first click waits out the start delay"""
+        sim = simulate(cps=10, start_delay=2.5, click_limit=3).start(5).run(60)
+        assert sim.mouse.click_times == pytest.approx([7.5, 7.6, 7.7])
+
+    def test_stop_during_start_delay(self):
+        """Test stopping during the start delay means no clicks at all"""
+        sim = simulate(cps=10, start_delay=5).start(0).stop(2).run(60)
+        assert sim.mouse.clicks == 0
+
+    def test_hold_mode(self):
+        """Test clicks only happen while the hotkey is held"""
+        sim = simulate(cps=10).hold(10, 1.0).hold(20, 0.5).run(60)
+        assert [clicks for _, _, clicks in sim.sessions] == [10, 5]
+        assert sim.mouse.click_times[0] == pytest.approx(10)
+        assert sim.mouse.click_times[-1] == pytest.approx(20.4)
+
+    def test_toggle(self):
+        """Test toggling starts and stops sessions"""
+        sim = simulate(cps=20).toggle(0).toggle(1).toggle(5).toggle(5.5).run(60)
+        assert [clicks for _, _, clicks in sim.sessions] == [20, 10]
+
+    def test_cps_change_mid_run(self):
+        """Test a CPS change applies after the already scheduled deadline"""
+        sim = simulate(cps=10).start(0).update(10, cps=100).run(20)
+        # 101 clicks up to t=10, one more at 10.1, then 100 CPS until t=20
+        assert sim.engine.click_count == 1091
+        assert sim.mouse.click_times[101:103] == pytest.approx([10.1, 10.11])
+
+    def test_limit_change_mid_run(self):
+        """Test a limit set mid-run stops the session"""
+        sim = simulate(cps=10).start(0).update(5, click_limit=80).run(60)
+        assert sim.engine.click_count == 80
+
+    def test_restart_after_limit(self):
+        """Test a new session after the limit starts counting from zero"""
+        sim = simulate(cps=10, click_limit=5).start(0).start(10).run(60)
+        assert [clicks for _, _, clicks in sim.sessions] == [5, 5]
+
+    def test_events_logged(self):
+        """Test every event is logged with its time"""
+        sim = simulate(cps=10).start(1).update(2, cps=20).stop(3).run(4)
+        assert [(t, event) for t, event, _ in sim.log] == [
+            (1, "start"), (2, "update"), (3, "stop"), (4, "stop")]
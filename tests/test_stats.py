@@ -0,0 +1,138 @@
+"""
+Unit tests for click stats - Histogram accuracy and session summaries
+"""
+
+import json
+import random
+
+import pytest
+
+from stats import ClickStats, Histogram
+
+
+class TestHistogram:
+    """Test the log-linear histogram"""
+
+    def test_empty(self):
+        """Test an empty histogram reports zeros"""
+        hist = Histogram()
+        assert hist.percentile(50) == 0
+        assert hist.mean() == 0
+
+    def test_small_values_exact(self):
+        """Test values below the sub-bucket count are exact"""
+        hist = Histogram()
+        for value in range(100):
+            hist.record(value)
+        assert hist.percentile(50) == 49
+        assert hist.max == 99
+
+    def test_relative_error_bounded(self):
+        """Test large-value percentiles stay within the bucket precision"""
+        rng = random.Random(1)
+        values = sorted(rng.randint(1, 5_000_000) for _ in range(10000))
+        hist = Histogram()
+        for value in values:
+            hist.record(value)
+        for percent in (10, 50, 90, 99):
+            exact = values[int(percent / 100 * len(values)) - 1]
+            assert hist.percentile(percent) == pytest.approx(exact, rel=0.02)
+
+    def test_fixed_memory(self):
+        """Test the bucket array doesn't grow with the number of values"""
+        hist = Histogram()
+        size = len(hist.counts)
+        for value in range(0, 50_000_000, 1000):
+            hist.record(value)
+        assert len(hist.counts) == size
+        assert size < 2000
+
+    def test_values_clamped(self):
+        """Test out-of-range values land in the end buckets"""
+        hist = Histogram(max_value=1000)
+        hist.record(-5)
+        hist.record(10**9)
+        assert hist.total == 2
+        assert hist.max == 1000
+        assert hist.percentile(0) == 0
+
+    def test_reset(self):
+        """Test reset clears everything"""
+        hist = Histogram()
+        hist.record(500)
+        hist.reset()
+        assert hist.total == 0
+        assert hist.max == 0
+        assert sum(hist.counts) == 0
+
+
+class TestClickStats:
+    """Test session statistics"""
+
+    def record_steady(self, stats, interval, clicks, lateness=0.0):
+        for i in range(clicks):
+            started = i * interval + lateness
+            stats.record_click(started, started + 0.0002, lateness)
+
+    def test_measured_cps(self):
+        """Test the smoothed CPS matches a steady click stream"""
+        stats = ClickStats()
+        self.record_steady(stats, 0.02, 200)
+        assert stats.measured_cps == pytest.approx(50)
+
+    def test_interval_error_from_lateness(self):
+        """Test the interval error is the change in lateness between clicks"""
+        stats = ClickStats()
+        stats.record_click(0.0, 0.0001, 0.0)
+        stats.record_click(0.102, 0.1021, 0.002)
+        stats.record_click(0.2, 0.2001, 0.0)
+        assert stats.interval_errors.max == 2000
+        assert stats.intervals.total == 2
+
+    def test_constant_lateness_is_not_error(self):
+        """Test a constant offset doesn't count as interval error"""
+        stats = ClickStats()
+        self.record_steady(stats, 0.01, 50, lateness=0.0005)
+        assert stats.interval_errors.max == 0
+
+    def test_click_latency(self):
+        """Test time inside click() is recorded"""
+        stats = ClickStats()
+        self.record_steady(stats, 0.01, 10)
+        assert stats.click_latency.percentile(50) == pytest.approx(200, abs=2)
+
+    def test_burst(self):
+        """Test a burst counts every click and records the per-click time"""
+        stats = ClickStats()
+        stats.record_burst(64, 1.0, 1.0064)
+        assert stats.clicks == 64
+        assert stats.click_latency.max == pytest.approx(100, abs=2)
+
+    def test_trigger_latency(self):
+        """Test capture-to-click times of triggered clicks are summarised"""
+        stats = ClickStats()
+        stats.record_trigger(0.0005)
+        stats.record_trigger(0.0015)
+        assert stats.to_dict()["trigger_latency_ms"]["max"] == pytest.approx(1.5, rel=0.02)
+
+    def test_reset_starts_new_session(self):
+        """Test reset forgets the previous session"""
+        stats = ClickStats()
+        self.record_steady(stats, 0.01, 10)
+        stats.reset(target_cps=20)
+        assert stats.clicks == 0
+        assert stats.measured_cps == 0
+        assert stats.target_cps == 20
+
+    def test_export_json(self, tmp_path):
+        """Test the session summary is written as JSON"""
+        stats = ClickStats()
+        stats.reset(target_cps=50)
+        self.record_steady(stats, 0.02, 100)
+        path = tmp_path / "stats.json"
+        stats.export_json(path)
+        data = json.loads(path.read_text())
+        assert data["clicks"] == 100
+        assert data["target_cps"] == 50
+        assert data["interval_ms"]["p50"] == pytest.approx(20, rel=0.02)
+        assert set(data["interval_error_ms"]) == {"count", "mean", "p50", "p90", "p99", "max"}
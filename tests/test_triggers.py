@@ -0,0 +1,274 @@
+"""
+Unit tests for triggers - Frames, conditions with and without NumPy, and triggered sessions on virtual time
+"""
+
+import pytest
+
+from click_config import ClickConfig
+from click_engine import ClickEngine
+from mouse_backends import NullMouse
+from optional import numpy
+from simulation import Simulation
+from triggers import (ChangeCondition, Frame, MemoryScreen, PixelCondition, TemplateCondition, load_template,
+                      save_template, solid_frame, watch_region)
+
+RED = (255, 0, 0)
+BLACK = (0, 0, 0)
+
+use_numpy = pytest.mark.parametrize("use_numpy", [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(numpy() is None, reason="needs NumPy")),
+])
+
+
+def triggered(trigger="pixel", **settings):
+    """Simulation of a trigger watching the pixel at 5, 5 of a black 20x20 screen"""
+    settings.setdefault("trigger_color", RED)
+    config = ClickConfig(cps=10, random_variation=0, trigger=trigger, use_fixed_position=True,
+                         fixed_x=5, fixed_y=5, **settings)
+    return Simulation(config, record_clicks=True, screen_size=(20, 20))
+
+
+class TestFrames:
+    """Test frames, regions and template files"""
+
+    def test_capture_is_a_view(self):
+        """Test a memory capture reads the screen in place, and copy() keeps it"""
+        screen = MemoryScreen(10, 10, color=(1, 2, 3))
+        frame = screen.capture(2, 3, 4, 2)
+        kept = frame.copy()
+        screen.fill(2, 3, 1, 1, RED)
+        assert frame.pixel(0, 0) == RED
+        assert kept.pixel(0, 0) == (1, 2, 3)
+        assert (kept.stride, len(kept.data)) == (16, 32)
+
+    def test_region_outside_screen(self):
+        """Test a capture past the screen's edge raises ValueError"""
+        screen = MemoryScreen(10, 10)
+        with pytest.raises(ValueError):
+            screen.capture(8, 0, 4, 1)
+        with pytest.raises(ValueError):
+            screen.capture(-1, 0, 1, 1)
+
+    @pytest.mark.parametrize("rect, position, size, expected", [
+        (None, (5, 5), (1, 1), (5, 5, 1, 1)),
+        (None, (5, 5), (4, 2), (3, 4, 4, 2)),
+        ((2, 3, 4, 8), None, (1, 1), (2, 3, 3, 6)),
+        ((2, 3, 4, 8), None, (10, 10), (2, 3, 10, 10)),
+    ])
+    def test_watch_region(self, rect, position, size, expected):
+        """Test the captured region comes from the rectangle or is centred on the position"""
+        assert watch_region(rect, position, size) == expected
+
+    def test_template_round_trip(self, tmp_path):
+        """Test a frame saved as PPM loads back with the same pixels"""
+        screen = MemoryScreen(8, 8)
+        screen.fill(1, 1, 2, 2, (10, 200, 30))
+        frame = screen.capture(0, 0, 4, 3)
+        path = str(tmp_path / "template.ppm")
+        save_template(frame, path)
+        loaded = load_template(path)
+        assert (loaded.width, loaded.height) == (4, 3)
+        assert loaded.data == frame.copy().data
+
+    def test_template_with_comment(self, tmp_path):
+        """Test PPM header comments are skipped"""
+        path = tmp_path / "template.ppm"
+        path.write_bytes(b"P6\n# made by hand\n1 1\n255\n" + bytes((1, 2, 3)))
+        assert load_template(str(path)).pixel(0, 0) == (1, 2, 3)
+
+    @pytest.mark.parametrize("data", [b"P3\n1 1\n255\n1 2 3", b"P6\n2 2\n255\n\0\0\0", b"P6\n1"])
+    def test_bad_template_rejected(self, tmp_path, data):
+        """Test a file that isn't a complete 8-bit binary PPM raises ValueError"""
+        path = tmp_path / "template.ppm"
+        path.write_bytes(data)
+        with pytest.raises(ValueError):
+            load_template(str(path))
+
+
+class TestConditions:
+    """Test each condition, with the vectorized and plain Python comparisons alike
+
+    Regions are 10x10, big enough for NumPy to be used when it is installed.
+    """
+
+    @use_numpy
+    def test_pixel(self, use_numpy):
+        """Test any pixel within tolerance on every channel matches"""
+        screen = MemoryScreen(30, 30)
+        screen.fill(17, 17, 1, 1, (250, 10, 0))
+        condition = PixelCondition(RED, tolerance=10, use_numpy=use_numpy)
+        assert condition.matches(screen.capture(10, 10, 10, 10))
+        assert not condition.matches(screen.capture(0, 0, 10, 10))
+        assert not PixelCondition(RED, tolerance=5, use_numpy=use_numpy).matches(screen.capture(10, 10, 10, 10))
+
+    @use_numpy
+    def test_template(self, use_numpy):
+        """Test the region matches a template on mean difference, and a different size is an error"""
+        screen = MemoryScreen(30, 30)
+        screen.fill(12, 12, 4, 4, RED)
+        condition = TemplateCondition(screen.capture(10, 10, 10, 10), tolerance=4, use_numpy=use_numpy)
+        screen.fill(12, 12, 2, 2, (200, 0, 0))  # a small difference on average still matches
+        assert condition.matches(screen.capture(10, 10, 10, 10))
+        assert not condition.matches(screen.capture(8, 8, 10, 10))
+        with pytest.raises(ValueError):
+            condition.matches(screen.capture(10, 10, 9, 9))
+
+    @use_numpy
+    def test_change(self, use_numpy):
+        """Test a change beyond tolerance matches once, against the frame before it"""
+        screen = MemoryScreen(30, 30)
+        condition = ChangeCondition(tolerance=8, use_numpy=use_numpy)
+        assert not condition.matches(screen.capture(0, 0, 10, 10))
+        screen.fill(3, 3, 1, 1, (5, 5, 5))  # within tolerance
+        assert not condition.matches(screen.capture(0, 0, 10, 10))
+        screen.fill(3, 3, 1, 1, RED)
+        assert condition.matches(screen.capture(0, 0, 10, 10))
+        assert not condition.matches(screen.capture(0, 0, 10, 10))
+
+    @use_numpy
+    def test_padding_ignored(self, use_numpy):
+        """Test the padding byte of each pixel never counts as a difference"""
+        frame = Frame(10, 10, bytes((0, 0, 255, 99)) * 100)
+        assert TemplateCondition(solid_frame(10, 10, RED), tolerance=0, use_numpy=use_numpy).matches(frame)
+        assert PixelCondition(RED, tolerance=0, use_numpy=use_numpy).matches(frame)
+        condition = ChangeCondition(tolerance=0, use_numpy=use_numpy)
+        condition.matches(solid_frame(10, 10, RED))
+        assert not condition.matches(frame)
+
+    @use_numpy
+    def test_strided_frame(self, use_numpy):
+        """Test rows with padding past the last pixel, as X11 can return, are compared correctly"""
+        row = bytes((0, 0, 255, 0)) * 10 + bytes(8)
+        frame = Frame(10, 10, row * 10, stride=48)
+        assert TemplateCondition(solid_frame(10, 10, RED), tolerance=0, use_numpy=use_numpy).matches(frame)
+
+    def test_small_regions_skip_numpy(self):
+        """Test a region below NUMPY_MIN_PIXELS still matches with NumPy asked for"""
+        frame = solid_frame(1, 1, RED)
+        assert PixelCondition(RED, use_numpy=True).matches(frame)
+
+
+class TestTriggeredSessions:
+    """Test the engine clicks only while the region meets the condition"""
+
+    def test_pixel_trigger(self):
+        """Test clicks start when the colour appears, keep to the CPS while it lasts and stop when it goes"""
+        sim = triggered()
+        sim.at(1.0, sim.screen.fill, 5, 5, 1, 1, RED).at(2.0, sim.screen.fill, 5, 5, 1, 1, BLACK)
+        sim.start(0).run(3)
+        times = sim.mouse.click_times
+        assert len(times) == 10
+        assert times[0] == pytest.approx(1.0)
+        assert times[-1] < 2.0
+        assert sim.mouse.position == (5, 5)
+
+    def test_poll_rate_bounds_reaction(self):
+        """Test the colour is noticed by the next poll"""
+        sim = triggered(trigger_poll_rate=20)
+        sim.at(1.01, sim.screen.fill, 5, 5, 1, 1, RED)
+        sim.start(0).run(1.2)
+        assert sim.mouse.click_times[0] == pytest.approx(1.05)
+
+    def test_change_trigger(self):
+        """Test each change of the region clicks once"""
+        sim = triggered("change", trigger_rect=(0, 0, 9, 9))
+        for when, color in ((0.5, RED), (1.5, (0, 255, 0)), (1.52, (0, 0, 255))):
+            sim.at(when, sim.screen.fill, 2, 2, 1, 1, color)
+        sim.start(0).run(3)
+        times = sim.mouse.click_times
+        assert len(times) == 3
+        assert times[0] == pytest.approx(0.5)
+        # The change during the hold-off after a click is seen once it ends
+        assert times[2] == pytest.approx(times[1] + 0.1)
+
+    def test_template_trigger(self, tmp_path):
+        """Test a template captured from the screen triggers when the region looks like it again"""
+        screen = MemoryScreen(20, 20)
+        screen.fill(4, 4, 3, 3, RED)
+        path = str(tmp_path / "template.ppm")
+        save_template(screen.capture(3, 3, 5, 5), path)  # centred on 5, 5
+        sim = triggered("template", trigger_template_file=path, click_limit=3)
+        sim.at(1.0, sim.screen.fill, 4, 4, 3, 3, RED)
+        sim.start(0).run(3)
+        assert sim.mouse.click_times == pytest.approx([1.0, 1.1, 1.2])
+
+    def test_latency_reported(self):
+        """Test the capture-to-click time of every triggered click reaches the stats"""
+        sim = triggered(click_limit=5)
+        sim.at(0.5, sim.screen.fill, 5, 5, 1, 1, RED)
+        sim.start(0).run(2)
+        summary = sim.engine.stats.to_dict()["trigger_latency_ms"]
+        assert summary["count"] == 5
+        assert summary["max"] == 0
+
+    def test_changes_picked_up_mid_run(self):
+        """Test a CPS and a click limit published during a triggered session take effect at the next poll"""
+        sim = triggered()
+        sim.screen.fill(5, 5, 1, 1, RED)
+        sim.update(1.0, cps=100).update(1.5, click_limit=60)
+        sim.start(0).run(3)
+        times = sim.mouse.click_times
+        assert len(times) == 60
+        assert times[1] - times[0] == pytest.approx(0.1)
+        assert times[-1] - times[-2] == pytest.approx(0.01)
+        assert sim.sessions[0][1] < 2.0
+
+    def test_region_rebuilt_mid_run(self):
+        """Test a new position or colour published mid-run changes what the trigger watches for"""
+        sim = triggered()
+        sim.screen.fill(5, 5, 1, 1, RED)
+        sim.screen.fill(8, 8, 1, 1, (0, 255, 0))
+        sim.update(0.95, fixed_x=8, fixed_y=8).update(1.95, trigger_color=(0, 255, 0))
+        sim.start(0).run(3)
+        times = sim.mouse.click_times
+        assert len(times) == 21
+        assert times[9] < 0.95 < 1.95 < times[10] < 1.96
+        assert sim.mouse.position == (8, 8)
+
+    def test_needs_screen(self):
+        """Test a trigger is refused by an engine with no screen"""
+        engine = ClickEngine(NullMouse())
+        with pytest.raises(ValueError, match="screen"):
+            engine.update(trigger="change", use_fixed_position=True)
+        engine.close()
+
+    def test_missing_template_refused(self, tmp_path):
+        """Test a template that can't be read fails when it is set, not in the clicking loop"""
+        engine = ClickEngine(NullMouse(), screen=MemoryScreen(10, 10))
+        with pytest.raises(OSError):
+            engine.update(trigger="template", trigger_template_file=str(tmp_path / "missing.ppm"),
+                          use_fixed_position=True)
+        engine.close()
+
+    def test_region_off_screen_refused(self):
+        """Test a region that isn't on the screen fails when it is set, not in the clicking loop"""
+        engine = ClickEngine(NullMouse(), screen=MemoryScreen(20, 20))
+        with pytest.raises(ValueError, match="outside"):
+            engine.update(trigger="change", use_fixed_position=True, fixed_x=50, fixed_y=50)
+        with pytest.raises(ValueError, match="outside"):
+            engine.update(trigger="change", trigger_rect=(10, 10, 29, 29))
+        assert not engine.config.trigger
+        engine.close()
+
+    def test_capture_failure_ends_session(self):
+        """Test a capture that fails mid-run ends the session cleanly and the engine can start again"""
+        class ShrinkingScreen(MemoryScreen):
+            def capture(self, left, top, width, height):
+                self.width = self.height = 4  # resolution switched under the running session
+                return super().capture(left, top, width, height)
+
+        screen = ShrinkingScreen(20, 20)
+        engine = ClickEngine(NullMouse(), ClickConfig(trigger="change", use_fixed_position=True, fixed_x=10,
+                                                      fixed_y=10), screen=screen)
+        engine.start()
+        assert engine.join(5)
+        assert not engine.is_running
+        assert isinstance(engine.error, ValueError)
+        screen.width = screen.height = 20
+        engine.update(fixed_x=2, fixed_y=2)
+        engine.start()
+        assert engine.is_running
+        engine.stop()
+        assert engine.join(5)
+        engine.close()